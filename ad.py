@@ -1,6 +1,6 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import threading
 import time
@@ -13,6 +13,41 @@ from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
 import sqlite3
 import math
+import numpy as np
+
+from models.tick_engine import FleetTickEngine
+from models.bulk_writer import BulkReadingWriter
+from models.write_buffer import WriteBehindBuffer
+from models.scheduler import FixedRateScheduler
+from models.fleet_simulator import build_fleet
+from models.machine_registry import MachineRegistry
+from models.migrations import migrate
+from models.current_state import current_state_hook, rebuild_current_state
+from models.queries import sensor_series_statement
+from models.fleet_snapshot import SnapshotCache, build_fleet_snapshot
+from models.live_hub import LiveHub, sse_stream
+from models.live_state import DeltaSession, LiveState
+from models.downsampling import DOWNSAMPLING_METHODS, SensorSeries, aggregate_points, downsample, to_unix
+from models.rollups import RollupPipeline, choose_tier, load_aggregate_series, rollup_tables
+from models.reading_stores import READING_BACKENDS, StoredReading, StoreReadingWriter
+from models.deadband import DeadbandFilter, expand_steps
+from models.columnar_store import ColumnarStore
+from models.compact_readings import CompactReadingStore, compact_reading_tables
+from models.archive import ReadingArchive, archive_table
+from models.sqlite_db import DEFAULT_PRAGMAS, SQLiteDatabase
+from models.streaming_detector import StreamingDetector
+from models.multivariate_detector import MultivariateDetector
+from models.change_points import ChangePointDetector, backtest_change_points
+from models.metrics import LatencyHistogram
+from models.fleet_health import FleetHealthEngine, HealthHistory, status_name
+
+# Optional WebSocket channel (pip install flask-sock); the dashboard falls back to polling without it
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
 
 # =============================================================================
 # 🚀 OPENAI CHATBOT IMPORTS (Optional - your original code had this)
@@ -29,6 +64,13 @@ app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///machines.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+class DatabaseConfig:
+    PRAGMAS = DEFAULT_PRAGMAS       # WAL, synchronous=NORMAL, 64 MiB cache, 256 MiB mmap, in-memory temp tables
+    READ_POOL_SIZE = 8              # Pooled connections, for the engine and for raw sqlite3 readers
+    BUSY_TIMEOUT = 5.0              # Seconds a writer waits for the write gate or a locked database
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': DatabaseConfig.READ_POOL_SIZE}
+
 # Initialize database
 db = SQLAlchemy(app)
 
@@ -37,6 +79,92 @@ sent_maintenance_emails = set()
 sent_sabotage_emails = set()
 sent_twilio_calls = set()
 
+# Data generation / storage pipeline configuration
+class GenerationConfig:
+    # Write-behind buffer between the generator and SQLite
+    BUFFER_MAX_ROWS = 50000         # Queue capacity before backpressure kicks in
+    BUFFER_FLUSH_ROWS = 2000        # Group-commit once this many rows are waiting...
+    BUFFER_FLUSH_INTERVAL = 1.0     # ...or the oldest row has waited this many seconds
+    BUFFER_OVERFLOW = 'block'       # block, shed or drop_oldest
+    BUFFER_BLOCK_TIMEOUT = 0.5      # Max seconds a tick may wait for room when blocking
+
+    # Fixed-rate scheduler
+    DEFAULT_SAMPLE_PERIOD = 3.0     # Seconds between ticks for machines without an override
+    SAMPLE_PERIODS = {}             # Overrides keyed by machine name or machine type, e.g. {'Heat Exchanger': 1.0}
+    STATUS_REPORT_PERIOD = 30.0     # Seconds between console status reports
+
+    # Simulation mode: >0 replaces the four plant machines with N machines built
+    # from the MACHINES_CONFIG templates (see also models/fleet_simulator.py)
+    SIMULATED_FLEET_SIZE = 0
+
+class StorageConfig:
+    READING_BACKEND = 'sqlite'      # sqlite (sensor_readings), compact (sensors + sensor_readings_compact) or columnar (mmap segments)
+    COLUMNAR_PATH = os.path.join(app.instance_path, 'readings')
+    COLUMNAR_SEGMENT_ROWS = 65536   # Rows per sensor segment before it is sealed
+    COLUMNAR_OPEN_SEGMENTS = 256    # Sealed segment maps kept open for reads
+
+class RollupConfig:
+    ENABLED = True
+    INTERVAL = 60.0                 # Seconds between rollup/retention passes
+    GRACE = 10.0                    # Buckets are rolled once they closed this many seconds ago
+    # Days kept per level; raw rows and finer tiers are only trimmed once the next tier covers them
+    RETENTION_DAYS = {'raw': 7, '1m': 30, '1h': 365, '1d': None}
+
+class DeadbandConfig:
+    ENABLED = False
+    MODES = ('normal',)             # Machine statuses whose sensors are deadband-filtered; others store every reading
+    TOLERANCE = 0.01                # Fraction of the sensor's normal-range width a reading must move to be stored
+    TOLERANCES = {}                 # Absolute per-sensor-type overrides, e.g. {'temperature': 0.5}
+    HEARTBEAT = 60.0                # Seconds after which a reading is stored even if it did not move
+
+class DetectorConfig:
+    ENABLED = True                  # Streaming statistical detector on top of the rule-based one (fleet ticks only)
+    EWMA_ALPHA = 0.1                # Weight of the newest reading in the rolling mean/variance (~10-reading window)
+    Z_THRESHOLD = 4.0               # Rolling z-score above which a reading is flagged
+    WARMUP = 30                     # Readings per sensor before it can be flagged
+    SCORE_CAP = 0.79                # Highest statistical score; stays below the 0.8 critical-alert threshold
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'detector_state.npz')
+    SNAPSHOT_INTERVAL = 60.0        # Seconds between state snapshots; at most this much learning is lost on restart
+
+class MultivariateConfig:
+    ENABLED = True                  # Per-machine-type Mahalanobis stage after the per-sensor detectors (fleet ticks only)
+    TAIL_Z = 3.7                    # Flag a machine beyond the chi-square quantile matching this normal tail (~1e-4)
+    WARMUP = 50                     # Clean machine readings per type before machines of that type can be flagged
+    SHRINKAGE = 0.05                # Fraction of each variance added to the covariance diagonal to keep it invertible
+    SCORE_CAP = 0.79                # Highest multivariate score; stays below the 0.8 critical-alert threshold
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'multivariate_state.npz')  # Saved with the detector snapshot
+
+class ChangePointConfig:
+    ENABLED = True                  # CUSUM change points per sensor, raised as 'change_point' alerts (fleet ticks only)
+    K = 0.75                        # Mean shift, in reference standard deviations, the up/down sums ignore
+    H = 12.0                        # Up/down sum that signals a change
+    K_VAR = 0.3                     # Excess of z^2 over 1, in standard deviations of z^2, the variance sum ignores
+    H_VAR = 30.0                    # Variance sum that signals a change
+    WARMUP = 1000                   # Readings per sensor to learn the reference, at start and after each change
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'change_point_state.npz')  # Saved with the detector snapshot
+
+class HealthConfig:
+    FLUSH_INTERVAL = 30.0           # Seconds between batched writes of changed sensor health (mode changes flush at once)
+    HISTORY_INTERVAL = 300.0        # Seconds between fleet health samples in sensor_health_history
+    HISTORY_RETENTION_DAYS = 90     # Days of health samples kept (None keeps everything)
+    HISTORY_DEFAULT_WINDOW = 86400  # Seconds covered by health history requests without start/end
+
+class ArchiveConfig:
+    ENABLED = True                  # SQLite backend only; the columnar store is already compact
+    INTERVAL = 600.0                # Seconds between archive passes
+    BLOCK_SECONDS = 7200            # Width of one compressed block per sensor
+    ARCHIVE_AFTER = 86400           # Raw rows stay uncompressed for at least this many seconds
+
+class DashboardConfig:
+    SNAPSHOT_TTL = 1.0              # Seconds one /api/fleet/snapshot build is shared between clients
+    LIVE_QUEUE_SIZE = 256           # Events buffered per live-stream client before the oldest are dropped
+    LIVE_HEARTBEAT = 15.0           # Seconds of silence before a live-stream keepalive comment
+    WS_FRAME_INTERVAL = 0.1         # Max seconds between WebSocket delta frames while data is changing
+    HISTORY_DEFAULT_POINTS = 500    # Points per sensor for ranged history queries without max_points
+    HISTORY_MAX_POINTS = 5000       # Upper bound accepted for max_points
+    HISTORY_DEFAULT_WINDOW = 3600   # Seconds covered when only one of start/end is given
+    HEALTH_PUSH_PERIOD = 10.0       # Seconds between sensor health refreshes pushed to WebSocket clients
+
 # Email Configuration
 class EmailConfig:
     SMTP_SERVER = 'smtp.gmail.com'
@@ -632,17 +760,16 @@ class IndustrialChatbot:
             if machine_id:
                 machine = Machine.query.get(machine_id)
                 if machine:
-                    # Get latest readings
-                    latest_readings = db.session.query(SensorReading).filter_by(
-                        machine_id=machine_id
-                    ).order_by(SensorReading.timestamp.desc()).limit(10).all()
+                    # Get latest readings (one row per sensor)
+                    latest_readings = SensorCurrent.query.filter_by(machine_id=machine_id).all()
 
                     context = {
                         'machine_name': machine.name,
                         'machine_type': machine.machine_type,
                         'status': machine.status,
                         'location': machine.location,
-                        'latest_readings': [r.to_dict() for r in latest_readings]
+                        'latest_readings': [r.to_dict() for r in latest_readings],
+                        'sensor_health_trend': health_trend(machine_id)
                     }
                     return context
             else:
@@ -726,7 +853,14 @@ class IndustrialChatbot:
             machine_id = machines[0]
             machine = Machine.query.get(machine_id)
             if machine:
-                latest_reading = SensorReading.query.filter_by(machine_id=machine_id).order_by(SensorReading.timestamp.desc()).first()
+                current = SensorCurrent.query.filter_by(machine_id=machine_id).all()
+                anomalies = [r for r in current if r.is_anomaly]
+                # Report the worst anomalous sensor, otherwise the most recent reading
+                if anomalies:
+                    latest_reading = max(anomalies, key=lambda r: r.anomaly_score)
+                else:
+                    latest_reading = max(current, key=lambda r: r.timestamp, default=None)
+                last_update = max((r.timestamp for r in current), default=None)
 
                 status_emoji = {"normal": "🟢", "maintenance": "🟡", "sabotage": "🔴", "shutdown": "⚫"}
 
@@ -734,7 +868,7 @@ class IndustrialChatbot:
 
 📊 **Current Status:** {machine.status.upper()}
 📍 **Location:** {machine.location}
-⏰ **Last Update:** {latest_reading.timestamp.strftime('%Y-%m-%d %H:%M:%S') if latest_reading else 'No data'}
+⏰ **Last Update:** {last_update.strftime('%Y-%m-%d %H:%M:%S') if last_update else 'No data'}
 
 """
                 if latest_reading:
@@ -767,10 +901,7 @@ Type 'help' for available commands or ask about specific machines."""
             machine = Machine.query.get(machine_id)
 
             # Get recent anomalies
-            anomalies = SensorReading.query.filter(
-                SensorReading.machine_id == machine_id,
-                SensorReading.is_anomaly == True
-            ).order_by(SensorReading.timestamp.desc()).limit(5).all()
+            anomalies = query_readings(machine_id, limit=5, anomalies_only=True)
 
             if anomalies:
                 response = f"""**🔧 Troubleshooting Guide: {machine.name}**
@@ -831,7 +962,7 @@ Which machine needs maintenance assessment?"""
         if machines:
             machine_id = machines[0]
             # Get recent readings for analysis
-            readings = SensorReading.query.filter_by(machine_id=machine_id).order_by(SensorReading.timestamp.desc()).limit(20).all()
+            readings = query_readings(machine_id, limit=20)
 
             anomaly_count = sum(1 for r in readings if r.is_anomaly)
             avg_score = sum(r.anomaly_score for r in readings) / len(readings) if readings else 0
@@ -895,6 +1026,24 @@ Which machine's anomalies would you like to analyze?"""
 
     def _handle_prediction_query(self, machines: List[int], context: Dict) -> str:
         """Handle predictive analysis queries"""
+        if machines:
+            machine = Machine.query.get(machines[0])
+            trend = health_trend(machines[0]) if machine else {}
+            if trend:
+                lines = []
+                for sensor_type, health in sorted(trend.items(), key=lambda item: item[1]['health_percentage']):
+                    change = f"{health['change']:+.1f}% in 24h" if health['change'] is not None else "no 24h history yet"
+                    rul = health['remaining_useful_life_hours']
+                    rul_text = f"~{rul / 24:.1f} days to failure" if rul else ("failed" if rul == 0 else "not degrading")
+                    lines.append(f"• **{sensor_type.replace('_', ' ').title()}**: {health['health_percentage']}% "
+                                 f"({health['status']}, {change}, {rul_text})")
+                return f"""**🔮 Sensor Health Forecast - {machine.name}**
+
+{chr(10).join(lines)}
+
+Remaining life assumes each sensor keeps degrading at its current rate.
+See `/api/machine/{machine.id}/sensor-health/history` for the full trend."""
+
         return """**🔮 Predictive Maintenance Insights**
 
 **Our AI Predicts:**
@@ -1029,25 +1178,194 @@ industrial_chatbot = IndustrialChatbot()
 # 🚀 ENHANCED API ENDPOINTS FOR REAL-TIME GRAPHS & INDIVIDUAL SENSOR CONTROL
 # =============================================================================
 
+def parse_utc_arg(value):
+    """ISO-8601 query argument -> naive UTC datetime, as stored in sensor_readings"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_history_range():
+    """(start, end, max_points, method) from the query string.
+
+    Returns None when none of start/end/max_points is given, which keeps
+    the original last-20-readings behaviour. Raises ValueError on bad input.
+    """
+    args = request.args
+    if not any(name in args for name in ('start', 'end', 'max_points')):
+        return None
+
+    end = parse_utc_arg(args['end']) if 'end' in args else datetime.utcnow()
+    start = parse_utc_arg(args['start']) if 'start' in args else end - timedelta(seconds=DashboardConfig.HISTORY_DEFAULT_WINDOW)
+    if start >= end:
+        raise ValueError('start must be before end')
+
+    max_points = int(args.get('max_points', DashboardConfig.HISTORY_DEFAULT_POINTS))
+    if not 3 <= max_points <= DashboardConfig.HISTORY_MAX_POINTS:
+        raise ValueError(f'max_points must be between 3 and {DashboardConfig.HISTORY_MAX_POINTS}')
+
+    method = args.get('method', 'lttb')
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}")
+
+    return start, end, max_points, method
+
+def query_readings(machine_id, sensor_type=None, since=None, until=None, limit=None, anomalies_only=False):
+    """Newest-first raw readings of one machine from the configured reading backend
+
+    SQLite returns SensorReading rows, followed by archived StoredReadings
+    once the raw table runs out; the columnar store returns StoredReadings
+    with the same attributes.
+    """
+    if reading_store is not None:
+        return reading_store.recent(machine_id, sensor_type, since, until, limit, anomalies_only)
+
+    query = SensorReading.query.filter(SensorReading.machine_id == machine_id)
+    if sensor_type is not None:
+        query = query.filter(SensorReading.sensor_type == sensor_type)
+    if since is not None:
+        query = query.filter(SensorReading.timestamp >= since)
+    if until is not None:
+        query = query.filter(SensorReading.timestamp < until)
+    if anomalies_only:
+        query = query.filter(SensorReading.is_anomaly == True)
+    query = query.order_by(SensorReading.timestamp.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    readings = query.all()
+
+    if reading_archive is not None and (limit is None or len(readings) < limit):
+        # Archived blocks only hold readings older than every raw row
+        with db.engine.connect() as conn:
+            readings += reading_archive.recent(
+                conn, machine_id, sensor_type, since, until,
+                limit - len(readings) if limit is not None else None, anomalies_only
+            )
+    return readings
+
+def stored_sensor_types(machine_id):
+    """Sensor types that have at least one stored reading, raw or archived"""
+    if reading_store is not None:
+        return reading_store.sensor_types(machine_id)
+    sensor_types = [sensor_type for (sensor_type,) in db.session.query(SensorReading.sensor_type).filter_by(
+        machine_id=machine_id
+    ).distinct().all()]
+    if reading_archive is not None:
+        with db.engine.connect() as conn:
+            sensor_types += [sensor_type for sensor_type in reading_archive.sensor_types(conn, machine_id)
+                             if sensor_type not in sensor_types]
+    return sensor_types
+
+def load_stored_series(conn, machine_id, sensor_type, start, end):
+    """One sensor's stored readings in [start, end] as a SensorSeries, archived blocks included"""
+    if reading_store is not None:
+        return reading_store.series(machine_id, sensor_type, start, end)
+    series = SensorSeries.from_rows(conn.execute(
+        sensor_series_statement(SensorReading.__table__, machine_id, sensor_type, start, end)
+    ).fetchall())
+    if reading_archive is not None:
+        archived = reading_archive.load_series(conn, machine_id, sensor_type, start, end)
+        if len(archived):
+            series = SensorSeries.concat([archived, series])
+    return series
+
+def load_raw_series(conn, machine, sensor_type, start, end):
+    """One sensor's raw readings in [start, end] as a SensorSeries
+
+    With deadband storage the stored readings are expanded back into a
+    step-wise series at the machine's sample period; the reading stored
+    before ``start`` (at most a heartbeat earlier) fills the range start.
+    """
+    if not DeadbandConfig.ENABLED:
+        return load_stored_series(conn, machine.id, sensor_type, start, end)
+    heartbeat = timedelta(seconds=DeadbandConfig.HEARTBEAT)
+    series = load_stored_series(conn, machine.id, sensor_type, start - heartbeat, end)
+    return expand_steps(series, sample_period_for(machine), to_unix(start), to_unix(end), DeadbandConfig.HEARTBEAT)
+
+def recent_readings(machine, sensor_type, limit=20):
+    """Newest-first last ``limit`` readings of one sensor, reconstructed under deadband storage"""
+    if not DeadbandConfig.ENABLED:
+        return query_readings(machine.id, sensor_type, limit=limit)
+    end = datetime.utcnow()
+    start = end - timedelta(seconds=limit * sample_period_for(machine) + DeadbandConfig.HEARTBEAT)
+    with db.engine.connect() as conn:
+        series = load_raw_series(conn, machine, sensor_type, start, end)
+    unit = MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {}).get(sensor_type, {}).get('unit')
+    count = len(series)
+    return [
+        StoredReading(machine.id, sensor_type, float(series.value[i]), unit, bool(series.is_anomaly[i]),
+                      float(series.anomaly_score[i]), datetime(1970, 1, 1) + timedelta(seconds=float(series.t[i])))
+        for i in range(count - 1, max(count - limit, 0) - 1, -1)
+    ]
+
+def load_downsampled_history(machine, history_range):
+    """Per-sensor chart points for a time range, downsampled in NumPy
+
+    Reads from the coarsest rollup tier that still gives max_points over
+    the range, and from raw readings only for fine-grained requests.
+    """
+    start, end, max_points, method = history_range
+    sensor_configs = MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {})
+    tier = choose_tier(start, end, max_points, retention=RollupConfig.RETENTION_DAYS) if RollupConfig.ENABLED else 'raw'
+
+    sensor_data = {}
+    source_points = {}
+    with db.engine.connect() as conn:
+        for sensor_type, sensor_config in sensor_configs.items():
+            if tier == 'raw':
+                series = load_raw_series(conn, machine, sensor_type, start, end)
+                points = downsample(series, max_points, sensor_config['unit'], to_unix(start), to_unix(end), method)
+            else:
+                series = load_aggregate_series(
+                    conn, ROLLUP_TABLES, SensorReading.__table__, tier, machine.id, sensor_type, start, end,
+                    store=reading_store, expand=expand_stored_series if DeadbandConfig.ENABLED else None,
+                    lookback=DeadbandConfig.HEARTBEAT
+                )
+                points = aggregate_points(series, max_points, sensor_config['unit'], to_unix(start), to_unix(end), method)
+            source_points[sensor_type] = len(series)
+            sensor_data[sensor_type] = points
+
+    return sensor_data, {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'max_points': max_points,
+        'method': method,
+        'tier': tier,
+        'source_points': source_points
+    }
+
 @app.route('/api/machine/<int:machine_id>/historical-data')
 def get_machine_historical_data(machine_id):
-    """Get historical sensor data for charts"""
+    """Get historical sensor data for charts
+
+    Optional ``start``/``end`` (ISO-8601, UTC), ``max_points`` and
+    ``method`` (lttb or minmax) return a downsampled time range instead
+    of the last 20 readings.
+    """
+    try:
+        history_range = parse_history_range()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     try:
         machine = Machine.query.get_or_404(machine_id)
         
+        if history_range:
+            sensor_data, downsampling = load_downsampled_history(machine, history_range)
+            return jsonify({
+                'success': True,
+                'machine': machine.to_dict(),
+                'sensor_data': sensor_data,
+                'downsampling': downsampling,
+                'timestamp': datetime.now().isoformat()
+            })
+        
         # Get last 20 readings for each sensor
         sensor_data = {}
         
         # Get unique sensor types for this machine
-        sensor_types = db.session.query(SensorReading.sensor_type).filter_by(
-            machine_id=machine_id
-        ).distinct().all()
-        
-        for (sensor_type,) in sensor_types:
-            readings = SensorReading.query.filter_by(
-                machine_id=machine_id,
-                sensor_type=sensor_type
-            ).order_by(SensorReading.timestamp.desc()).limit(20).all()
+        for sensor_type in stored_sensor_types(machine_id):
+            readings = recent_readings(machine, sensor_type)
             
             sensor_data[sensor_type] = [
                 {
@@ -1122,7 +1440,16 @@ def set_individual_sensor_maintenance(machine_id, sensor_type):
 
 @app.route('/api/machine/<int:machine_id>/chart-data')
 def get_machine_chart_data(machine_id):
-    """Get historical sensor data for charts - DATETIME SCOPE FIXED"""
+    """Get historical sensor data for charts - DATETIME SCOPE FIXED
+
+    Accepts the same ``start``/``end``/``max_points``/``method`` arguments
+    as historical-data; ranged requests never fall back to sample data.
+    """
+    try:
+        history_range = parse_history_range()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     try:
         # Import datetime at function level to avoid scope issues
         from datetime import datetime, timedelta
@@ -1145,16 +1472,28 @@ def get_machine_chart_data(machine_id):
                 'error': f'No sensor configuration found for machine type: {machine.machine_type}'
             })
         
+        if history_range:
+            sensor_data, downsampling = load_downsampled_history(machine, history_range)
+            return jsonify({
+                'success': True,
+                'machine': {
+                    'id': machine.id,
+                    'name': machine.name,
+                    'type': machine.machine_type,
+                    'status': machine.status
+                },
+                'sensor_data': sensor_data,
+                'downsampling': downsampling,
+                'timestamp': datetime.now().isoformat()
+            })
+        
         # Get historical data for each sensor
         sensor_data = {}
         current_time = datetime.now()
         
         for sensor_type in sensor_configs.keys():
             # Get last 20 readings for this sensor
-            readings = SensorReading.query.filter_by(
-                machine_id=machine_id,
-                sensor_type=sensor_type
-            ).order_by(SensorReading.timestamp.desc()).limit(20).all()
+            readings = recent_readings(machine, sensor_type)
             
             if readings and len(readings) > 5:
                 # Use real data if we have enough readings
@@ -1357,36 +1696,7 @@ def set_individual_sensor_maintenance_v2(machine_id, sensor_type):
                 'error': f'Machine with ID {machine_id} not found'
             })
         
-        # Set sensor to maintenance mode
-        try:
-            health = sensor_health_tracker.set_maintenance_mode(machine_id, sensor_type)
-        except:
-            # Fallback if sensor health tracker not working
-            health = random.uniform(30, 50)
-        
-        # Create an alert
-        alert = Alert(
-            machine_id=machine_id,
-            alert_type='maintenance',
-            severity='medium',
-            title=f'Sensor Maintenance: {sensor_type}',
-            message=f'Individual sensor {sensor_type} on {machine.name} set to maintenance mode',
-            sensor_data=json.dumps({
-                'sensor_type': sensor_type,
-                'health_percentage': health,
-                'maintenance_type': 'individual_sensor'
-            })
-        )
-        db.session.add(alert)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Sensor {sensor_type} set to maintenance mode',
-            'sensor_health': health,
-            'machine_id': machine_id,
-            'sensor_type': sensor_type
-        })
+        return jsonify(set_sensor_maintenance(machine, sensor_type))
         
     except Exception as e:
         print(f"Error in sensor maintenance endpoint: {e}")
@@ -1395,6 +1705,42 @@ def set_individual_sensor_maintenance_v2(machine_id, sensor_type):
             'error': str(e)
         })
 
+def set_sensor_maintenance(machine, sensor_type):
+    """Put one sensor into maintenance; shared by HTTP and WebSocket"""
+    machine_id = machine.id
+
+    # Set sensor to maintenance mode
+    try:
+        health = sensor_health_tracker.set_maintenance_mode(machine_id, sensor_type)
+    except:
+        # Fallback if sensor health tracker not working
+        health = random.uniform(30, 50)
+    
+    # Create an alert
+    alert = Alert(
+        machine_id=machine_id,
+        alert_type='maintenance',
+        severity='medium',
+        title=f'Sensor Maintenance: {sensor_type}',
+        message=f'Individual sensor {sensor_type} on {machine.name} set to maintenance mode',
+        sensor_data=json.dumps({
+            'sensor_type': sensor_type,
+            'health_percentage': health,
+            'maintenance_type': 'individual_sensor'
+        })
+    )
+    db.session.add(alert)
+    db.session.commit()
+    push_live_health([machine_id])
+    
+    return {
+        'success': True,
+        'message': f'Sensor {sensor_type} set to maintenance mode',
+        'sensor_health': health,
+        'machine_id': machine_id,
+        'sensor_type': sensor_type
+    }
+
 @app.route('/debug/fix-sample-data/<int:machine_id>')
 def fix_sample_data(machine_id):
     """Generate sample data to fix chart issues"""
@@ -1409,10 +1755,7 @@ def fix_sample_data(machine_id):
         import random
         from datetime import datetime, timedelta
         
-        # Delete old readings to avoid clutter
-        SensorReading.query.filter_by(machine_id=machine_id).delete()
-        
-        generated_count = 0
+        rows = []
         
         # Generate 15 readings for each sensor over the last 30 minutes
         for sensor_type, sensor_config in sensor_configs.items():
@@ -1432,20 +1775,27 @@ def fix_sample_data(machine_id):
                 is_anomaly = random.random() < 0.15
                 anomaly_score = random.uniform(0.4, 0.8) if is_anomaly else random.uniform(0, 0.3)
                 
-                reading = SensorReading(
-                    machine_id=machine_id,
-                    sensor_type=sensor_type,
-                    value=round(value, 2),
-                    unit=sensor_config['unit'],
-                    is_anomaly=is_anomaly,
-                    anomaly_score=round(anomaly_score, 3),
-                    timestamp=timestamp
-                )
-                
-                db.session.add(reading)
-                generated_count += 1
+                rows.append({
+                    'machine_id': machine_id,
+                    'sensor_type': sensor_type,
+                    'value': round(value, 2),
+                    'unit': sensor_config['unit'],
+                    'is_anomaly': is_anomaly,
+                    'anomaly_score': round(anomaly_score, 3),
+                    'timestamp': timestamp
+                })
         
-        db.session.commit()
+        # Delete old readings to avoid clutter
+        if deadband_filter is not None:
+            deadband_filter.forget(machine_id)
+        if reading_store is not None:
+            reading_store.delete_machine(machine_id)
+            reading_store.append(rows)
+        else:
+            SensorReading.query.filter_by(machine_id=machine_id).delete()
+            db.session.add_all(SensorReading(**row) for row in rows)
+            db.session.commit()
+        generated_count = len(rows)
         
         return jsonify({
             'success': True,
@@ -1464,32 +1814,30 @@ def fix_sample_data(machine_id):
 ####
 @app.route('/api/machine/<int:machine_id>/live-stream')
 def get_live_sensor_stream(machine_id):
-    """Stream live sensor data (for real-time updates)"""
+    """Stream live sensor data (for real-time updates)
+
+    EventSource clients (Accept: text/event-stream) get a push stream of
+    every tick; other clients get the current readings as JSON.
+    """
+    if request.accept_mimetypes.best == 'text/event-stream':
+        Machine.query.get_or_404(machine_id)
+        return live_stream_response({machine_id})
+
     try:
         machine = Machine.query.get_or_404(machine_id)
         
-        # Get the most recent reading for each sensor
+        # Get the most recent reading for each sensor from the current-state table
         latest_readings = {}
         
-        sensor_types = db.session.query(SensorReading.sensor_type).filter_by(
-            machine_id=machine_id
-        ).distinct().all()
-        
-        for (sensor_type,) in sensor_types:
-            reading = SensorReading.query.filter_by(
-                machine_id=machine_id,
-                sensor_type=sensor_type
-            ).order_by(SensorReading.timestamp.desc()).first()
-            
-            if reading:
-                latest_readings[sensor_type] = {
-                    'value': reading.value,
-                    'unit': reading.unit,
-                    'is_anomaly': reading.is_anomaly,
-                    'anomaly_score': reading.anomaly_score,
-                    'timestamp': reading.timestamp.isoformat(),
-                    'health': sensor_health_tracker.get_sensor_health(machine_id, sensor_type)[0]
-                }
+        for reading in SensorCurrent.query.filter_by(machine_id=machine_id).all():
+            latest_readings[reading.sensor_type] = {
+                'value': reading.value,
+                'unit': reading.unit,
+                'is_anomaly': reading.is_anomaly,
+                'anomaly_score': reading.anomaly_score,
+                'timestamp': reading.timestamp.isoformat(),
+                'health': sensor_health_tracker.get_sensor_health(machine_id, reading.sensor_type)[0]
+            }
         
         return jsonify({
             'success': True,
@@ -1510,7 +1858,34 @@ def get_live_sensor_stream(machine_id):
 # 🚀 SENSOR HEALTH TRACKING SYSTEM
 # =============================================================================
 
+SENSOR_HEALTH_DDL = '''
+    CREATE TABLE IF NOT EXISTS sensor_health (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        machine_id INTEGER,
+        sensor_type TEXT,
+        health_percentage REAL DEFAULT 100.0,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status TEXT DEFAULT 'healthy',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(machine_id, sensor_type)
+    )
+'''
+
 class SensorHealthTracker:
+    """Sensor health kept in memory as reference points in a FleetHealthEngine
+
+    Reads evaluate the closed-form degradation, for one machine or the
+    whole fleet in one NumPy pass, and never touch the disk. sensor_health
+    is loaded once. Changed sensors are flushed back in one executemany:
+    right away for mode changes, and by the maintenance scheduler
+    (HealthConfig.FLUSH_INTERVAL) for everything else. Every public call is
+    timed into a per-method latency histogram (see stats()).
+    """
+
+    TIMED = ('initialize_sensor_health', 'initialize_sensors', 'get_sensor_health', 'update_sensor_health',
+             'set_maintenance_mode', 'set_sabotage_mode', 'get_fleet_sensor_health', 'get_all_machine_sensor_health',
+             'flush')
+
     def __init__(self):
         self.health_degradation_rates = {
             "temperature": 0.5,      # % per hour
@@ -1527,137 +1902,171 @@ class SensorHealthTracker:
             "outlet_temp": 0.5,
             "pressure_drop": 0.4
         }
-        
+        self.latency = {name: LatencyHistogram() for name in self.TIMED}
+        self._table_ready = False
+        self._lock = threading.Lock()
+        # Held from snapshot to commit so overlapping flushes land in order
+        self._flush_lock = threading.Lock()
+        self._engine = None
+        self._dirty = set()
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    def ensure_table(self, conn):
+        """Create sensor_health once per process rather than on every initialization"""
+        if not self._table_ready:
+            conn.execute(SENSOR_HEALTH_DDL)
+            self._table_ready = True
+
+    def _load(self):
+        """The FleetHealthEngine, filled from sensor_health on first use (call with the lock held)"""
+        if self._engine is None:
+            with sqlite_db.reader() as conn:
+                try:
+                    rows = conn.execute(
+                        'SELECT machine_id, sensor_type, health_percentage, last_updated, status FROM sensor_health'
+                    ).fetchall()
+                except sqlite3.OperationalError:
+                    rows = []
+            self._engine = FleetHealthEngine(self.health_degradation_rates)
+            for machine_id, sensor_type, health, last_updated, status in rows:
+                self._engine.set(machine_id, sensor_type, health, datetime.fromisoformat(last_updated).timestamp(),
+                                 shutdown=status == 'shutdown')
+        return self._engine
+
+    def _set(self, machine_id, sensor_type, health, status, now):
+        """Replace one reference point and mark it for the next flush (call with the lock held)"""
+        self._load().set(machine_id, sensor_type, health, now.timestamp(), shutdown=status == 'shutdown')
+        self._dirty.add((machine_id, sensor_type))
+
+    def _evaluate(self, machine_id, sensor_types, now):
+        """HealthSnapshot of one machine's sensors, starting untracked ones at 100% (call with the lock held)"""
+        engine = self._load()
+        for sensor_type in sensor_types:
+            if (machine_id, sensor_type) not in engine:
+                self._set(machine_id, sensor_type, 100.0, 'healthy', now)
+        return engine.evaluate(now.timestamp(), np.array([engine.index[(machine_id, sensor_type)]
+                                                          for sensor_type in sensor_types], dtype=np.int64))
+
+    def flush(self):
+        """Write every changed reference point in one transaction; returns the rows written"""
+        with self.latency['flush'].time():
+            with self._flush_lock:
+                with self._lock:
+                    keys, self._dirty = self._dirty, set()
+                    rows = []
+                    for machine_id, sensor_type in keys:
+                        health, when, _, shutdown = self._engine.state((machine_id, sensor_type))
+                        rows.append((machine_id, sensor_type, health, datetime.fromtimestamp(when).isoformat(),
+                                     'shutdown' if shutdown else self.calculate_status(health)))
+                if not rows:
+                    return 0
+                try:
+                    with sqlite_db.writer() as conn:
+                        self.ensure_table(conn)
+                        conn.executemany('''
+                            INSERT INTO sensor_health (machine_id, sensor_type, health_percentage, last_updated, status)
+                            VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(machine_id, sensor_type) DO UPDATE SET
+                                health_percentage = excluded.health_percentage,
+                                last_updated = excluded.last_updated,
+                                status = excluded.status
+                        ''', rows)
+                except Exception:
+                    with self._lock:
+                        self._dirty |= keys
+                    raise
+                with self._lock:
+                    self.flushes += 1
+                    self.rows_flushed += len(rows)
+                return len(rows)
+
+    def reset(self):
+        """Forget every sensor, in memory and in sensor_health"""
+        with self._flush_lock:
+            with self._lock:
+                self._load().clear()
+                self._dirty = set()
+            with sqlite_db.writer() as conn:
+                self.ensure_table(conn)
+                conn.execute('DELETE FROM sensor_health')
+
     def initialize_sensor_health(self, machine_id, sensor_type):
         """Initialize sensor health at 100% when first created"""
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        # Create sensor_health table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sensor_health (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                machine_id INTEGER,
-                sensor_type TEXT,
-                health_percentage REAL DEFAULT 100.0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'healthy',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(machine_id, sensor_type)
-            )
-        ''')
-        
-        # Insert or update sensor health
-        cursor.execute('''
-            INSERT OR REPLACE INTO sensor_health 
-            (machine_id, sensor_type, health_percentage, last_updated, status)
-            VALUES (?, ?, 100.0, ?, 'healthy')
-        ''', (machine_id, sensor_type, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
-    
+        with self.latency['initialize_sensor_health'].time():
+            self.initialize_sensors([(machine_id, sensor_type)])
+
+    def initialize_sensors(self, sensors):
+        """Reset (machine_id, sensor_type) pairs to 100% and flush them"""
+        with self.latency['initialize_sensors'].time():
+            now = datetime.now()
+            with self._lock:
+                for machine_id, sensor_type in sensors:
+                    self._set(machine_id, sensor_type, 100.0, 'healthy', now)
+            self.flush()
+
     def get_sensor_health(self, machine_id, sensor_type):
         """Get current sensor health with time-based degradation"""
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT health_percentage, last_updated, status 
-            FROM sensor_health 
-            WHERE machine_id = ? AND sensor_type = ?
-        ''', (machine_id, sensor_type))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
-            # Initialize if not exists
-            self.initialize_sensor_health(machine_id, sensor_type)
-            return 100.0, 'healthy'
-            
-        current_health, last_updated_str, status = result
-        last_updated = datetime.fromisoformat(last_updated_str)
-        
-        # Calculate time-based degradation
-        hours_passed = (datetime.now() - last_updated).total_seconds() / 3600
-        degradation_rate = self.health_degradation_rates.get(sensor_type, 0.5)
-        
-        # Apply degradation
-        if status != 'shutdown':  # Don't degrade if shutdown
-            health_loss = degradation_rate * hours_passed
-            new_health = max(0, current_health - health_loss)
-            
-            # Update database
-            self.update_sensor_health(machine_id, sensor_type, new_health)
-            return new_health, self.calculate_status(new_health)
-        else:
-            return current_health, status
-    
+        with self.latency['get_sensor_health'].time():
+            with self._lock:
+                _, health, status, _ = next(self._evaluate(machine_id, [sensor_type], datetime.now()).items())
+            return health, status
+
     def update_sensor_health(self, machine_id, sensor_type, health_percentage):
-        """Update sensor health in database"""
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        status = self.calculate_status(health_percentage)
-        
-        cursor.execute('''
-            UPDATE sensor_health 
-            SET health_percentage = ?, last_updated = ?, status = ?
-            WHERE machine_id = ? AND sensor_type = ?
-        ''', (health_percentage, datetime.now().isoformat(), status, machine_id, sensor_type))
-        
-        conn.commit()
-        conn.close()
-    
+        """Set sensor health; written to sensor_health by the next flush"""
+        with self.latency['update_sensor_health'].time():
+            with self._lock:
+                self._set(machine_id, sensor_type, health_percentage,
+                          self.calculate_status(health_percentage), datetime.now())
+
     def set_maintenance_mode(self, machine_id, sensor_type):
         """Set sensor to maintenance mode - accelerated degradation"""
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        # Reduce health to 30-50% range for maintenance mode
-        maintenance_health = random.uniform(30, 50)
-        
-        cursor.execute('''
-            UPDATE sensor_health 
-            SET health_percentage = ?, last_updated = ?, status = 'degrading'
-            WHERE machine_id = ? AND sensor_type = ?
-        ''', (maintenance_health, datetime.now().isoformat(), machine_id, sensor_type))
-        
-        conn.commit()
-        conn.close()
-        
-        return maintenance_health
-    
+        return self.set_machine_maintenance(machine_id, [sensor_type])[sensor_type]
+
+    def set_machine_maintenance(self, machine_id, sensor_types):
+        """Maintenance mode for several sensors, flushed at once: {sensor_type: health}"""
+        with self.latency['set_maintenance_mode'].time():
+            # Reduce health to 30-50% range for maintenance mode
+            healths = {sensor_type: random.uniform(30, 50) for sensor_type in sensor_types}
+            now = datetime.now()
+            with self._lock:
+                for sensor_type, health in healths.items():
+                    self._set(machine_id, sensor_type, health, 'degrading', now)
+            self.flush()
+            return healths
+
     def set_sabotage_mode(self, machine_id, sensor_type):
         """Set sensor to sabotage - health drops to 0%"""
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE sensor_health 
-            SET health_percentage = 0.0, last_updated = ?, status = 'shutdown'
-            WHERE machine_id = ? AND sensor_type = ?
-        ''', (datetime.now().isoformat(), machine_id, sensor_type))
-        
-        conn.commit()
-        conn.close()
-        
-        return 0.0
-    
+        return self.set_machine_sabotage(machine_id, [sensor_type])[sensor_type]
+
+    def set_machine_sabotage(self, machine_id, sensor_types):
+        """Sabotage several sensors, flushed at once: {sensor_type: 0.0}"""
+        with self.latency['set_sabotage_mode'].time():
+            now = datetime.now()
+            with self._lock:
+                for sensor_type in sensor_types:
+                    self._set(machine_id, sensor_type, 0.0, 'shutdown', now)
+            self.flush()
+            return {sensor_type: 0.0 for sensor_type in sensor_types}
+
     def calculate_status(self, health_percentage):
         """Calculate sensor status based on health percentage"""
-        if health_percentage <= 0:
-            return 'shutdown'
-        elif health_percentage < 20:
-            return 'critical' 
-        elif health_percentage < 50:
-            return 'degrading'
-        elif health_percentage < 80:
-            return 'warning'
-        else:
-            return 'healthy'
-    
+        return status_name(health_percentage)
+
+    def snapshot(self, now=None):
+        """HealthSnapshot of every tracked sensor, in one vectorized pass"""
+        now = now or datetime.now()
+        with self._lock:
+            return self._load().evaluate(now.timestamp())
+
+    def get_fleet_sensor_health(self):
+        """Health for every tracked sensor: {machine_id: {sensor_type: (health, status)}}"""
+        with self.latency['get_fleet_sensor_health'].time():
+            fleet_health = {}
+            for (machine_id, sensor_type), health, status, _ in self.snapshot().items():
+                fleet_health.setdefault(machine_id, {})[sensor_type] = (health, status)
+            return fleet_health
+
     def get_all_machine_sensor_health(self, machine_id):
         """Get health for all sensors of a machine"""
         machine = Machine.query.get(machine_id)
@@ -1666,17 +2075,32 @@ class SensorHealthTracker:
             
         machine_config = MACHINES_CONFIG.get(machine.machine_type, {})
         sensor_configs = machine_config.get('sensors', {})
-        
-        sensor_health = {}
-        for sensor_type in sensor_configs.keys():
-            health, status = self.get_sensor_health(machine_id, sensor_type)
-            sensor_health[sensor_type] = {
-                'health_percentage': round(health, 1),
-                'status': status,
-                'sensor_type': sensor_type
+
+        with self.latency['get_all_machine_sensor_health'].time():
+            with self._lock:
+                snapshot = self._evaluate(machine_id, list(sensor_configs), datetime.now())
+            return {
+                sensor_type: {
+                    'health_percentage': round(health, 1),
+                    'status': status,
+                    'sensor_type': sensor_type,
+                    'remaining_useful_life_hours': round(rul, 1) if math.isfinite(rul) else None
+                }
+                for (_, sensor_type), health, status, rul in snapshot.items()
             }
-            
-        return sensor_health
+
+    def stats(self):
+        """Tracked/unflushed sensor counts and per-method latency histograms (ms)"""
+        with self._lock:
+            summary = {
+                'sensors': len(self._engine or ()),
+                'dirty': len(self._dirty),
+                'flushes': self.flushes,
+                'rows_flushed': self.rows_flushed
+            }
+        summary['latency'] = {name: histogram.to_dict() for name, histogram in self.latency.items()
+                              if histogram.stats.count}
+        return summary
 
 # Initialize sensor health tracker
 sensor_health_tracker = SensorHealthTracker()
@@ -1713,6 +2137,10 @@ class Machine(db.Model):
 
 class SensorReading(db.Model):
     __tablename__ = 'sensor_readings'
+    __table_args__ = (
+        # Hot read paths filter by machine + sensor and order by newest first
+        db.Index('ix_sensor_readings_machine_sensor_ts', 'machine_id', 'sensor_type', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), nullable=False)
@@ -1735,6 +2163,37 @@ class SensorReading(db.Model):
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+class SensorCurrent(db.Model):
+    __tablename__ = 'sensor_current'
+
+    machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), primary_key=True)
+    sensor_type = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    is_anomaly = db.Column(db.Boolean, default=False)
+    anomaly_score = db.Column(db.Float, default=0.0)
+    timestamp = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'machine_id': self.machine_id,
+            'sensor_type': self.sensor_type,
+            'value': self.value,
+            'unit': self.unit,
+            'is_anomaly': self.is_anomaly,
+            'anomaly_score': self.anomaly_score,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        }
+
+# 1-minute, 1-hour and 1-day aggregates of sensor_readings (see models/rollups.py)
+ROLLUP_TABLES = rollup_tables(db.metadata)
+
+# Gorilla-compressed blocks of archived sensor_readings (see models/archive.py)
+READING_ARCHIVE = archive_table(db.metadata)
+
+# Sensor dictionary + WITHOUT ROWID readings (see models/compact_readings.py)
+COMPACT_READING_TABLES = compact_reading_tables(db.metadata)
+
 class Alert(db.Model):
     __tablename__ = 'alerts'
 
@@ -1771,6 +2230,88 @@ class Alert(db.Model):
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
         }
 
+if StorageConfig.READING_BACKEND not in READING_BACKENDS:
+    raise ValueError(f"READING_BACKEND must be one of {', '.join(READING_BACKENDS)}")
+
+def deadband_tolerance(machine_id, sensor_type):
+    """Deadband of one sensor, or None to store every reading while the machine is not in a deadband mode"""
+    machine = machine_registry.get(machine_id)
+    if machine is None or machine.status not in DeadbandConfig.MODES:
+        return None
+    if sensor_type in DeadbandConfig.TOLERANCES:
+        return DeadbandConfig.TOLERANCES[sensor_type]
+    sensor_config = machine.sensor_configs.get(sensor_type)
+    if sensor_config is None:
+        return None
+    low, high = sensor_config['normal_range']
+    return (high - low) * DeadbandConfig.TOLERANCE
+
+def expand_stored_series(machine_id, sensor_type, series, start, end):
+    """Deadband-stored readings of one sensor held at its machine's sample period over [start, end]"""
+    machine = machine_registry.get(machine_id)
+    period = sample_period_for(machine) if machine is not None else GenerationConfig.DEFAULT_SAMPLE_PERIOD
+    return expand_steps(series, period, to_unix(start), to_unix(end), DeadbandConfig.HEARTBEAT)
+
+# Core-level bulk writer for a whole tick of sensor readings
+with app.app_context():
+    # One write gate and pragma profile for the ORM engine and raw sqlite3 access
+    sqlite_db = SQLiteDatabase(db.engine.url.database, DatabaseConfig.PRAGMAS,
+                               read_pool_size=DatabaseConfig.READ_POOL_SIZE, busy_timeout=DatabaseConfig.BUSY_TIMEOUT)
+    sqlite_db.install(db.engine)
+    health_history = HealthHistory(sqlite_db, HealthConfig.HISTORY_RETENTION_DAYS)
+
+    # Raw readings live in sensor_readings unless another backend is selected
+    reading_store = None
+    if StorageConfig.READING_BACKEND == 'columnar':
+        reading_store = ColumnarStore(
+            StorageConfig.COLUMNAR_PATH,
+            segment_rows=StorageConfig.COLUMNAR_SEGMENT_ROWS,
+            max_open_segments=StorageConfig.COLUMNAR_OPEN_SEGMENTS
+        )
+    elif StorageConfig.READING_BACKEND == 'compact':
+        reading_store = CompactReadingStore(db.engine, *COMPACT_READING_TABLES)
+
+    # Keep sensor_current in step with every tick, in the same transaction
+    current_state_hooks = [current_state_hook(SensorCurrent.__table__)]
+    deadband_filter = DeadbandFilter(deadband_tolerance, DeadbandConfig.HEARTBEAT) if DeadbandConfig.ENABLED else None
+    if reading_store is not None:
+        reading_writer = StoreReadingWriter(reading_store, db.engine, after_insert=current_state_hooks,
+                                            row_filter=deadband_filter)
+    else:
+        reading_writer = BulkReadingWriter(db.engine, SensorReading.__table__, after_insert=current_state_hooks,
+                                           row_filter=deadband_filter)
+    rollup_pipeline = RollupPipeline(
+        db.engine, SensorReading.__table__, ROLLUP_TABLES,
+        retention=RollupConfig.RETENTION_DAYS, grace=RollupConfig.GRACE, store=reading_store,
+        expand=expand_stored_series if DeadbandConfig.ENABLED else None, lookback=DeadbandConfig.HEARTBEAT
+    )
+    reading_archive = ReadingArchive(
+        db.engine, SensorReading.__table__, READING_ARCHIVE, block_seconds=ArchiveConfig.BLOCK_SECONDS
+    ) if ArchiveConfig.ENABLED and reading_store is None else None
+
+# Absolute-deadline scheduler driving data generation
+generation_scheduler = FixedRateScheduler()
+
+# Separate scheduler for slow background maintenance so it never delays a tick
+maintenance_scheduler = FixedRateScheduler()
+generation_count = 0
+
+# Write-behind buffer so the generator never waits on a SQLite commit
+reading_buffer = WriteBehindBuffer(
+    reading_writer,
+    max_rows=GenerationConfig.BUFFER_MAX_ROWS,
+    flush_rows=GenerationConfig.BUFFER_FLUSH_ROWS,
+    flush_interval=GenerationConfig.BUFFER_FLUSH_INTERVAL,
+    overflow=GenerationConfig.BUFFER_OVERFLOW,
+    block_timeout=GenerationConfig.BUFFER_BLOCK_TIMEOUT
+)
+
+# In-process fan-out of each tick to Server-Sent Events clients
+live_hub = LiveHub(max_queue=DashboardConfig.LIVE_QUEUE_SIZE)
+
+# Versioned latest values behind the WebSocket delta frames
+live_state = LiveState()
+
 # =============================================================================
 # 🚀 FLASK ROUTES
 # =============================================================================
@@ -1807,20 +2348,11 @@ def api_machines():
 @app.route('/api/machine/<int:machine_id>/latest')
 def api_machine_latest(machine_id):
     """Get latest sensor readings for a machine"""
-    latest_readings = {}
     machine = Machine.query.get_or_404(machine_id)
 
-    sensor_types = db.session.query(SensorReading.sensor_type).filter_by(machine_id=machine_id).distinct().all()
-    sensor_types = [s[0] for s in sensor_types]
-
-    for sensor_type in sensor_types:
-        reading = SensorReading.query.filter_by(
-            machine_id=machine_id, 
-            sensor_type=sensor_type
-        ).order_by(SensorReading.timestamp.desc()).first()
-
-        if reading:
-            latest_readings[sensor_type] = reading.to_dict()
+    # O(sensors) read from the maintained current-state table
+    current = SensorCurrent.query.filter_by(machine_id=machine_id).all()
+    latest_readings = {reading.sensor_type: reading.to_dict() for reading in current}
 
     return jsonify({
         'machine': machine.to_dict(),
@@ -1942,15 +2474,181 @@ def get_machine_sensor_health(machine_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+
+@app.route('/api/machine/<int:machine_id>/sensor-health/history')
+def get_machine_sensor_health_history(machine_id):
+    """Sampled health per sensor over a time range, downsampled like historical-data
+
+    Accepts ``start``/``end``/``max_points``/``method``; without them the
+    last HealthConfig.HISTORY_DEFAULT_WINDOW seconds are returned.
+    """
+    try:
+        history_range = parse_history_range()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        machine = Machine.query.get_or_404(machine_id)
+        if history_range is None:
+            end = datetime.utcnow()
+            history_range = (end - timedelta(seconds=HealthConfig.HISTORY_DEFAULT_WINDOW), end,
+                             DashboardConfig.HISTORY_DEFAULT_POINTS, 'lttb')
+        start, end, max_points, method = history_range
+
+        sensor_history = {}
+        for sensor_type in MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {}):
+            series = health_history.series(machine_id, sensor_type, to_unix(start), to_unix(end))
+            sensor_history[sensor_type] = downsample(series, max_points, '%', to_unix(start), to_unix(end), method)
+
+        return jsonify({
+            'success': True,
+            'machine': machine.to_dict(),
+            'sensor_health_history': sensor_history,
+            'interval_seconds': HealthConfig.HISTORY_INTERVAL,
+            'start': start.isoformat(),
+            'end': end.isoformat()
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/machine/<int:machine_id>/change-points/backtest')
+def backtest_machine_change_points(machine_id):
+    """Replay the machine's stored sensor_readings through the CUSUM settings of ChangePointConfig
+
+    Archived blocks are replayed before the raw rows. Read-only: no alerts are
+    raised and the live detector state is untouched.
+    """
+    if StorageConfig.READING_BACKEND != 'sqlite':
+        return jsonify({'success': False, 'error': 'Backtests read sensor_readings and its archive (SQLite backend only)'}), 400
+
+    try:
+        machine = Machine.query.get_or_404(machine_id)
+        detector = ChangePointDetector(ChangePointConfig.K, ChangePointConfig.H, ChangePointConfig.K_VAR,
+                                       ChangePointConfig.H_VAR, ChangePointConfig.WARMUP)
+        started = time.perf_counter()
+        with sqlite_db.reader() as conn:
+            events = backtest_change_points(conn, detector, machine_id)
+
+        return jsonify({
+            'success': True,
+            'machine': machine.to_dict(),
+            'change_points': [event.to_dict() for event in events],
+            'elapsed_seconds': round(time.perf_counter() - started, 3)
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+def load_fleet_snapshot():
+    """Build the fleet snapshot with three queries, independent of fleet size"""
+    machines = machine_registry.active_machines()
+    current_rows = SensorCurrent.query.all()
+    open_alerts = dict(
+        db.session.query(Alert.machine_id, db.func.count(Alert.id))
+        .filter_by(is_acknowledged=False)
+        .group_by(Alert.machine_id)
+        .all()
+    )
+    return build_fleet_snapshot(machines, current_rows, sensor_health_tracker.get_fleet_sensor_health(), open_alerts)
+
+fleet_snapshot_cache = SnapshotCache(load_fleet_snapshot, ttl=DashboardConfig.SNAPSHOT_TTL)
+
+def live_stream_response(machine_ids=None):
+    """Server-Sent Events response fed from the live hub (no per-client queries)"""
+    return Response(
+        sse_stream(live_hub, machine_ids, heartbeat=DashboardConfig.LIVE_HEARTBEAT),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/fleet/live-stream')
+def api_fleet_live_stream():
+    """Push every tick for the whole fleet, or for ?machines=1,2,3"""
+    machines = request.args.get('machines')
+    machine_ids = None
+    if machines:
+        try:
+            machine_ids = {int(machine_id) for machine_id in machines.split(',') if machine_id.strip()}
+        except ValueError:
+            return jsonify({'success': False, 'error': 'machines must be a comma-separated list of ids'}), 400
+    return live_stream_response(machine_ids)
+
+MACHINE_MODES = ('normal', 'maintenance', 'sabotage')
+
+def control_set_mode(message):
+    """WebSocket control: {"action": "set_mode", "machine_id": 1, "mode": "maintenance"}"""
+    machine = Machine.query.get(message.get('machine_id'))
+    if not machine:
+        return {'success': False, 'error': f"Machine with ID {message.get('machine_id')} not found"}
+    if message.get('mode') not in MACHINE_MODES:
+        return {'success': False, 'error': f"mode must be one of {', '.join(MACHINE_MODES)}"}
+    return set_machine_mode(machine, message['mode'])
+
+def control_set_maintenance(message):
+    """WebSocket control: {"action": "set_maintenance", "machine_id": 1, "sensor_type": "ph"}"""
+    machine = Machine.query.get(message.get('machine_id'))
+    if not machine:
+        return {'success': False, 'error': f"Machine with ID {message.get('machine_id')} not found"}
+    if message.get('sensor_type') not in MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {}):
+        return {'success': False, 'error': f"Unknown sensor {message.get('sensor_type')} for {machine.name}"}
+    return set_sensor_maintenance(machine, message['sensor_type'])
+
+LIVE_CONTROLS = {
+    'set_mode': control_set_mode,
+    'set_maintenance': control_set_maintenance
+}
+
+def serve_live_socket(ws):
+    """Run one WebSocket client: apply its messages, then send a delta frame when state changed"""
+    session = DeltaSession(live_state, LIVE_CONTROLS)
+    try:
+        while True:
+            # Waiting for client input doubles as the frame pacing
+            raw = ws.receive(timeout=DashboardConfig.WS_FRAME_INTERVAL)
+            while raw is not None:
+                try:
+                    replies = session.handle(json.loads(raw))
+                except ValueError:
+                    replies = [{'type': 'error', 'error': 'invalid JSON'}]
+                for reply in replies:
+                    ws.send(json.dumps(reply, default=str))
+                raw = ws.receive(timeout=0)
+
+            frame = session.next_frame()
+            if frame:
+                ws.send(json.dumps(frame, default=str, separators=(',', ':')))
+    except ConnectionClosed:
+        pass
+
+if WEBSOCKETS_AVAILABLE:
+    sock = Sock(app)
+
+    @sock.route('/ws/live')
+    def live_socket(ws):
+        """Subscribe to fleet/machine/sensor topics, receive delta frames, send control actions"""
+        serve_live_socket(ws)
+
+@app.route('/api/fleet/snapshot')
+def api_fleet_snapshot():
+    """Latest readings, health and open alert counts for every machine in one payload"""
+    try:
+        return jsonify(dict(fleet_snapshot_cache.get(), success=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/machine/<int:machine_id>/mode', methods=['POST'])
 def api_set_machine_mode_with_health(machine_id):
     """Enhanced machine mode with sensor health effects"""
-    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
-    
     data = request.get_json()
-    mode = data.get('mode', 'normal')
-
     machine = Machine.query.get_or_404(machine_id)
+    return jsonify(set_machine_mode(machine, data.get('mode', 'normal')))
+
+def set_machine_mode(machine, mode):
+    """Apply a mode change with its sensor health effects; shared by HTTP and WebSocket"""
+    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
+
+    machine_id = machine.id
     old_status = machine.status
     machine.status = mode
     machine.updated_at = datetime.utcnow()
@@ -1962,13 +2660,13 @@ def api_set_machine_mode_with_health(machine_id):
     # Handle sensor health based on mode
     if mode == 'maintenance':
         # Reduce sensor health to maintenance levels
-        degraded_sensors = {}
-        for sensor_type in sensor_types:
-            health = sensor_health_tracker.set_maintenance_mode(machine_id, sensor_type)
-            degraded_sensors[sensor_type] = {
+        degraded_sensors = {
+            sensor_type: {
                 'health_percentage': health,
                 'status': 'degrading'
             }
+            for sensor_type, health in sensor_health_tracker.set_machine_maintenance(machine_id, sensor_types).items()
+        }
         
         # Send maintenance alert email (with rate limiting)
         if machine_id not in sent_maintenance_emails:
@@ -1978,13 +2676,13 @@ def api_set_machine_mode_with_health(machine_id):
             
     elif mode == 'sabotage':
         # Kill all sensor health to 0%
-        failed_sensors = {}
-        for sensor_type in sensor_types:
-            sensor_health_tracker.set_sabotage_mode(machine_id, sensor_type)
-            failed_sensors[sensor_type] = {
-                'health_percentage': 0.0,
+        failed_sensors = {
+            sensor_type: {
+                'health_percentage': health,
                 'status': 'shutdown'
             }
+            for sensor_type, health in sensor_health_tracker.set_machine_sabotage(machine_id, sensor_types).items()
+        }
         
         # Set machine to shutdown status
         machine.status = 'shutdown'
@@ -1997,8 +2695,7 @@ def api_set_machine_mode_with_health(machine_id):
             
     elif mode == 'normal':
         # Reset health to 100% for normal operation
-        for sensor_type in sensor_types:
-            sensor_health_tracker.initialize_sensor_health(machine_id, sensor_type)
+        sensor_health_tracker.initialize_sensors([(machine_id, sensor_type) for sensor_type in sensor_types])
         
         # Reset flags
         sent_maintenance_emails.discard(machine_id)
@@ -2015,13 +2712,18 @@ def api_set_machine_mode_with_health(machine_id):
         sensor_data=json.dumps({'mode': mode, 'timestamp': datetime.now().isoformat()})
     ))
     db.session.commit()
+    machine_registry.update_status(machine_id, machine.status)
+    fleet_snapshot_cache.invalidate()
+    live_state.apply({machine_id: {'fields': {'status': machine.status}}})
+    push_live_health([machine_id])
 
-    return jsonify({
+    return {
         'success': True,
         'machine_id': machine_id,
         'new_mode': mode,
+        'status': machine.status,
         'message': f'Machine {machine.name} set to {mode} mode'
-    })
+    }
 
 @app.route('/api/alerts')
 def api_alerts():
@@ -2219,9 +2921,7 @@ def trigger_emergency_call(machine_id):
         machine = Machine.query.get_or_404(machine_id)
 
         # Get latest critical readings
-        latest_readings = db.session.query(SensorReading).filter_by(
-            machine_id=machine_id
-        ).order_by(SensorReading.timestamp.desc()).limit(4).all()
+        latest_readings = query_readings(machine_id, limit=4)
 
         # Format incident details
         critical_sensors = []
@@ -2311,6 +3011,32 @@ def test_call(call_type):
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/debug/generation-stats')
+def debug_generation_stats():
+    """Debug endpoint for data generation throughput"""
+    return jsonify({
+        'writer': reading_writer.stats(),
+        'buffer': reading_buffer.stats(),
+        'scheduler': generation_scheduler.stats(),
+        'maintenance_scheduler': maintenance_scheduler.stats(),
+        'rollups': rollup_pipeline.stats(),
+        'reading_store': reading_store.stats() if reading_store else None,
+        'archive': reading_archive.stats() if reading_archive else None,
+        'deadband': deadband_filter.stats() if deadband_filter else None,
+        'detector': streaming_detector.stats() if streaming_detector is not None else None,
+        'multivariate': multivariate_detector.stats() if multivariate_detector is not None else None,
+        'change_points': change_detector.stats() if change_detector is not None else None,
+        'database': sqlite_db.stats(),
+        'sensor_health': sensor_health_tracker.stats(),
+        'health_history': health_history.stats(),
+        'generation_count': generation_count,
+        'machine_registry': machine_registry.stats(),
+        'fleet_snapshot': fleet_snapshot_cache.stats(),
+        'live_hub': live_hub.stats(),
+        'live_state': live_state.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/debug/machines')
 def debug_machines():
     """Debug endpoint to check machine status"""
@@ -2367,6 +3093,53 @@ MACHINES_CONFIG = {
     }
 }
 
+# Whole-fleet tick engine compiled from MACHINES_CONFIG
+tick_engine = FleetTickEngine(MACHINES_CONFIG)
+
+# Per-sensor online statistics; state is restored from the last snapshot
+streaming_detector = None
+if DetectorConfig.ENABLED:
+    streaming_detector = StreamingDetector(DetectorConfig.EWMA_ALPHA, DetectorConfig.Z_THRESHOLD,
+                                           DetectorConfig.WARMUP, DetectorConfig.SCORE_CAP)
+    try:
+        streaming_detector.load(DetectorConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable detector snapshot: {e}")
+
+multivariate_detector = None
+if MultivariateConfig.ENABLED:
+    multivariate_detector = MultivariateDetector(MultivariateConfig.TAIL_Z, MultivariateConfig.WARMUP,
+                                                 MultivariateConfig.SHRINKAGE, MultivariateConfig.SCORE_CAP)
+    try:
+        multivariate_detector.load(MultivariateConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable multivariate snapshot: {e}")
+
+change_detector = None
+if ChangePointConfig.ENABLED:
+    change_detector = ChangePointDetector(ChangePointConfig.K, ChangePointConfig.H, ChangePointConfig.K_VAR,
+                                          ChangePointConfig.H_VAR, ChangePointConfig.WARMUP)
+    try:
+        change_detector.load(ChangePointConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable change point snapshot: {e}")
+
+def save_detector_state():
+    """Snapshot the online detector state so baselines survive a restart"""
+    if streaming_detector is not None:
+        streaming_detector.save(DetectorConfig.SNAPSHOT_PATH)
+    if multivariate_detector is not None:
+        multivariate_detector.save(MultivariateConfig.SNAPSHOT_PATH)
+    if change_detector is not None:
+        change_detector.save(ChangePointConfig.SNAPSHOT_PATH)
+
+# Cached active machines for the generator - updated on mode changes, reloaded when machines are added
+machine_registry = MachineRegistry(
+    lambda: Machine.query.filter_by(is_active=True).all(),
+    MACHINES_CONFIG,
+    tick_engine.compiled_types
+)
+
 def generate_sensor_value(sensor_type, sensor_config, machine_status='normal'):
     """Generate realistic sensor values based on machine status"""
     min_val = sensor_config['min']
@@ -2423,11 +3196,7 @@ def get_pre_incident_data(machine_id, incident_time, minutes_before=1):
         incident_dt = datetime.fromisoformat(incident_time)
         start_time = incident_dt - timedelta(minutes=minutes_before)
 
-        pre_incident_readings = SensorReading.query.filter(
-            SensorReading.machine_id == machine_id,
-            SensorReading.timestamp >= start_time,
-            SensorReading.timestamp < incident_dt
-        ).order_by(SensorReading.timestamp.desc()).limit(20).all()
+        pre_incident_readings = query_readings(machine_id, since=start_time, until=incident_dt, limit=20)
 
         formatted_data = []
         for reading in pre_incident_readings:
@@ -2457,21 +3226,30 @@ def detect_irregular_readings(current_readings):
 
     return irregular_sensors
 
-def generate_machine_data(machine):
-    """CORRECTED VERSION - Fixes email spam and adds Twilio integration"""
-    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
-    
+def build_machine_readings(machine, generated=None, current_time=None):
+    """Build sensor_readings rows for one machine without touching the session
+
+    ``generated`` is the machine's slice of a FleetTick
+    ({sensor_type: (value, is_anomaly, anomaly_score)}). When omitted the
+    values are drawn per sensor with generate_sensor_value.
+
+    Returns (rows, all_readings, critical_anomalies).
+    """
     machine_config = MACHINES_CONFIG.get(machine.machine_type)
     if not machine_config:
-        return
+        return [], {}, []
 
-    current_time = datetime.utcnow()
+    current_time = current_time or datetime.utcnow()
     critical_anomalies = []
     all_readings = {}
+    rows = []
 
     for sensor_type, sensor_config in machine_config['sensors'].items():
-        value = generate_sensor_value(sensor_type, sensor_config, machine.status)
-        is_anomaly, anomaly_score = detect_simple_anomaly(value, sensor_config, machine.status)
+        if generated is not None:
+            value, is_anomaly, anomaly_score = generated[sensor_type]
+        else:
+            value = generate_sensor_value(sensor_type, sensor_config, machine.status)
+            is_anomaly, anomaly_score = detect_simple_anomaly(value, sensor_config, machine.status)
 
         if is_anomaly and anomaly_score > 0.8:
             critical_anomalies.append((sensor_type, value, sensor_config['unit']))
@@ -2484,21 +3262,38 @@ def generate_machine_data(machine):
             'normal_range': f"{sensor_config['normal_range'][0]} - {sensor_config['normal_range'][1]} {sensor_config['unit']}"
         }
 
-        reading = SensorReading(
-            machine_id=machine.id,
-            sensor_type=sensor_type,
-            value=round(value, 2),
-            unit=sensor_config['unit'],
-            is_anomaly=is_anomaly,
-            anomaly_score=round(anomaly_score, 3),
-            timestamp=current_time
-        )
+        rows.append({
+            'machine_id': machine.id,
+            'sensor_type': sensor_type,
+            'value': round(value, 2),
+            'unit': sensor_config['unit'],
+            'is_anomaly': bool(is_anomaly),
+            'anomaly_score': round(anomaly_score, 3),
+            'timestamp': current_time
+        })
+
+    return rows, all_readings, critical_anomalies
 
-        db.session.add(reading)
+def generate_machine_data(machine, generated=None):
+    """Generate, store and alert on one machine's readings outside the fleet tick"""
+    current_time = datetime.utcnow()
+    rows, all_readings, critical_anomalies = build_machine_readings(machine, generated, current_time)
+    if not rows:
+        return
 
     try:
-        db.session.commit()
+        reading_writer.write(rows)
+    except Exception as e:
+        print(f"❌ Error saving readings: {e}")
+        return
 
+    process_machine_alerts(machine, all_readings, critical_anomalies, current_time)
+
+def process_machine_alerts(machine, all_readings, critical_anomalies, current_time):
+    """CORRECTED VERSION - Fixes email spam and adds Twilio integration"""
+    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
+
+    try:
         # 1. MAINTENANCE ALERT (with rate limiting to prevent spam)
         if machine.status == 'maintenance':
             irregular_sensors = detect_irregular_readings(all_readings)
@@ -2507,10 +3302,7 @@ def generate_machine_data(machine):
                 sent_maintenance_emails.add(machine.id)  # PREVENTS EMAIL SPAM
                 print(f"📧 Sending maintenance alert for {machine.name}")
 
-                recent_readings = SensorReading.query.filter(
-                    SensorReading.machine_id == machine.id,
-                    SensorReading.timestamp >= current_time - timedelta(minutes=5)
-                ).all()
+                recent_readings = query_readings(machine.id, since=current_time - timedelta(minutes=5))
 
                 enhanced_email_service.send_irregular_readings_alert(
                     machine=machine,
@@ -2617,69 +3409,220 @@ def generate_machine_data(machine):
         print(f"❌ Error in data generation: {e}")
         db.session.rollback()
 
-def start_data_generation():
-    """Main data generation loop"""
-    print("🚀 Starting real-time sensor data generation for 4 machines...")
-    generation_count = 0
+def sample_period_for(machine):
+    """Sampling period in seconds - per machine name, then per machine type"""
+    periods = GenerationConfig.SAMPLE_PERIODS
+    return periods.get(machine.name, periods.get(machine.machine_type, GenerationConfig.DEFAULT_SAMPLE_PERIOD))
 
-    while True:
-        try:
-            with app.app_context():
-                machines = Machine.query.filter_by(is_active=True).all()
+def run_generation_tick(sample_period):
+    """Generate one tick for every running machine sampled every ``sample_period`` seconds"""
+    global generation_count
 
-                for machine in machines:
-                    if machine.status != 'shutdown':
-                        generate_machine_data(machine)
+    try:
+        with app.app_context():
+            machines = machine_registry.active_machines()
+            running = [
+                m for m in machines
+                if m.status != 'shutdown' and sample_period_for(m) == sample_period
+            ]
+            if not running:
+                return
+
+            # One vectorized pass for the whole group
+            tick = tick_engine.tick([(m.id, m.machine_type, m.status) for m in running])
+            if streaming_detector is not None:
+                tick.is_anomaly, tick.anomaly_scores = streaming_detector.score_tick(tick)
+            if multivariate_detector is not None:
+                tick.is_anomaly, tick.anomaly_scores = multivariate_detector.score_tick(tick)
+            tick_time = datetime.utcnow()
+            change_events = change_detector.score_tick(tick, to_unix(tick_time)) if change_detector is not None else []
+
+            tick_rows = []
+            pending_alerts = []
+            live_events = []
+            for machine in running:
+                rows, all_readings, critical_anomalies = build_machine_readings(
+                    machine, tick.machine_readings(machine.id), tick_time
+                )
+                tick_rows.extend(rows)
+                pending_alerts.append((machine, all_readings, critical_anomalies))
+                live_events.append((machine, rows))
+
+            # Hand the tick to the writer thread; it group-commits in the background
+            reading_buffer.submit(tick_rows)
+
+            # Push the tick to live-stream and WebSocket clients straight from memory
+            live_updates = {}
+            for machine, rows in live_events:
+                payload = publish_live_readings(machine, rows, tick_time)
+                live_updates[machine.id] = {
+                    'fields': {'status': machine.status, 'updated_at': payload['timestamp']},
+                    'sensors': payload['readings']
+                }
+            live_state.apply(live_updates)
 
-                generation_count += 1
+            for machine, all_readings, critical_anomalies in pending_alerts:
+                process_machine_alerts(machine, all_readings, critical_anomalies, tick_time)
+            if change_events:
+                record_change_points(change_events, {machine.id: machine for machine in running})
 
-                if generation_count % 10 == 0:
-                    current_time = datetime.now().strftime('%H:%M:%S')
-                    print(f"📊 [{current_time}] Generated {generation_count} data cycles for {len(machines)} machines")
+            generation_count += 1
 
-        except Exception as e:
-            print(f"❌ Error in data generation: {e}")
+    except Exception as e:
+        print(f"❌ Error in data generation: {e}")
 
-        time.sleep(3)
+def record_change_points(events, machines):
+    """One 'change_point' Alert per machine for the ChangeEvents of a tick"""
+    by_machine = {}
+    for event in events:
+        by_machine.setdefault(event.machine_id, []).append(event)
+    for machine_id, machine_events in by_machine.items():
+        machine = machines[machine_id]
+        sensors = ', '.join(f'{event.sensor_type} ({event.direction})' for event in machine_events)
+        since = datetime.utcfromtimestamp(min(event.change_time for event in machine_events))
+        db.session.add(Alert(
+            machine_id=machine_id,
+            alert_type='change_point',
+            severity='medium',
+            title=f'Change Point: {machine.name}',
+            message=f'Sustained change in {sensors} since about {since.isoformat(timespec="seconds")} UTC',
+            sensor_data=json.dumps([event.to_dict() for event in machine_events])
+        ))
+    db.session.commit()
+
+def publish_live_readings(machine, rows, tick_time):
+    """Publish one machine's tick to the live hub; returns the payload"""
+    return live_hub.publish(machine.id, {
+        'machine_id': machine.id,
+        'status': machine.status,
+        'timestamp': tick_time.isoformat(),
+        'readings': {
+            row['sensor_type']: {
+                'value': row['value'],
+                'unit': row['unit'],
+                'is_anomaly': row['is_anomaly'],
+                'anomaly_score': row['anomaly_score']
+            }
+            for row in rows
+        }
+    }).payload
+
+def push_live_health(machine_ids=None):
+    """Copy sensor health into the live state; WebSocket clients receive only what changed"""
+    updates = {}
+    for machine_id, sensors in sensor_health_tracker.get_fleet_sensor_health().items():
+        if machine_ids is not None and machine_id not in machine_ids:
+            continue
+        updates[machine_id] = {
+            'fields': {'overall_health': round(sum(health for health, _ in sensors.values()) / len(sensors), 1)},
+            'sensors': {
+                sensor_type: {'health_percentage': round(health, 1), 'health_status': status}
+                for sensor_type, (health, status) in sensors.items()
+            }
+        }
+    live_state.apply(updates)
+
+def report_generation_status():
+    """Periodic console summary of generation throughput and timing"""
+    current_time = datetime.now().strftime('%H:%M:%S')
+    write_stats = reading_writer.stats()
+    buffer_stats = reading_buffer.stats()
+    print(f"📊 [{current_time}] Generated {generation_count} data cycles "
+          f"({write_stats['last_batch_rows_per_second']:.0f} rows/s last write, "
+          f"queue {buffer_stats['depth']}, shed {buffer_stats['shed']}, dropped {buffer_stats['dropped']})")
+
+    for name, job in generation_scheduler.stats().items():
+        if job['overruns'] or job['missed_ticks']:
+            print(f"   ⏱️ {name}: lag max {job['lag_ms']['max']}ms, "
+                  f"{job['overruns']} overruns, {job['missed_ticks']} missed ticks")
+
+def run_archive(now=None):
+    """Compress closed raw blocks that every rollup tier already covers
+
+    Archived blocks are then trimmed with the same raw retention as
+    sensor_readings.
+    """
+    now = now or datetime.utcnow()
+    until = now - timedelta(seconds=ArchiveConfig.ARCHIVE_AFTER)
+    if RollupConfig.ENABLED:
+        # Rollup tails are read from sensor_readings, so never archive ahead of them
+        rolled_until = rollup_pipeline.rolled_until()
+        if rolled_until is None:
+            return 0
+        until = min(until, rolled_until)
+
+    archived = reading_archive.archive_until(until)
+    if RollupConfig.RETENTION_DAYS.get('raw') is not None:
+        reading_archive.delete_before(now - timedelta(days=RollupConfig.RETENTION_DAYS['raw']))
+    return archived
+
+def record_health_history(now=None):
+    """Sample every sensor's health into sensor_health_history in one pass"""
+    now = now or datetime.now()
+    return health_history.record(sensor_health_tracker.snapshot(now), now.timestamp())
+
+def health_trend(machine_id, hours=24):
+    """{sensor_type: {health, status, change, rul}} - change is against the oldest sample within ``hours``"""
+    since = (datetime.now() - timedelta(hours=hours)).timestamp()
+    earliest = health_history.earliest(machine_id, since)
+    trend = {}
+    for sensor_type, health in sensor_health_tracker.get_all_machine_sensor_health(machine_id).items():
+        first = earliest.get(sensor_type)
+        trend[sensor_type] = {
+            'health_percentage': health['health_percentage'],
+            'status': health['status'],
+            'change': round(health['health_percentage'] - first[1], 1) if first else None,
+            'since': datetime.fromtimestamp(first[0]).isoformat() if first else None,
+            'remaining_useful_life_hours': health['remaining_useful_life_hours']
+        }
+    return trend
+
+def start_maintenance():
+    """Background maintenance loop: rollups, archiving, retention, detector snapshots and sensor health flushes"""
+    if RollupConfig.ENABLED:
+        maintenance_scheduler.add_job('rollups', RollupConfig.INTERVAL, rollup_pipeline.run_once)
+    if reading_archive is not None:
+        maintenance_scheduler.add_job('archive', ArchiveConfig.INTERVAL, run_archive)
+    if any(detector is not None for detector in (streaming_detector, multivariate_detector, change_detector)):
+        maintenance_scheduler.add_job('detector-snapshot', DetectorConfig.SNAPSHOT_INTERVAL, save_detector_state)
+    maintenance_scheduler.add_job('sensor-health-flush', HealthConfig.FLUSH_INTERVAL, sensor_health_tracker.flush)
+    maintenance_scheduler.add_job('sensor-health-history', HealthConfig.HISTORY_INTERVAL, record_health_history)
+    maintenance_scheduler.run_forever()
+
+def start_data_generation():
+    """Main data generation loop - ticks fire on absolute deadlines per sample rate"""
+    print("🚀 Starting real-time sensor data generation for 4 machines...")
+    reading_buffer.start()
+
+    periods = {GenerationConfig.DEFAULT_SAMPLE_PERIOD, *GenerationConfig.SAMPLE_PERIODS.values()}
+    for period in sorted(periods):
+        generation_scheduler.add_job(
+            f'generate-{period:g}s', period,
+            lambda period=period: run_generation_tick(period)
+        )
+    generation_scheduler.add_job('status-report', GenerationConfig.STATUS_REPORT_PERIOD,
+                                 report_generation_status, start_delay=GenerationConfig.STATUS_REPORT_PERIOD)
+    generation_scheduler.add_job('live-health', DashboardConfig.HEALTH_PUSH_PERIOD, push_live_health)
+
+    generation_scheduler.run_forever()
 
 def create_sensor_health_table():
     """Create the sensor_health table if it doesn't exist"""
-    import sqlite3
-    
-    conn = sqlite3.connect('machines.db')
-    cursor = conn.cursor()
-    
-    # Create sensor_health table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sensor_health (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            machine_id INTEGER,
-            sensor_type TEXT,
-            health_percentage REAL DEFAULT 100.0,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'healthy',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(machine_id, sensor_type)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    with sqlite_db.writer() as conn:
+        sensor_health_tracker.ensure_table(conn)
     print("✅ Sensor health table created successfully!")
 
 def initialize_all_sensor_health():
     """Initialize sensor health for all machines and sensors"""
     machines = Machine.query.all()
-    total_initialized = 0
-    
-    for machine in machines:
-        machine_config = MACHINES_CONFIG.get(machine.machine_type, {})
-        sensor_configs = machine_config.get('sensors', {})
-        
-        for sensor_type in sensor_configs.keys():
-            sensor_health_tracker.initialize_sensor_health(machine.id, sensor_type)
-            total_initialized += 1
-    
+    sensors = [
+        (machine.id, sensor_type)
+        for machine in machines
+        for sensor_type in MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {})
+    ]
+    sensor_health_tracker.initialize_sensors(sensors)
+    total_initialized = len(sensors)
+
     print(f"✅ Initialized sensor health for {total_initialized} sensors across {len(machines)} machines")
 
 def create_tables():
@@ -2690,14 +3633,32 @@ def create_tables():
         # Create Flask-SQLAlchemy tables
         db.create_all()
         print("✅ SQLAlchemy tables created successfully!")
+
+        # Bring existing databases up to date (indexes added after creation)
+        for table_name, indexes in migrate(db.engine, [SensorReading.__table__]).items():
+            print(f"✅ Migrated {table_name}: created {', '.join(indexes)}")
+
+        # Seed the current-state table from history the first time it exists
+        if SensorCurrent.query.first() is None and SensorReading.query.first() is not None:
+            seeded = rebuild_current_state(db.engine, SensorReading.__table__, SensorCurrent.__table__)
+            print(f"✅ Seeded sensor_current with {seeded} sensors")
         
         # Create sensor health table (SQLite direct)
         create_sensor_health_table()
         
         # Check if we need to create machines
         existing_count = Machine.query.count()
+        fleet_size = GenerationConfig.SIMULATED_FLEET_SIZE
 
-        if existing_count != 4:
+        if fleet_size:
+            if existing_count != fleet_size:
+                print(f"Found {existing_count} machines, creating simulated fleet of {fleet_size}...")
+                Machine.query.delete()
+                db.session.execute(Machine.__table__.insert(), build_fleet(fleet_size, MACHINES_CONFIG))
+                db.session.commit()
+                print(f"✅ Added {fleet_size} simulated machines to database")
+            initialize_all_sensor_health()
+        elif existing_count != 4:
             print(f"Found {existing_count} machines, creating fresh set of 4...")
             Machine.query.delete()
 
@@ -2740,6 +3701,18 @@ def create_tables():
         else:
             print("✅ 4 machines already exist, initializing sensor health...")
             initialize_all_sensor_health()
+
+        # New or replaced machines - the generator must reload its fleet
+        machine_registry.invalidate()
+
+        # Units and ranges for the compact schema's sensor dictionary
+        if isinstance(reading_store, CompactReadingStore):
+            with db.engine.begin() as conn:
+                for machine in Machine.query.all():
+                    reading_store.register_sensors(
+                        machine.id, MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {}), conn
+                    )
+
 @app.route('/debug/reset-sensor-health')
 def reset_sensor_health():
     """Debug endpoint to reset and initialize all sensor health"""
@@ -2748,12 +3721,7 @@ def reset_sensor_health():
         create_sensor_health_table()
         
         # Clear existing sensor health data
-        import sqlite3
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM sensor_health')
-        conn.commit()
-        conn.close()
+        sensor_health_tracker.reset()
         
         # Re-initialize all sensor health
         with app.app_context():
@@ -2778,27 +3746,24 @@ def reset_sensor_health():
 def check_sensor_health_table():
     """Debug endpoint to check sensor health table contents"""
     try:
-        import sqlite3
-        conn = sqlite3.connect('machines.db')
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sensor_health'")
-        table_exists = cursor.fetchone() is not None
-        
-        if table_exists:
-            # Count records
-            cursor.execute('SELECT COUNT(*) FROM sensor_health')
-            record_count = cursor.fetchone()[0]
-            
-            # Get sample records
-            cursor.execute('SELECT * FROM sensor_health LIMIT 5')
-            sample_records = cursor.fetchall()
-        else:
-            record_count = 0
-            sample_records = []
-        
-        conn.close()
+        with sqlite_db.reader() as conn:
+            cursor = conn.cursor()
+
+            # Check if table exists
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sensor_health'")
+            table_exists = cursor.fetchone() is not None
+
+            if table_exists:
+                # Count records
+                cursor.execute('SELECT COUNT(*) FROM sensor_health')
+                record_count = cursor.fetchone()[0]
+
+                # Get sample records
+                cursor.execute('SELECT * FROM sensor_health LIMIT 5')
+                sample_records = cursor.fetchall()
+            else:
+                record_count = 0
+                sample_records = []
         
         return jsonify({
             'table_exists': table_exists,
@@ -2822,6 +3787,9 @@ if __name__ == '__main__':
     data_thread = threading.Thread(target=start_data_generation, daemon=True)
     data_thread.start()
 
+    maintenance_thread = threading.Thread(target=start_maintenance, daemon=True)
+    maintenance_thread.start()
+
     print("🚀 Starting Complete Industrial Predictive Maintenance System...")
     print("🏠 Landing page: http://localhost:5000")
     print("📊 Dashboard: http://localhost:5000/dashboard")
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 import json
@@ -12,6 +12,37 @@ import random
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
 
+from models.tick_engine import FleetTickEngine
+from models.bulk_writer import BulkReadingWriter
+from models.write_buffer import WriteBehindBuffer
+from models.scheduler import FixedRateScheduler
+from models.fleet_simulator import build_fleet
+from models.machine_registry import MachineRegistry
+from models.migrations import migrate
+from models.current_state import current_state_hook, rebuild_current_state
+from models.fleet_snapshot import SnapshotCache, build_fleet_snapshot
+from models.live_hub import LiveHub, sse_stream
+from models.live_state import DeltaSession, LiveState
+from models.downsampling import to_unix
+from models.rollups import RollupPipeline, rollup_tables
+from models.reading_stores import READING_BACKENDS, StoreReadingWriter
+from models.deadband import DeadbandFilter, expand_steps
+from models.columnar_store import ColumnarStore
+from models.compact_readings import CompactReadingStore, compact_reading_tables
+from models.archive import ReadingArchive, archive_table
+from models.sqlite_db import DEFAULT_PRAGMAS, SQLiteDatabase
+from models.streaming_detector import StreamingDetector
+from models.multivariate_detector import MultivariateDetector
+from models.change_points import ChangePointDetector
+
+# Optional WebSocket channel (pip install flask-sock); the dashboard falls back to polling without it
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
 # Create Flask app
 app = Flask(__name__)
 
@@ -20,6 +51,13 @@ app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///machines.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+class DatabaseConfig:
+    PRAGMAS = DEFAULT_PRAGMAS       # WAL, synchronous=NORMAL, 64 MiB cache, 256 MiB mmap, in-memory temp tables
+    READ_POOL_SIZE = 8              # Pooled connections, for the engine and for raw sqlite3 readers
+    BUSY_TIMEOUT = 5.0              # Seconds a writer waits for the write gate or a locked database
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': DatabaseConfig.READ_POOL_SIZE}
+
 # Initialize database
 db = SQLAlchemy(app)
 
@@ -28,6 +66,82 @@ sent_maintenance_emails = set()
 sent_sabotage_emails = set()
 sent_twilio_calls = set()
 
+# Data generation / storage pipeline configuration
+class GenerationConfig:
+    # Write-behind buffer between the generator and SQLite
+    BUFFER_MAX_ROWS = 50000         # Queue capacity before backpressure kicks in
+    BUFFER_FLUSH_ROWS = 2000        # Group-commit once this many rows are waiting...
+    BUFFER_FLUSH_INTERVAL = 1.0     # ...or the oldest row has waited this many seconds
+    BUFFER_OVERFLOW = 'block'       # block, shed or drop_oldest
+    BUFFER_BLOCK_TIMEOUT = 0.5      # Max seconds a tick may wait for room when blocking
+
+    # Fixed-rate scheduler
+    DEFAULT_SAMPLE_PERIOD = 3.0     # Seconds between ticks for machines without an override
+    SAMPLE_PERIODS = {}             # Overrides keyed by machine name or machine type, e.g. {'Heat Exchanger': 1.0}
+    STATUS_REPORT_PERIOD = 30.0     # Seconds between console status reports
+
+    # Simulation mode: >0 replaces the four plant machines with N machines built
+    # from the MACHINES_CONFIG templates (see also models/fleet_simulator.py)
+    SIMULATED_FLEET_SIZE = 0
+
+class StorageConfig:
+    READING_BACKEND = 'sqlite'      # sqlite (sensor_readings), compact (sensors + sensor_readings_compact) or columnar (mmap segments)
+    COLUMNAR_PATH = os.path.join(app.instance_path, 'readings')
+    COLUMNAR_SEGMENT_ROWS = 65536   # Rows per sensor segment before it is sealed
+    COLUMNAR_OPEN_SEGMENTS = 256    # Sealed segment maps kept open for reads
+
+class RollupConfig:
+    ENABLED = True
+    INTERVAL = 60.0                 # Seconds between rollup/retention passes
+    GRACE = 10.0                    # Buckets are rolled once they closed this many seconds ago
+    # Days kept per level; raw rows and finer tiers are only trimmed once the next tier covers them
+    RETENTION_DAYS = {'raw': 7, '1m': 30, '1h': 365, '1d': None}
+
+class DeadbandConfig:
+    ENABLED = False
+    MODES = ('normal',)             # Machine statuses whose sensors are deadband-filtered; others store every reading
+    TOLERANCE = 0.01                # Fraction of the sensor's normal-range width a reading must move to be stored
+    TOLERANCES = {}                 # Absolute per-sensor-type overrides, e.g. {'temperature': 0.5}
+    HEARTBEAT = 60.0                # Seconds after which a reading is stored even if it did not move
+
+class DetectorConfig:
+    ENABLED = True                  # Streaming statistical detector on top of the rule-based one (fleet ticks only)
+    EWMA_ALPHA = 0.1                # Weight of the newest reading in the rolling mean/variance (~10-reading window)
+    Z_THRESHOLD = 4.0               # Rolling z-score above which a reading is flagged
+    WARMUP = 30                     # Readings per sensor before it can be flagged
+    SCORE_CAP = 0.79                # Highest statistical score; stays below the 0.8 critical-alert threshold
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'detector_state.npz')
+    SNAPSHOT_INTERVAL = 60.0        # Seconds between state snapshots; at most this much learning is lost on restart
+
+class MultivariateConfig:
+    ENABLED = True                  # Per-machine-type Mahalanobis stage after the per-sensor detectors (fleet ticks only)
+    TAIL_Z = 3.7                    # Flag a machine beyond the chi-square quantile matching this normal tail (~1e-4)
+    WARMUP = 50                     # Clean machine readings per type before machines of that type can be flagged
+    SHRINKAGE = 0.05                # Fraction of each variance added to the covariance diagonal to keep it invertible
+    SCORE_CAP = 0.79                # Highest multivariate score; stays below the 0.8 critical-alert threshold
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'multivariate_state.npz')  # Saved with the detector snapshot
+
+class ChangePointConfig:
+    ENABLED = True                  # CUSUM change points per sensor, raised as 'change_point' alerts (fleet ticks only)
+    K = 0.75                        # Mean shift, in reference standard deviations, the up/down sums ignore
+    H = 12.0                        # Up/down sum that signals a change
+    K_VAR = 0.3                     # Excess of z^2 over 1, in standard deviations of z^2, the variance sum ignores
+    H_VAR = 30.0                    # Variance sum that signals a change
+    WARMUP = 1000                   # Readings per sensor to learn the reference, at start and after each change
+    SNAPSHOT_PATH = os.path.join(app.instance_path, 'change_point_state.npz')  # Saved with the detector snapshot
+
+class ArchiveConfig:
+    ENABLED = True                  # SQLite backend only; the columnar store is already compact
+    INTERVAL = 600.0                # Seconds between archive passes
+    BLOCK_SECONDS = 7200            # Width of one compressed block per sensor
+    ARCHIVE_AFTER = 86400           # Raw rows stay uncompressed for at least this many seconds
+
+class DashboardConfig:
+    SNAPSHOT_TTL = 1.0              # Seconds one /api/fleet/snapshot build is shared between clients
+    LIVE_QUEUE_SIZE = 256           # Events buffered per live-stream client before the oldest are dropped
+    LIVE_HEARTBEAT = 15.0           # Seconds of silence before a live-stream keepalive comment
+    WS_FRAME_INTERVAL = 0.1         # Max seconds between WebSocket delta frames while data is changing
+
 # Email Configuration
 class EmailConfig:
     SMTP_SERVER = 'smtp.gmail.com'
@@ -641,10 +755,8 @@ class IndustrialChatbot:
             if machine_id:
                 machine = Machine.query.get(machine_id)
                 if machine:
-                    # Get latest readings
-                    latest_readings = db.session.query(SensorReading).filter_by(
-                        machine_id=machine_id
-                    ).order_by(SensorReading.timestamp.desc()).limit(10).all()
+                    # Get latest readings (one row per sensor)
+                    latest_readings = SensorCurrent.query.filter_by(machine_id=machine_id).all()
 
                     context = {
                         'machine_name': machine.name,
@@ -735,7 +847,14 @@ class IndustrialChatbot:
             machine_id = machines[0]
             machine = Machine.query.get(machine_id)
             if machine:
-                latest_reading = SensorReading.query.filter_by(machine_id=machine_id).order_by(SensorReading.timestamp.desc()).first()
+                current = SensorCurrent.query.filter_by(machine_id=machine_id).all()
+                anomalies = [r for r in current if r.is_anomaly]
+                # Report the worst anomalous sensor, otherwise the most recent reading
+                if anomalies:
+                    latest_reading = max(anomalies, key=lambda r: r.anomaly_score)
+                else:
+                    latest_reading = max(current, key=lambda r: r.timestamp, default=None)
+                last_update = max((r.timestamp for r in current), default=None)
 
                 status_emoji = {"normal": "🟢", "maintenance": "🟡", "sabotage": "🔴", "shutdown": "⚫"}
 
@@ -743,7 +862,7 @@ class IndustrialChatbot:
 
 📊 **Current Status:** {machine.status.upper()}
 📍 **Location:** {machine.location}
-⏰ **Last Update:** {latest_reading.timestamp.strftime('%Y-%m-%d %H:%M:%S') if latest_reading else 'No data'}
+⏰ **Last Update:** {last_update.strftime('%Y-%m-%d %H:%M:%S') if last_update else 'No data'}
 
 """
                 if latest_reading:
@@ -776,10 +895,7 @@ Type 'help' for available commands or ask about specific machines."""
             machine = Machine.query.get(machine_id)
 
             # Get recent anomalies
-            anomalies = SensorReading.query.filter(
-                SensorReading.machine_id == machine_id,
-                SensorReading.is_anomaly == True
-            ).order_by(SensorReading.timestamp.desc()).limit(5).all()
+            anomalies = query_readings(machine_id, limit=5, anomalies_only=True)
 
             if anomalies:
                 response = f"""**🔧 Troubleshooting Guide: {machine.name}**
@@ -840,7 +956,7 @@ Which machine needs maintenance assessment?"""
         if machines:
             machine_id = machines[0]
             # Get recent readings for analysis
-            readings = SensorReading.query.filter_by(machine_id=machine_id).order_by(SensorReading.timestamp.desc()).limit(20).all()
+            readings = query_readings(machine_id, limit=20)
 
             anomaly_count = sum(1 for r in readings if r.is_anomaly)
             avg_score = sum(r.anomaly_score for r in readings) / len(readings) if readings else 0
@@ -1117,9 +1233,7 @@ def trigger_emergency_call(machine_id):
         machine = Machine.query.get_or_404(machine_id)
 
         # Get latest critical readings
-        latest_readings = db.session.query(SensorReading).filter_by(
-            machine_id=machine_id
-        ).order_by(SensorReading.timestamp.desc()).limit(4).all()
+        latest_readings = query_readings(machine_id, limit=4)
 
         # Format incident details
         critical_sensors = []
@@ -1238,6 +1352,10 @@ class Machine(db.Model):
 
 class SensorReading(db.Model):
     __tablename__ = 'sensor_readings'
+    __table_args__ = (
+        # Hot read paths filter by machine + sensor and order by newest first
+        db.Index('ix_sensor_readings_machine_sensor_ts', 'machine_id', 'sensor_type', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), nullable=False)
@@ -1260,6 +1378,37 @@ class SensorReading(db.Model):
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+class SensorCurrent(db.Model):
+    __tablename__ = 'sensor_current'
+
+    machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), primary_key=True)
+    sensor_type = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    is_anomaly = db.Column(db.Boolean, default=False)
+    anomaly_score = db.Column(db.Float, default=0.0)
+    timestamp = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'machine_id': self.machine_id,
+            'sensor_type': self.sensor_type,
+            'value': self.value,
+            'unit': self.unit,
+            'is_anomaly': self.is_anomaly,
+            'anomaly_score': self.anomaly_score,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        }
+
+# 1-minute, 1-hour and 1-day aggregates of sensor_readings (see models/rollups.py)
+ROLLUP_TABLES = rollup_tables(db.metadata)
+
+# Gorilla-compressed blocks of archived sensor_readings (see models/archive.py)
+READING_ARCHIVE = archive_table(db.metadata)
+
+# Sensor dictionary + WITHOUT ROWID readings (see models/compact_readings.py)
+COMPACT_READING_TABLES = compact_reading_tables(db.metadata)
+
 class Alert(db.Model):
     __tablename__ = 'alerts'
 
@@ -1296,6 +1445,120 @@ class Alert(db.Model):
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
         }
 
+if StorageConfig.READING_BACKEND not in READING_BACKENDS:
+    raise ValueError(f"READING_BACKEND must be one of {', '.join(READING_BACKENDS)}")
+
+def deadband_tolerance(machine_id, sensor_type):
+    """Deadband of one sensor, or None to store every reading while the machine is not in a deadband mode"""
+    machine = machine_registry.get(machine_id)
+    if machine is None or machine.status not in DeadbandConfig.MODES:
+        return None
+    if sensor_type in DeadbandConfig.TOLERANCES:
+        return DeadbandConfig.TOLERANCES[sensor_type]
+    sensor_config = machine.sensor_configs.get(sensor_type)
+    if sensor_config is None:
+        return None
+    low, high = sensor_config['normal_range']
+    return (high - low) * DeadbandConfig.TOLERANCE
+
+def expand_stored_series(machine_id, sensor_type, series, start, end):
+    """Deadband-stored readings of one sensor held at its machine's sample period over [start, end]"""
+    machine = machine_registry.get(machine_id)
+    period = sample_period_for(machine) if machine is not None else GenerationConfig.DEFAULT_SAMPLE_PERIOD
+    return expand_steps(series, period, to_unix(start), to_unix(end), DeadbandConfig.HEARTBEAT)
+
+# Core-level bulk writer for a whole tick of sensor readings
+with app.app_context():
+    # One write gate and pragma profile for the ORM engine and raw sqlite3 access
+    sqlite_db = SQLiteDatabase(db.engine.url.database, DatabaseConfig.PRAGMAS,
+                               read_pool_size=DatabaseConfig.READ_POOL_SIZE, busy_timeout=DatabaseConfig.BUSY_TIMEOUT)
+    sqlite_db.install(db.engine)
+
+    # Raw readings live in sensor_readings unless another backend is selected
+    reading_store = None
+    if StorageConfig.READING_BACKEND == 'columnar':
+        reading_store = ColumnarStore(
+            StorageConfig.COLUMNAR_PATH,
+            segment_rows=StorageConfig.COLUMNAR_SEGMENT_ROWS,
+            max_open_segments=StorageConfig.COLUMNAR_OPEN_SEGMENTS
+        )
+    elif StorageConfig.READING_BACKEND == 'compact':
+        reading_store = CompactReadingStore(db.engine, *COMPACT_READING_TABLES)
+
+    # Keep sensor_current in step with every tick, in the same transaction
+    current_state_hooks = [current_state_hook(SensorCurrent.__table__)]
+    deadband_filter = DeadbandFilter(deadband_tolerance, DeadbandConfig.HEARTBEAT) if DeadbandConfig.ENABLED else None
+    if reading_store is not None:
+        reading_writer = StoreReadingWriter(reading_store, db.engine, after_insert=current_state_hooks,
+                                            row_filter=deadband_filter)
+    else:
+        reading_writer = BulkReadingWriter(db.engine, SensorReading.__table__, after_insert=current_state_hooks,
+                                           row_filter=deadband_filter)
+    rollup_pipeline = RollupPipeline(
+        db.engine, SensorReading.__table__, ROLLUP_TABLES,
+        retention=RollupConfig.RETENTION_DAYS, grace=RollupConfig.GRACE, store=reading_store,
+        expand=expand_stored_series if DeadbandConfig.ENABLED else None, lookback=DeadbandConfig.HEARTBEAT
+    )
+    reading_archive = ReadingArchive(
+        db.engine, SensorReading.__table__, READING_ARCHIVE, block_seconds=ArchiveConfig.BLOCK_SECONDS
+    ) if ArchiveConfig.ENABLED and reading_store is None else None
+
+def query_readings(machine_id, sensor_type=None, since=None, until=None, limit=None, anomalies_only=False):
+    """Newest-first raw readings of one machine from the configured reading backend
+
+    SQLite returns SensorReading rows, followed by archived StoredReadings
+    once the raw table runs out; the columnar store returns StoredReadings
+    with the same attributes.
+    """
+    if reading_store is not None:
+        return reading_store.recent(machine_id, sensor_type, since, until, limit, anomalies_only)
+
+    query = SensorReading.query.filter(SensorReading.machine_id == machine_id)
+    if sensor_type is not None:
+        query = query.filter(SensorReading.sensor_type == sensor_type)
+    if since is not None:
+        query = query.filter(SensorReading.timestamp >= since)
+    if until is not None:
+        query = query.filter(SensorReading.timestamp < until)
+    if anomalies_only:
+        query = query.filter(SensorReading.is_anomaly == True)
+    query = query.order_by(SensorReading.timestamp.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    readings = query.all()
+
+    if reading_archive is not None and (limit is None or len(readings) < limit):
+        # Archived blocks only hold readings older than every raw row
+        with db.engine.connect() as conn:
+            readings += reading_archive.recent(
+                conn, machine_id, sensor_type, since, until,
+                limit - len(readings) if limit is not None else None, anomalies_only
+            )
+    return readings
+
+# Absolute-deadline scheduler driving data generation
+generation_scheduler = FixedRateScheduler()
+
+# Separate scheduler for slow background maintenance so it never delays a tick
+maintenance_scheduler = FixedRateScheduler()
+generation_count = 0
+
+# Write-behind buffer so the generator never waits on a SQLite commit
+reading_buffer = WriteBehindBuffer(
+    reading_writer,
+    max_rows=GenerationConfig.BUFFER_MAX_ROWS,
+    flush_rows=GenerationConfig.BUFFER_FLUSH_ROWS,
+    flush_interval=GenerationConfig.BUFFER_FLUSH_INTERVAL,
+    overflow=GenerationConfig.BUFFER_OVERFLOW,
+    block_timeout=GenerationConfig.BUFFER_BLOCK_TIMEOUT
+)
+
+# In-process fan-out of each tick to Server-Sent Events clients
+live_hub = LiveHub(max_queue=DashboardConfig.LIVE_QUEUE_SIZE)
+
+# Versioned latest values behind the WebSocket delta frames
+live_state = LiveState()
+
 # Routes
 @app.route('/')
 def landing_page():
@@ -1323,20 +1586,11 @@ def api_machines():
 @app.route('/api/machine/<int:machine_id>/latest')
 def api_machine_latest(machine_id):
     """Get latest sensor readings for a machine"""
-    latest_readings = {}
     machine = Machine.query.get_or_404(machine_id)
 
-    sensor_types = db.session.query(SensorReading.sensor_type).filter_by(machine_id=machine_id).distinct().all()
-    sensor_types = [s[0] for s in sensor_types]
-
-    for sensor_type in sensor_types:
-        reading = SensorReading.query.filter_by(
-            machine_id=machine_id, 
-            sensor_type=sensor_type
-        ).order_by(SensorReading.timestamp.desc()).first()
-
-        if reading:
-            latest_readings[sensor_type] = reading.to_dict()
+    # O(sensors) read from the maintained current-state table
+    current = SensorCurrent.query.filter_by(machine_id=machine_id).all()
+    latest_readings = {reading.sensor_type: reading.to_dict() for reading in current}
 
     return jsonify({
         'machine': machine.to_dict(),
@@ -1347,12 +1601,15 @@ def api_machine_latest(machine_id):
 @app.route('/api/machine/<int:machine_id>/mode', methods=['POST'])
 def api_set_machine_mode(machine_id):
     """UPDATED: Set machine operation mode with flag reset"""
-    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
-
     data = request.get_json()
-    mode = data.get('mode', 'normal')
-
     machine = Machine.query.get_or_404(machine_id)
+    return jsonify(set_machine_mode(machine, data.get('mode', 'normal')))
+
+def set_machine_mode(machine, mode):
+    """Apply a mode change; shared by HTTP and WebSocket"""
+    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
+
+    machine_id = machine.id
     old_status = machine.status
     machine.status = mode
     machine.updated_at = datetime.utcnow()
@@ -1374,13 +1631,110 @@ def api_set_machine_mode(machine_id):
     )
     db.session.add(alert)
     db.session.commit()
+    machine_registry.update_status(machine_id, machine.status)
+    fleet_snapshot_cache.invalidate()
+    live_state.apply({machine_id: {'fields': {'status': machine.status}}})
 
-    return jsonify({
+    return {
         'success': True,
         'machine_id': machine_id,
         'new_mode': mode,
+        'status': machine.status,
         'message': f'Machine {machine.name} set to {mode} mode'
-    })
+    }
+
+def load_fleet_snapshot():
+    """Build the fleet snapshot with three queries, independent of fleet size"""
+    machines = machine_registry.active_machines()
+    current_rows = SensorCurrent.query.all()
+    open_alerts = dict(
+        db.session.query(Alert.machine_id, db.func.count(Alert.id))
+        .filter_by(is_acknowledged=False)
+        .group_by(Alert.machine_id)
+        .all()
+    )
+    return build_fleet_snapshot(machines, current_rows, open_alerts=open_alerts)
+
+fleet_snapshot_cache = SnapshotCache(load_fleet_snapshot, ttl=DashboardConfig.SNAPSHOT_TTL)
+
+def live_stream_response(machine_ids=None):
+    """Server-Sent Events response fed from the live hub (no per-client queries)"""
+    return Response(
+        sse_stream(live_hub, machine_ids, heartbeat=DashboardConfig.LIVE_HEARTBEAT),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/machine/<int:machine_id>/live-stream')
+def get_live_sensor_stream(machine_id):
+    """Push every tick for one machine as Server-Sent Events"""
+    Machine.query.get_or_404(machine_id)
+    return live_stream_response({machine_id})
+
+@app.route('/api/fleet/live-stream')
+def api_fleet_live_stream():
+    """Push every tick for the whole fleet, or for ?machines=1,2,3"""
+    machines = request.args.get('machines')
+    machine_ids = None
+    if machines:
+        try:
+            machine_ids = {int(machine_id) for machine_id in machines.split(',') if machine_id.strip()}
+        except ValueError:
+            return jsonify({'success': False, 'error': 'machines must be a comma-separated list of ids'}), 400
+    return live_stream_response(machine_ids)
+
+MACHINE_MODES = ('normal', 'maintenance', 'sabotage')
+
+def control_set_mode(message):
+    """WebSocket control: {"action": "set_mode", "machine_id": 1, "mode": "maintenance"}"""
+    machine = Machine.query.get(message.get('machine_id'))
+    if not machine:
+        return {'success': False, 'error': f"Machine with ID {message.get('machine_id')} not found"}
+    if message.get('mode') not in MACHINE_MODES:
+        return {'success': False, 'error': f"mode must be one of {', '.join(MACHINE_MODES)}"}
+    return set_machine_mode(machine, message['mode'])
+
+LIVE_CONTROLS = {
+    'set_mode': control_set_mode
+}
+
+def serve_live_socket(ws):
+    """Run one WebSocket client: apply its messages, then send a delta frame when state changed"""
+    session = DeltaSession(live_state, LIVE_CONTROLS)
+    try:
+        while True:
+            # Waiting for client input doubles as the frame pacing
+            raw = ws.receive(timeout=DashboardConfig.WS_FRAME_INTERVAL)
+            while raw is not None:
+                try:
+                    replies = session.handle(json.loads(raw))
+                except ValueError:
+                    replies = [{'type': 'error', 'error': 'invalid JSON'}]
+                for reply in replies:
+                    ws.send(json.dumps(reply, default=str))
+                raw = ws.receive(timeout=0)
+
+            frame = session.next_frame()
+            if frame:
+                ws.send(json.dumps(frame, default=str, separators=(',', ':')))
+    except ConnectionClosed:
+        pass
+
+if WEBSOCKETS_AVAILABLE:
+    sock = Sock(app)
+
+    @sock.route('/ws/live')
+    def live_socket(ws):
+        """Subscribe to fleet/machine/sensor topics, receive delta frames, send control actions"""
+        serve_live_socket(ws)
+
+@app.route('/api/fleet/snapshot')
+def api_fleet_snapshot():
+    """Latest readings and open alert counts for every machine in one payload"""
+    try:
+        return jsonify(dict(fleet_snapshot_cache.get(), success=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/alerts')
 def api_alerts():
@@ -1388,6 +1742,30 @@ def api_alerts():
     alerts = Alert.query.order_by(Alert.created_at.desc()).limit(20).all()
     return jsonify([alert.to_dict() for alert in alerts])
 
+@app.route('/debug/generation-stats')
+def debug_generation_stats():
+    """Debug endpoint for data generation throughput"""
+    return jsonify({
+        'writer': reading_writer.stats(),
+        'buffer': reading_buffer.stats(),
+        'scheduler': generation_scheduler.stats(),
+        'maintenance_scheduler': maintenance_scheduler.stats(),
+        'rollups': rollup_pipeline.stats(),
+        'reading_store': reading_store.stats() if reading_store else None,
+        'archive': reading_archive.stats() if reading_archive else None,
+        'deadband': deadband_filter.stats() if deadband_filter else None,
+        'detector': streaming_detector.stats() if streaming_detector is not None else None,
+        'multivariate': multivariate_detector.stats() if multivariate_detector is not None else None,
+        'change_points': change_detector.stats() if change_detector is not None else None,
+        'database': sqlite_db.stats(),
+        'generation_count': generation_count,
+        'machine_registry': machine_registry.stats(),
+        'fleet_snapshot': fleet_snapshot_cache.stats(),
+        'live_hub': live_hub.stats(),
+        'live_state': live_state.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/debug/machines')
 def debug_machines():
     """Debug endpoint to check machine status"""
@@ -1490,6 +1868,53 @@ MACHINES_CONFIG = {
     }
 }
 
+# Whole-fleet tick engine compiled from MACHINES_CONFIG
+tick_engine = FleetTickEngine(MACHINES_CONFIG)
+
+# Per-sensor online statistics; state is restored from the last snapshot
+streaming_detector = None
+if DetectorConfig.ENABLED:
+    streaming_detector = StreamingDetector(DetectorConfig.EWMA_ALPHA, DetectorConfig.Z_THRESHOLD,
+                                           DetectorConfig.WARMUP, DetectorConfig.SCORE_CAP)
+    try:
+        streaming_detector.load(DetectorConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable detector snapshot: {e}")
+
+multivariate_detector = None
+if MultivariateConfig.ENABLED:
+    multivariate_detector = MultivariateDetector(MultivariateConfig.TAIL_Z, MultivariateConfig.WARMUP,
+                                                 MultivariateConfig.SHRINKAGE, MultivariateConfig.SCORE_CAP)
+    try:
+        multivariate_detector.load(MultivariateConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable multivariate snapshot: {e}")
+
+change_detector = None
+if ChangePointConfig.ENABLED:
+    change_detector = ChangePointDetector(ChangePointConfig.K, ChangePointConfig.H, ChangePointConfig.K_VAR,
+                                          ChangePointConfig.H_VAR, ChangePointConfig.WARMUP)
+    try:
+        change_detector.load(ChangePointConfig.SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring unreadable change point snapshot: {e}")
+
+def save_detector_state():
+    """Snapshot the online detector state so baselines survive a restart"""
+    if streaming_detector is not None:
+        streaming_detector.save(DetectorConfig.SNAPSHOT_PATH)
+    if multivariate_detector is not None:
+        multivariate_detector.save(MultivariateConfig.SNAPSHOT_PATH)
+    if change_detector is not None:
+        change_detector.save(ChangePointConfig.SNAPSHOT_PATH)
+
+# Cached active machines for the generator - updated on mode changes, reloaded when machines are added
+machine_registry = MachineRegistry(
+    lambda: Machine.query.filter_by(is_active=True).all(),
+    MACHINES_CONFIG,
+    tick_engine.compiled_types
+)
+
 def generate_sensor_value(sensor_type, sensor_config, machine_status='normal'):
     """Generate realistic sensor values based on machine status"""
     min_val = sensor_config['min']
@@ -1546,11 +1971,7 @@ def get_pre_incident_data(machine_id, incident_time, minutes_before=1):
         incident_dt = datetime.fromisoformat(incident_time)
         start_time = incident_dt - timedelta(minutes=minutes_before)
 
-        pre_incident_readings = SensorReading.query.filter(
-            SensorReading.machine_id == machine_id,
-            SensorReading.timestamp >= start_time,
-            SensorReading.timestamp < incident_dt
-        ).order_by(SensorReading.timestamp.desc()).limit(20).all()
+        pre_incident_readings = query_readings(machine_id, since=start_time, until=incident_dt, limit=20)
 
         formatted_data = []
         for reading in pre_incident_readings:
@@ -1580,21 +2001,30 @@ def detect_irregular_readings(current_readings):
 
     return irregular_sensors
 
-def generate_machine_data(machine):
-    """CORRECTED VERSION - Fixes email spam and adds Twilio integration"""
-    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
+def build_machine_readings(machine, generated=None, current_time=None):
+    """Build sensor_readings rows for one machine without touching the session
 
+    ``generated`` is the machine's slice of a FleetTick
+    ({sensor_type: (value, is_anomaly, anomaly_score)}). When omitted the
+    values are drawn per sensor with generate_sensor_value.
+
+    Returns (rows, all_readings, critical_anomalies).
+    """
     machine_config = MACHINES_CONFIG.get(machine.machine_type)
     if not machine_config:
-        return
+        return [], {}, []
 
-    current_time = datetime.utcnow()
+    current_time = current_time or datetime.utcnow()
     critical_anomalies = []
     all_readings = {}
+    rows = []
 
     for sensor_type, sensor_config in machine_config['sensors'].items():
-        value = generate_sensor_value(sensor_type, sensor_config, machine.status)
-        is_anomaly, anomaly_score = detect_simple_anomaly(value, sensor_config, machine.status)
+        if generated is not None:
+            value, is_anomaly, anomaly_score = generated[sensor_type]
+        else:
+            value = generate_sensor_value(sensor_type, sensor_config, machine.status)
+            is_anomaly, anomaly_score = detect_simple_anomaly(value, sensor_config, machine.status)
 
         if is_anomaly and anomaly_score > 0.8:
             critical_anomalies.append((sensor_type, value, sensor_config['unit']))
@@ -1607,21 +2037,38 @@ def generate_machine_data(machine):
             'normal_range': f"{sensor_config['normal_range'][0]} - {sensor_config['normal_range'][1]} {sensor_config['unit']}"
         }
 
-        reading = SensorReading(
-            machine_id=machine.id,
-            sensor_type=sensor_type,
-            value=round(value, 2),
-            unit=sensor_config['unit'],
-            is_anomaly=is_anomaly,
-            anomaly_score=round(anomaly_score, 3),
-            timestamp=current_time
-        )
+        rows.append({
+            'machine_id': machine.id,
+            'sensor_type': sensor_type,
+            'value': round(value, 2),
+            'unit': sensor_config['unit'],
+            'is_anomaly': bool(is_anomaly),
+            'anomaly_score': round(anomaly_score, 3),
+            'timestamp': current_time
+        })
+
+    return rows, all_readings, critical_anomalies
 
-        db.session.add(reading)
+def generate_machine_data(machine, generated=None):
+    """Generate, store and alert on one machine's readings outside the fleet tick"""
+    current_time = datetime.utcnow()
+    rows, all_readings, critical_anomalies = build_machine_readings(machine, generated, current_time)
+    if not rows:
+        return
 
     try:
-        db.session.commit()
+        reading_writer.write(rows)
+    except Exception as e:
+        print(f"❌ Error saving readings: {e}")
+        return
+
+    process_machine_alerts(machine, all_readings, critical_anomalies, current_time)
+
+def process_machine_alerts(machine, all_readings, critical_anomalies, current_time):
+    """CORRECTED VERSION - Fixes email spam and adds Twilio integration"""
+    global sent_maintenance_emails, sent_sabotage_emails, sent_twilio_calls
 
+    try:
         # 1. MAINTENANCE ALERT (with rate limiting to prevent spam)
         if machine.status == 'maintenance':
             irregular_sensors = detect_irregular_readings(all_readings)
@@ -1630,10 +2077,7 @@ def generate_machine_data(machine):
                 sent_maintenance_emails.add(machine.id)  # PREVENTS EMAIL SPAM
                 print(f"📧 Sending maintenance alert for {machine.name}")
 
-                recent_readings = SensorReading.query.filter(
-                    SensorReading.machine_id == machine.id,
-                    SensorReading.timestamp >= current_time - timedelta(minutes=5)
-                ).all()
+                recent_readings = query_readings(machine.id, since=current_time - timedelta(minutes=5))
 
                 enhanced_email_service.send_irregular_readings_alert(
                     machine=machine,
@@ -1740,30 +2184,163 @@ def generate_machine_data(machine):
         print(f"❌ Error in data generation: {e}")
         db.session.rollback()
 
-def start_data_generation():
-    """Main data generation loop"""
-    print("🚀 Starting real-time sensor data generation for 4 machines...")
-    generation_count = 0
+def sample_period_for(machine):
+    """Sampling period in seconds - per machine name, then per machine type"""
+    periods = GenerationConfig.SAMPLE_PERIODS
+    return periods.get(machine.name, periods.get(machine.machine_type, GenerationConfig.DEFAULT_SAMPLE_PERIOD))
 
-    while True:
-        try:
-            with app.app_context():
-                machines = Machine.query.filter_by(is_active=True).all()
+def run_generation_tick(sample_period):
+    """Generate one tick for every running machine sampled every ``sample_period`` seconds"""
+    global generation_count
 
-                for machine in machines:
-                    if machine.status != 'shutdown':
-                        generate_machine_data(machine)
+    try:
+        with app.app_context():
+            machines = machine_registry.active_machines()
+            running = [
+                m for m in machines
+                if m.status != 'shutdown' and sample_period_for(m) == sample_period
+            ]
+            if not running:
+                return
+
+            # One vectorized pass for the whole group
+            tick = tick_engine.tick([(m.id, m.machine_type, m.status) for m in running])
+            if streaming_detector is not None:
+                tick.is_anomaly, tick.anomaly_scores = streaming_detector.score_tick(tick)
+            if multivariate_detector is not None:
+                tick.is_anomaly, tick.anomaly_scores = multivariate_detector.score_tick(tick)
+            tick_time = datetime.utcnow()
+            change_events = change_detector.score_tick(tick, to_unix(tick_time)) if change_detector is not None else []
+
+            tick_rows = []
+            pending_alerts = []
+            live_events = []
+            for machine in running:
+                rows, all_readings, critical_anomalies = build_machine_readings(
+                    machine, tick.machine_readings(machine.id), tick_time
+                )
+                tick_rows.extend(rows)
+                pending_alerts.append((machine, all_readings, critical_anomalies))
+                live_events.append((machine, rows))
+
+            # Hand the tick to the writer thread; it group-commits in the background
+            reading_buffer.submit(tick_rows)
+
+            # Push the tick to live-stream and WebSocket clients straight from memory
+            live_updates = {}
+            for machine, rows in live_events:
+                payload = publish_live_readings(machine, rows, tick_time)
+                live_updates[machine.id] = {
+                    'fields': {'status': machine.status, 'updated_at': payload['timestamp']},
+                    'sensors': payload['readings']
+                }
+            live_state.apply(live_updates)
 
-                generation_count += 1
+            for machine, all_readings, critical_anomalies in pending_alerts:
+                process_machine_alerts(machine, all_readings, critical_anomalies, tick_time)
+            if change_events:
+                record_change_points(change_events, {machine.id: machine for machine in running})
 
-                if generation_count % 10 == 0:
-                    current_time = datetime.now().strftime('%H:%M:%S')
-                    print(f"📊 [{current_time}] Generated {generation_count} data cycles for {len(machines)} machines")
+            generation_count += 1
 
-        except Exception as e:
-            print(f"❌ Error in data generation: {e}")
+    except Exception as e:
+        print(f"❌ Error in data generation: {e}")
 
-        time.sleep(3)
+def record_change_points(events, machines):
+    """One 'change_point' Alert per machine for the ChangeEvents of a tick"""
+    by_machine = {}
+    for event in events:
+        by_machine.setdefault(event.machine_id, []).append(event)
+    for machine_id, machine_events in by_machine.items():
+        machine = machines[machine_id]
+        sensors = ', '.join(f'{event.sensor_type} ({event.direction})' for event in machine_events)
+        since = datetime.utcfromtimestamp(min(event.change_time for event in machine_events))
+        db.session.add(Alert(
+            machine_id=machine_id,
+            alert_type='change_point',
+            severity='medium',
+            title=f'Change Point: {machine.name}',
+            message=f'Sustained change in {sensors} since about {since.isoformat(timespec="seconds")} UTC',
+            sensor_data=json.dumps([event.to_dict() for event in machine_events])
+        ))
+    db.session.commit()
+
+def publish_live_readings(machine, rows, tick_time):
+    """Publish one machine's tick to the live hub; returns the payload"""
+    return live_hub.publish(machine.id, {
+        'machine_id': machine.id,
+        'status': machine.status,
+        'timestamp': tick_time.isoformat(),
+        'readings': {
+            row['sensor_type']: {
+                'value': row['value'],
+                'unit': row['unit'],
+                'is_anomaly': row['is_anomaly'],
+                'anomaly_score': row['anomaly_score']
+            }
+            for row in rows
+        }
+    }).payload
+
+def report_generation_status():
+    """Periodic console summary of generation throughput and timing"""
+    current_time = datetime.now().strftime('%H:%M:%S')
+    write_stats = reading_writer.stats()
+    buffer_stats = reading_buffer.stats()
+    print(f"📊 [{current_time}] Generated {generation_count} data cycles "
+          f"({write_stats['last_batch_rows_per_second']:.0f} rows/s last write, "
+          f"queue {buffer_stats['depth']}, shed {buffer_stats['shed']}, dropped {buffer_stats['dropped']})")
+
+    for name, job in generation_scheduler.stats().items():
+        if job['overruns'] or job['missed_ticks']:
+            print(f"   ⏱️ {name}: lag max {job['lag_ms']['max']}ms, "
+                  f"{job['overruns']} overruns, {job['missed_ticks']} missed ticks")
+
+def run_archive(now=None):
+    """Compress closed raw blocks that every rollup tier already covers
+
+    Archived blocks are then trimmed with the same raw retention as
+    sensor_readings.
+    """
+    now = now or datetime.utcnow()
+    until = now - timedelta(seconds=ArchiveConfig.ARCHIVE_AFTER)
+    if RollupConfig.ENABLED:
+        # Rollup tails are read from sensor_readings, so never archive ahead of them
+        rolled_until = rollup_pipeline.rolled_until()
+        if rolled_until is None:
+            return 0
+        until = min(until, rolled_until)
+
+    archived = reading_archive.archive_until(until)
+    if RollupConfig.RETENTION_DAYS.get('raw') is not None:
+        reading_archive.delete_before(now - timedelta(days=RollupConfig.RETENTION_DAYS['raw']))
+    return archived
+
+def start_maintenance():
+    """Background maintenance loop: rollups, archiving, retention and detector snapshots"""
+    if RollupConfig.ENABLED:
+        maintenance_scheduler.add_job('rollups', RollupConfig.INTERVAL, rollup_pipeline.run_once)
+    if reading_archive is not None:
+        maintenance_scheduler.add_job('archive', ArchiveConfig.INTERVAL, run_archive)
+    if any(detector is not None for detector in (streaming_detector, multivariate_detector, change_detector)):
+        maintenance_scheduler.add_job('detector-snapshot', DetectorConfig.SNAPSHOT_INTERVAL, save_detector_state)
+    maintenance_scheduler.run_forever()
+
+def start_data_generation():
+    """Main data generation loop - ticks fire on absolute deadlines per sample rate"""
+    print("🚀 Starting real-time sensor data generation for 4 machines...")
+    reading_buffer.start()
+
+    periods = {GenerationConfig.DEFAULT_SAMPLE_PERIOD, *GenerationConfig.SAMPLE_PERIODS.values()}
+    for period in sorted(periods):
+        generation_scheduler.add_job(
+            f'generate-{period:g}s', period,
+            lambda period=period: run_generation_tick(period)
+        )
+    generation_scheduler.add_job('status-report', GenerationConfig.STATUS_REPORT_PERIOD,
+                                 report_generation_status, start_delay=GenerationConfig.STATUS_REPORT_PERIOD)
+
+    generation_scheduler.run_forever()
 
 def create_tables():
     """Create database tables and sample data"""
@@ -1773,9 +2350,26 @@ def create_tables():
         db.create_all()
         print("✅ Database tables created successfully!")
 
+        # Bring existing databases up to date (indexes added after creation)
+        for table_name, indexes in migrate(db.engine, [SensorReading.__table__]).items():
+            print(f"✅ Migrated {table_name}: created {', '.join(indexes)}")
+
+        # Seed the current-state table from history the first time it exists
+        if SensorCurrent.query.first() is None and SensorReading.query.first() is not None:
+            seeded = rebuild_current_state(db.engine, SensorReading.__table__, SensorCurrent.__table__)
+            print(f"✅ Seeded sensor_current with {seeded} sensors")
+
         existing_count = Machine.query.count()
+        fleet_size = GenerationConfig.SIMULATED_FLEET_SIZE
 
-        if existing_count != 4:
+        if fleet_size:
+            if existing_count != fleet_size:
+                print(f"Found {existing_count} machines, creating simulated fleet of {fleet_size}...")
+                Machine.query.delete()
+                db.session.execute(Machine.__table__.insert(), build_fleet(fleet_size, MACHINES_CONFIG))
+                db.session.commit()
+                print(f"✅ Added {fleet_size} simulated machines to database")
+        elif existing_count != 4:
             Machine.query.delete()
 
             machines_data = [
@@ -1812,12 +2406,26 @@ def create_tables():
             db.session.commit()
             print("✅ Added exactly 4 machines to database")
 
+        # New or replaced machines - the generator must reload its fleet
+        machine_registry.invalidate()
+
+        # Units and ranges for the compact schema's sensor dictionary
+        if isinstance(reading_store, CompactReadingStore):
+            with db.engine.begin() as conn:
+                for machine in Machine.query.all():
+                    reading_store.register_sensors(
+                        machine.id, MACHINES_CONFIG.get(machine.machine_type, {}).get('sensors', {}), conn
+                    )
+
 if __name__ == '__main__':
     create_tables()
 
     data_thread = threading.Thread(target=start_data_generation, daemon=True)
     data_thread.start()
 
+    maintenance_thread = threading.Thread(target=start_maintenance, daemon=True)
+    maintenance_thread.start()
+
     print("🚀 Starting Complete Industrial Predictive Maintenance System...")
     print("🏠 Landing page: http://localhost:5000")
     print("📊 Dashboard: http://localhost:5000/dashboard")
@@ -0,0 +1,139 @@
+"""Compression ratio and decode throughput of the Gorilla reading archive.
+
+Builds throw-away SQLite databases with realistic readings: a 3-second
+cadence with scheduling jitter, slowly drifting values rounded like the
+generator's, and sparse anomalies. It then compares the uncompressed
+sensor_readings rows with the same readings moved into
+sensor_archive_blocks.
+
+    python benchmarks/bench_archive.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.archive import ReadingArchive
+from models.data_generator import MACHINES_CONFIG
+from models.database import READING_ARCHIVE, SensorReading, db
+from models.downsampling import SensorSeries
+from models.gorilla import iter_block
+from models.queries import sensor_series_statement
+
+
+def populate(path, n_rows, period=3.0):
+    """Fill a fresh database with n_rows drifting readings spread over 4 machines"""
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[SensorReading.__table__, READING_ARCHIVE])
+    engine.dispose()
+
+    slots = [(machine_id, sensor_type, config)
+             for machine_id, machine_type in enumerate(MACHINES_CONFIG, start=1)
+             for sensor_type, config in MACHINES_CONFIG[machine_type]['sensors'].items()]
+    n_ticks = max(1, n_rows // len(slots))
+    start = datetime(2025, 1, 1)
+    levels = {slot[:2]: sum(slot[2]['normal_range']) / 2 for slot in slots}
+
+    def rows():
+        for tick in range(n_ticks):
+            ts = start + timedelta(seconds=tick * period, microseconds=random.randint(0, 5000))
+            for machine_id, sensor_type, config in slots:
+                low, high = config['normal_range']
+                level = min(high, max(low, levels[(machine_id, sensor_type)] + random.gauss(0, (high - low) * 0.005)))
+                levels[(machine_id, sensor_type)] = level
+                is_anomaly = random.random() < 0.02
+                score = random.uniform(0.4, 0.9) if is_anomaly else random.uniform(0, 0.3)
+                yield (machine_id, sensor_type, round(level, 2), config['unit'], int(is_anomaly), round(score, 3),
+                       ts.strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        'INSERT INTO sensor_readings (machine_id, sensor_type, value, unit, is_anomaly, anomaly_score, timestamp) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)', rows()
+    )
+    conn.commit()
+    conn.close()
+    return start, start + timedelta(seconds=n_ticks * period), n_ticks * len(slots), slots[0][:2]
+
+
+def table_bytes(path, table):
+    """Bytes used by a table and its indexes (dbstat)"""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT SUM(pgsize) FROM dbstat WHERE tbl_name = ?', (table,)).fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        # SQLite built without dbstat: fall back to the whole file
+        return os.path.getsize(path)
+    finally:
+        conn.close()
+
+
+def best_of(repeat, func):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return min(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--block-seconds', type=int, default=7200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    header = (f"{'rows':>10} {'raw B/row':>10} {'archive B/row':>14} {'ratio':>7} "
+              f"{'row scan/s':>12} {'decode/s':>12} {'archive s':>10}")
+    print(header)
+    print('-' * len(header))
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            start, end, n_rows, (machine_id, sensor_type) = populate(path, size)
+            engine = create_engine(f'sqlite:///{path}')
+            raw_bytes = table_bytes(path, 'sensor_readings')
+
+            # One sensor's full range straight from sensor_readings rows
+            def scan_rows():
+                with engine.connect() as conn:
+                    return len(SensorSeries.from_rows(conn.execute(
+                        sensor_series_statement(SensorReading.__table__, machine_id, sensor_type, start, end)
+                    ).fetchall()))
+            row_seconds, sensor_rows = best_of(args.repeat, scan_rows)
+
+            archive = ReadingArchive(engine, SensorReading.__table__, READING_ARCHIVE, block_seconds=args.block_seconds)
+            archive_started = time.perf_counter()
+            archive.archive_until(end + timedelta(seconds=args.block_seconds))
+            archive_seconds = time.perf_counter() - archive_started
+
+            engine.dispose()
+            conn = sqlite3.connect(path)
+            conn.execute('VACUUM')
+            payloads = [payload for (payload,) in conn.execute('SELECT payload FROM sensor_archive_blocks')]
+            conn.close()
+            archive_bytes = table_bytes(path, 'sensor_archive_blocks')
+
+            # Every archived point, streamed block by block
+            def decode_all():
+                return sum(1 for payload in payloads for _ in iter_block(payload))
+            decode_seconds, decoded = best_of(args.repeat, decode_all)
+            assert decoded == n_rows
+
+            print(f"{n_rows:>10} {raw_bytes / n_rows:>10.1f} {archive_bytes / n_rows:>14.2f} "
+                  f"{raw_bytes / archive_bytes:>6.1f}x {sensor_rows / row_seconds:>12,.0f} "
+                  f"{decoded / decode_seconds:>12,.0f} {archive_seconds:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Query latency of the hot sensor_readings read paths vs table size.
+
+Builds throw-away SQLite databases of increasing size and times the
+queries behind /latest, /historical-data, /chart-data, /live-stream,
+get_pre_incident_data and the chatbot, first with only the original
+timestamp index and then with the composite
+(machine_id, sensor_type, timestamp) index.
+
+    python benchmarks/bench_sensor_index.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.data_generator import MACHINES_CONFIG
+from models.database import SensorReading, db
+from models.migrations import ensure_indexes
+
+QUERIES = {
+    'latest_per_sensor': (
+        "SELECT * FROM sensor_readings WHERE machine_id = :machine_id AND sensor_type = :sensor_type "
+        "ORDER BY timestamp DESC LIMIT 1"
+    ),
+    'last_20_per_sensor': (
+        "SELECT * FROM sensor_readings WHERE machine_id = :machine_id AND sensor_type = :sensor_type "
+        "ORDER BY timestamp DESC LIMIT 20"
+    ),
+    'distinct_sensor_types': (
+        "SELECT DISTINCT sensor_type FROM sensor_readings WHERE machine_id = :machine_id"
+    ),
+    'chatbot_latest_10': (
+        "SELECT * FROM sensor_readings WHERE machine_id = :machine_id ORDER BY timestamp DESC LIMIT 10"
+    ),
+    'pre_incident_window': (
+        "SELECT * FROM sensor_readings WHERE machine_id = :machine_id AND timestamp >= :start "
+        "AND timestamp < :end ORDER BY timestamp DESC LIMIT 20"
+    ),
+}
+
+COMPOSITE_INDEX = 'ix_sensor_readings_machine_sensor_ts'
+
+
+def populate(path, n_rows, period=3.0):
+    """Fill a fresh database with n_rows readings spread over 4 machines"""
+    engine = create_engine(f'sqlite:///{path}')
+    table = SensorReading.__table__
+    db.metadata.create_all(engine, tables=[table])
+    engine.dispose()
+
+    # Start from the original schema: timestamp index only
+    conn = sqlite3.connect(path)
+    conn.execute(f'DROP INDEX IF EXISTS {COMPOSITE_INDEX}')
+
+    slots = [(machine_id, sensor_type, config['unit'])
+             for machine_id, machine_type in enumerate(MACHINES_CONFIG, start=1)
+             for sensor_type, config in MACHINES_CONFIG[machine_type]['sensors'].items()]
+    n_ticks = max(1, n_rows // len(slots))
+    start = datetime(2025, 1, 1)
+
+    def rows():
+        for tick in range(n_ticks):
+            ts = (start + timedelta(seconds=tick * period)).strftime('%Y-%m-%d %H:%M:%S.%f')
+            for machine_id, sensor_type, unit in slots:
+                yield (machine_id, sensor_type, random.uniform(0, 100), unit, 0, 0.0, ts)
+
+    conn.executemany(
+        'INSERT INTO sensor_readings (machine_id, sensor_type, value, unit, is_anomaly, anomaly_score, timestamp) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)', rows()
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+    end = start + timedelta(seconds=n_ticks * period)
+    return {
+        'machine_id': 1,
+        'sensor_type': slots[0][1],
+        'start': (end - timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'end': end.strftime('%Y-%m-%d %H:%M:%S.%f'),
+    }, n_ticks * len(slots)
+
+
+def time_queries(path, params, repeat):
+    """Median latency in milliseconds for each query"""
+    conn = sqlite3.connect(path)
+    results = {}
+    for name, sql in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[name] = samples[len(samples) // 2]
+    conn.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    header = f"{'rows':>10} {'query':<22} {'before ms':>10} {'after ms':>10} {'speedup':>8}"
+    print(header)
+    print('-' * len(header))
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            params, n_rows = populate(path, size)
+            before = time_queries(path, params, args.repeat)
+
+            engine = create_engine(f'sqlite:///{path}')
+            ensure_indexes(engine, SensorReading.__table__)
+            engine.dispose()
+            after = time_queries(path, params, args.repeat)
+
+            for name in QUERIES:
+                speedup = before[name] / after[name] if after[name] else float('inf')
+                print(f"{n_rows:>10} {name:<22} {before[name]:>10.3f} {after[name]:>10.3f} {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
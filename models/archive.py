@@ -0,0 +1,242 @@
+"""Compressed archive of closed sensor_readings time blocks.
+
+Readings older than the archive horizon are moved in fixed, aligned time
+blocks, one row per (machine, sensor, block), into
+sensor_archive_blocks. Each row holds a Gorilla-compressed payload (see
+models/gorilla.py). The move runs in one transaction per block, so every
+reading is in exactly one of the two tables. Range reads stream-decode
+the blocks that overlap the range and stop as soon as they pass its end.
+
+    python -m models.archive machines.db
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Table, create_engine, func, select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.downsampling import SensorSeries
+from models.gorilla import encode_block, iter_block
+from models.reading_stores import StoredReading
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def archive_table(metadata):
+    return Table(
+        'sensor_archive_blocks', metadata,
+        Column('machine_id', Integer, ForeignKey('machines.id'), primary_key=True),
+        Column('sensor_type', String(50), primary_key=True),
+        Column('block_start', DateTime, primary_key=True),
+        Column('first_timestamp', DateTime, nullable=False),
+        Column('last_timestamp', DateTime, nullable=False),
+        Column('count', Integer, nullable=False),
+        Column('unit', String(20), nullable=False),
+        Column('payload', LargeBinary, nullable=False)
+    )
+
+
+def to_micros(timestamp):
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class ReadingArchive:
+    """Move closed blocks of raw readings into compressed archive rows and read them back"""
+
+    def __init__(self, engine, readings_table, table, block_seconds=7200, fetch_rows=50000):
+        self.engine = engine
+        self.readings = readings_table
+        self.table = table
+        self.block = timedelta(seconds=block_seconds)
+        self.fetch_rows = fetch_rows
+        self._lock = threading.Lock()
+        self.blocks_written = 0
+        self.rows_archived = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.blocks_deleted = 0
+        self.last_run_seconds = 0.0
+
+    def _floor(self, timestamp):
+        return EPOCH + ((timestamp - EPOCH) // self.block) * self.block
+
+    def _archive_window(self, conn, start, end):
+        raw = self.readings
+        result = conn.execute(
+            select(raw.c.machine_id, raw.c.sensor_type, raw.c.timestamp, raw.c.value,
+                   raw.c.anomaly_score, raw.c.is_anomaly, raw.c.unit)
+            .where(raw.c.timestamp >= start, raw.c.timestamp < end)
+            .order_by(raw.c.machine_id, raw.c.sensor_type, raw.c.timestamp)
+        )
+        rows = itertools.chain.from_iterable(iter(lambda: result.fetchmany(self.fetch_rows), []))
+
+        blocks = []
+        archived = 0
+        compressed = 0
+        for (machine_id, sensor_type), group in itertools.groupby(rows, key=lambda row: (row[0], row[1])):
+            _, _, timestamps, values, scores, anomalies, units = zip(*group)
+            payload = encode_block([to_micros(t) for t in timestamps], values,
+                                   [score or 0.0 for score in scores], anomalies)
+            blocks.append({
+                'machine_id': machine_id,
+                'sensor_type': sensor_type,
+                'block_start': start,
+                'first_timestamp': timestamps[0],
+                'last_timestamp': timestamps[-1],
+                'count': len(timestamps),
+                'unit': units[0],
+                'payload': payload
+            })
+            archived += len(timestamps)
+            compressed += len(payload)
+
+        if blocks:
+            conn.execute(self.table.insert(), blocks)
+            conn.execute(raw.delete().where(raw.c.timestamp >= start, raw.c.timestamp < end))
+        return len(blocks), archived, compressed
+
+    def archive_until(self, until):
+        """Archive every whole block ending at or before ``until``; returns rows archived"""
+        with self.engine.connect() as conn:
+            last = conn.execute(select(func.max(self.table.c.block_start))).scalar()
+            first = conn.execute(select(func.min(self.readings.c.timestamp))).scalar()
+        if first is None:
+            return 0
+        since = self._floor(first) if last is None else max(last + self.block, self._floor(first))
+
+        started = time.perf_counter()
+        total = 0
+        while since + self.block <= until:
+            with self.engine.begin() as conn:
+                blocks, archived, compressed = self._archive_window(conn, since, since + self.block)
+            with self._lock:
+                self.blocks_written += blocks
+                self.rows_archived += archived
+                # timestamp + value + score + flag as fixed-width columns
+                self.raw_bytes += archived * 25
+                self.compressed_bytes += compressed
+            total += archived
+            since += self.block
+        with self._lock:
+            self.last_run_seconds = time.perf_counter() - started
+        return total
+
+    def delete_before(self, cutoff):
+        """Drop archive blocks whose newest reading is older than ``cutoff``"""
+        with self.engine.begin() as conn:
+            deleted = conn.execute(self.table.delete().where(self.table.c.last_timestamp < cutoff)).rowcount
+        with self._lock:
+            self.blocks_deleted += deleted
+        return deleted
+
+    def iter_range(self, conn, machine_id, sensor_type, start=None, end=None):
+        """Stream (timestamp_us, value, score, is_anomaly) points of archived readings in [start, end]"""
+        table = self.table
+        statement = select(table.c.payload).where(table.c.machine_id == machine_id, table.c.sensor_type == sensor_type)
+        if start is not None:
+            statement = statement.where(table.c.last_timestamp >= start)
+        if end is not None:
+            statement = statement.where(table.c.first_timestamp <= end)
+        start_us = to_micros(start) if start is not None else None
+        end_us = to_micros(end) if end is not None else None
+
+        for (payload,) in conn.execute(statement.order_by(table.c.block_start)):
+            for point in iter_block(payload):
+                if start_us is not None and point[0] < start_us:
+                    continue
+                if end_us is not None and point[0] > end_us:
+                    break
+                yield point
+
+    def load_series(self, conn, machine_id, sensor_type, start=None, end=None):
+        """Archived readings in [start, end] as a SensorSeries"""
+        points = list(self.iter_range(conn, machine_id, sensor_type, start, end))
+        if not points:
+            return SensorSeries(np.empty(0), np.empty(0), np.empty(0, dtype=bool), np.empty(0))
+        timestamps, values, scores, anomalies = zip(*points)
+        return SensorSeries(np.array(timestamps, dtype=np.int64) / 1e6, np.array(values),
+                            np.array(anomalies, dtype=bool), np.array(scores))
+
+    def recent(self, conn, machine_id, sensor_type=None, since=None, until=None, limit=None, anomalies_only=False):
+        """Newest-first archived readings as StoredReadings, with query_readings' filters
+
+        Blocks are aligned windows, so they are decoded newest window first
+        and decoding stops once ``limit`` readings are collected.
+        """
+        table = self.table
+        statement = select(table.c.block_start, table.c.sensor_type, table.c.unit, table.c.payload).where(
+            table.c.machine_id == machine_id)
+        if sensor_type is not None:
+            statement = statement.where(table.c.sensor_type == sensor_type)
+        if since is not None:
+            statement = statement.where(table.c.last_timestamp >= since)
+        if until is not None:
+            statement = statement.where(table.c.first_timestamp < until)
+        since_us = to_micros(since) if since is not None else None
+        until_us = to_micros(until) if until is not None else None
+
+        readings = []
+        blocks = conn.execute(statement.order_by(table.c.block_start.desc()))
+        for _, window in itertools.groupby(blocks, key=lambda block: block[0]):
+            if limit is not None and len(readings) >= limit:
+                break
+            for _, block_sensor, unit, payload in window:
+                for timestamp_us, value, score, is_anomaly in iter_block(payload):
+                    if ((since_us is not None and timestamp_us < since_us)
+                            or (until_us is not None and timestamp_us >= until_us)
+                            or (anomalies_only and not is_anomaly)):
+                        continue
+                    readings.append(StoredReading(machine_id, block_sensor, value, unit, bool(is_anomaly),
+                                                  score, from_micros(timestamp_us)))
+        readings.sort(key=lambda reading: reading.timestamp, reverse=True)
+        return readings[:limit] if limit is not None else readings
+
+    def sensor_types(self, conn, machine_id):
+        """Sensor types with at least one archived block"""
+        return [sensor_type for (sensor_type,) in conn.execute(
+            select(self.table.c.sensor_type).where(self.table.c.machine_id == machine_id).distinct()
+        )]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'blocks_written': self.blocks_written,
+                'rows_archived': self.rows_archived,
+                'compression_ratio': round(self.raw_bytes / self.compressed_bytes, 2) if self.compressed_bytes else None,
+                'bytes_per_reading': round(self.compressed_bytes / self.rows_archived, 2) if self.rows_archived else None,
+                'blocks_deleted': self.blocks_deleted,
+                'last_run_seconds': round(self.last_run_seconds, 4)
+            }
+
+
+def main(argv=None):
+    from models.database import READING_ARCHIVE, SensorReading, db
+
+    argv = argv if argv is not None else sys.argv[1:]
+    path = argv[0] if argv else 'machines.db'
+    hours = float(argv[1]) if len(argv) > 1 else 24.0
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[READING_ARCHIVE])
+
+    print(f"🗜️ Archiving readings older than {hours:g}h in {path}...")
+    archive = ReadingArchive(engine, SensorReading.__table__, READING_ARCHIVE)
+    archived = archive.archive_until(datetime.utcnow() - timedelta(hours=hours))
+    stats = archive.stats()
+    print(f"   ✅ {archived} readings in {stats['blocks_written']} blocks "
+          f"({stats['bytes_per_reading']} bytes/reading, {stats['compression_ratio']}x)")
+    return archived
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class BulkReadingWriter:
+    """Write a whole tick of sensor readings with one core-level executemany.
+
+    Rows are plain dicts keyed by sensor_readings column names. Each call to
+    write() runs a single INSERT executemany inside one transaction, which
+    avoids per-object ORM overhead and the commit-per-machine pattern.
+
+    ``after_insert`` callables receive (connection, rows) and run inside the
+    same transaction, e.g. to maintain derived tables atomically.
+
+    ``row_filter`` (e.g. a DeadbandFilter) picks the rows that are actually
+    stored; the hooks still see every row of the tick.
+    """
+
+    def __init__(self, engine, table, after_insert=None, row_filter=None):
+        self.engine = engine
+        self.table = table
+        self.after_insert = list(after_insert or [])
+        self.row_filter = row_filter
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows_written = 0
+        self.rows_filtered = 0
+        self.write_seconds = 0.0
+        self.last_batch_rows = 0
+        self.last_batch_seconds = 0.0
+
+    def write(self, rows):
+        """Insert rows in one transaction and return the number stored"""
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        stored = self.row_filter(rows) if self.row_filter else rows
+        with self.engine.begin() as conn:
+            if stored:
+                conn.execute(self.table.insert(), stored)
+            for hook in self.after_insert:
+                hook(conn, rows)
+        self._record(len(stored), time.perf_counter() - started, len(rows) - len(stored))
+        return len(stored)
+
+    def _record(self, count, elapsed, filtered=0):
+        with self._lock:
+            self.batches += 1
+            self.rows_written += count
+            self.rows_filtered += filtered
+            self.write_seconds += elapsed
+            self.last_batch_rows = count
+            self.last_batch_seconds = elapsed
+
+    def stats(self):
+        """Throughput counters, including overall and last-batch rows per second"""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'rows_written': self.rows_written,
+                'rows_filtered': self.rows_filtered,
+                'write_seconds': round(self.write_seconds, 4),
+                'rows_per_second': round(self.rows_written / self.write_seconds, 1) if self.write_seconds else 0.0,
+                'last_batch_rows': self.last_batch_rows,
+                'last_batch_rows_per_second': round(self.last_batch_rows / self.last_batch_seconds, 1) if self.last_batch_seconds else 0.0
+            }
@@ -0,0 +1,477 @@
+"""Append-only columnar store for sensor readings.
+
+An alternative to one SQLite row per reading. Every (machine, sensor) has
+its own directory of segments, and each segment keeps one flat file per
+column:
+
+    <root>/<machine_id>/<sensor_type>/
+        meta.json           unit and the time bounds of sealed segments
+        000000.ts           int64 epoch microseconds, ascending
+        000000.value        float64
+        000000.score        float64 anomaly score
+        000000.anomaly      bool
+
+Appends go to the newest segment with plain file writes. The timestamp
+column is written last, so a crash can only leave a partial tail, which
+is truncated when the sensor is next opened. Once a segment holds
+``segment_rows`` rows it is sealed, and its bounds are recorded in
+meta.json. Reads memory-map the segments, so a range scan inside one
+segment is a NumPy view of the page cache. Retention drops whole sealed
+segments.
+
+    python -m models.columnar_store machines.db instance/readings
+"""
+import json
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.downsampling import SensorSeries
+from models.reading_stores import StoredReading
+
+# Column files of a segment, in write order; 'ts' goes last and marks the rows as complete
+COLUMNS = (('value', np.float64), ('score', np.float64), ('anomaly', np.bool_), ('ts', np.int64))
+COLUMN_DTYPES = dict(COLUMNS)
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp):
+    """Naive UTC datetime -> int epoch microseconds"""
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=int(micros))
+
+
+class Segment:
+    __slots__ = ('number', 'count', 't_min', 't_max')
+
+    def __init__(self, number, count=0, t_min=None, t_max=None):
+        self.number = number
+        self.count = count
+        self.t_min = t_min
+        self.t_max = t_max
+
+    def overlaps(self, start, end):
+        """Whether any row may fall in [start, end); None leaves a side open"""
+        return self.count > 0 and (start is None or self.t_max >= start) and (end is None or self.t_min < end)
+
+
+class SensorColumns:
+    """The segments of one (machine, sensor).
+
+    ``sealed`` holds the full segments in write order, and ``active`` is the
+    one being appended to. Segments are normally ordered in time. If rows
+    arrive older than the active segment's newest row, the active segment
+    is sealed early so that each segment stays sorted. Reads then merge the
+    overlapping segments.
+    """
+
+    def __init__(self, path, segment_rows, unit=None):
+        self.path = path
+        self.segment_rows = segment_rows
+        self.lock = threading.Lock()
+
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        else:
+            meta = {'unit': unit, 'sealed': []}
+        self.unit = meta['unit'] if meta['unit'] is not None else unit
+        self.sealed = [Segment(*bounds) for bounds in meta['sealed']]
+
+        sealed_numbers = {segment.number for segment in self.sealed}
+        numbers = sorted(int(name.split('.')[0]) for name in os.listdir(path) if name.endswith('.ts'))
+        open_numbers = [number for number in numbers if number not in sealed_numbers]
+        next_number = max(numbers + [-1]) + 1
+        self.active = self._recover(open_numbers[-1]) if open_numbers else Segment(next_number)
+        if not os.path.exists(meta_path):
+            self._save_meta()
+
+    def _file(self, number, column):
+        return os.path.join(self.path, f'{number:06d}.{column}')
+
+    def _recover(self, number):
+        """Reopen an unsealed segment, truncating columns to the rows complete in all of them"""
+        sizes = [os.path.getsize(self._file(number, column)) if os.path.exists(self._file(number, column)) else 0
+                 for column, _ in COLUMNS]
+        count = min(size // np.dtype(dtype).itemsize for size, (_, dtype) in zip(sizes, COLUMNS))
+        for column, dtype in COLUMNS:
+            path = self._file(number, column)
+            if os.path.exists(path) and os.path.getsize(path) != count * np.dtype(dtype).itemsize:
+                os.truncate(path, count * np.dtype(dtype).itemsize)
+        segment = Segment(number, count)
+        if count:
+            ts = np.memmap(self._file(number, 'ts'), dtype=np.int64, mode='r', shape=(count,))
+            segment.t_min, segment.t_max = int(ts[0]), int(ts[-1])
+        return segment
+
+    def _save_meta(self):
+        meta = {
+            'unit': self.unit,
+            'sealed': [[s.number, s.count, s.t_min, s.t_max] for s in self.sealed]
+        }
+        temporary = os.path.join(self.path, 'meta.json.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(self.path, 'meta.json'))
+
+    def _seal(self):
+        self.sealed.append(self.active)
+        self.active = Segment(self.active.number + 1)
+        self._save_meta()
+
+    def append(self, ts, value, score, anomaly):
+        """Append rows already sorted by ``ts``; returns the number of sealed segments created"""
+        columns = {'ts': ts, 'value': value, 'score': score, 'anomaly': anomaly}
+        sealed = 0
+        with self.lock:
+            position = 0
+            while position < len(ts):
+                active = self.active
+                if active.count and ts[position] < active.t_max:
+                    # Keep every segment sorted: out-of-order rows start a new one
+                    self._seal()
+                    sealed += 1
+                    continue
+
+                take = min(len(ts) - position, self.segment_rows - active.count)
+                for column, dtype in COLUMNS:
+                    with open(self._file(active.number, column), 'ab') as f:
+                        np.ascontiguousarray(columns[column][position:position + take], dtype=dtype).tofile(f)
+
+                if not active.count:
+                    active.t_min = int(ts[position])
+                active.t_max = int(ts[position + take - 1])
+                active.count += take
+                position += take
+
+                if active.count >= self.segment_rows:
+                    self._seal()
+                    sealed += 1
+        return sealed
+
+    def segments(self):
+        """Snapshot of the non-empty segments as (segment, sealed) pairs, oldest first"""
+        with self.lock:
+            segments = [(Segment(s.number, s.count, s.t_min, s.t_max), True) for s in self.sealed]
+            if self.active.count:
+                a = self.active
+                segments.append((Segment(a.number, a.count, a.t_min, a.t_max), False))
+        return segments
+
+    def drop_before(self, cutoff):
+        """Delete sealed segments whose newest row is older than ``cutoff`` (epoch us).
+
+        Returns (dropped segment numbers, rows dropped).
+        """
+        with self.lock:
+            dropped = [s for s in self.sealed if s.t_max < cutoff]
+            if not dropped:
+                return [], 0
+            self.sealed = [s for s in self.sealed if s.t_max >= cutoff]
+            self._save_meta()
+        for segment in dropped:
+            for column, _ in COLUMNS:
+                os.remove(self._file(segment.number, column))
+        return [s.number for s in dropped], sum(s.count for s in dropped)
+
+
+class ColumnarStore:
+    """Reading storage made of per-sensor memory-mapped segments.
+
+    ``scan()`` yields zero-copy views, one per segment touched. ``read()``
+    and ``series()`` join those views into one sorted range. Mappings of
+    sealed segments never change, so up to ``max_open_segments`` of them
+    are cached. The active segment is re-mapped on every read because it
+    keeps growing.
+    """
+
+    def __init__(self, root, segment_rows=65536, max_open_segments=256):
+        self.root = root
+        self.segment_rows = segment_rows
+        self.max_open_segments = max_open_segments
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._sensors = {}
+        self._maps = OrderedDict()
+        self.rows_appended = 0
+        self.segments_sealed = 0
+        self.segments_dropped = 0
+        self.rows_dropped = 0
+        self.map_hits = 0
+        self.map_misses = 0
+
+    # -- sensors -----------------------------------------------------------
+
+    def _sensor(self, machine_id, sensor_type, unit=None, create=False):
+        key = (int(machine_id), sensor_type)
+        with self._lock:
+            sensor = self._sensors.get(key)
+            if sensor is None:
+                path = os.path.join(self.root, str(key[0]), sensor_type)
+                if not os.path.isdir(path):
+                    if not create:
+                        return None
+                    os.makedirs(path, exist_ok=True)
+                sensor = self._sensors[key] = SensorColumns(path, self.segment_rows, unit)
+            return sensor
+
+    def sensor_types(self, machine_id):
+        path = os.path.join(self.root, str(int(machine_id)))
+        if not os.path.isdir(path):
+            return []
+        return sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+
+    def sensors(self):
+        """Every stored (machine_id, sensor_type)"""
+        keys = []
+        for machine in sorted((name for name in os.listdir(self.root) if name.isdigit()), key=int):
+            keys.extend((int(machine), sensor_type) for sensor_type in self.sensor_types(machine))
+        return keys
+
+    # -- writes ------------------------------------------------------------
+
+    def append_columns(self, machine_id, sensor_type, unit, ts, value, score, anomaly):
+        """Append column arrays for one sensor (``ts`` in epoch microseconds)"""
+        ts = np.asarray(ts, dtype=np.int64)
+        if not len(ts):
+            return 0
+        columns = [ts, np.asarray(value, dtype=np.float64), np.asarray(score, dtype=np.float64),
+                   np.asarray(anomaly, dtype=np.bool_)]
+        if np.any(ts[1:] < ts[:-1]):
+            order = np.argsort(ts, kind='stable')
+            columns = [column[order] for column in columns]
+
+        sealed = self._sensor(machine_id, sensor_type, unit, create=True).append(*columns)
+        with self._lock:
+            self.rows_appended += len(ts)
+            self.segments_sealed += sealed
+        return len(ts)
+
+    def append(self, rows):
+        """Append sensor_readings-style row dicts; returns the number stored"""
+        grouped = {}
+        for row in rows:
+            grouped.setdefault((row['machine_id'], row['sensor_type']), []).append(row)
+
+        stored = 0
+        for (machine_id, sensor_type), sensor_rows in grouped.items():
+            stored += self.append_columns(
+                machine_id, sensor_type, sensor_rows[0]['unit'],
+                [to_micros(row['timestamp']) for row in sensor_rows],
+                [row['value'] for row in sensor_rows],
+                [row['anomaly_score'] or 0.0 for row in sensor_rows],
+                [bool(row['is_anomaly']) for row in sensor_rows]
+            )
+        return stored
+
+    # -- reads -------------------------------------------------------------
+
+    def _map(self, sensor, segment, sealed):
+        """Read-only column maps (ts, value, score, anomaly) of one segment"""
+        key = (sensor.path, segment.number)
+        if sealed:
+            with self._lock:
+                columns = self._maps.get(key)
+                if columns is not None:
+                    self._maps.move_to_end(key)
+                    self.map_hits += 1
+                    return columns
+
+        columns = tuple(
+            np.memmap(sensor._file(segment.number, column), dtype=COLUMN_DTYPES[column], mode='r', shape=(segment.count,))
+            for column in ('ts', 'value', 'score', 'anomaly')
+        )
+        with self._lock:
+            self.map_misses += 1
+            if sealed:
+                self._maps[key] = columns
+                while len(self._maps) > self.max_open_segments:
+                    self._maps.popitem(last=False)
+        return columns
+
+    def scan(self, machine_id, sensor_type, start=None, end=None):
+        """Yield (ts, value, score, anomaly) views of each segment's rows in [start, end)"""
+        sensor = self._sensor(machine_id, sensor_type)
+        if sensor is None:
+            return
+        start_us = to_micros(start) if start is not None else None
+        end_us = to_micros(end) if end is not None else None
+
+        for segment, sealed in sensor.segments():
+            if not segment.overlaps(start_us, end_us):
+                continue
+            columns = self._map(sensor, segment, sealed)
+            ts = columns[0]
+            lo = int(np.searchsorted(ts, start_us, 'left')) if start_us is not None else 0
+            hi = int(np.searchsorted(ts, end_us, 'left')) if end_us is not None else segment.count
+            if hi > lo:
+                yield tuple(column[lo:hi] for column in columns)
+
+    def read(self, machine_id, sensor_type, start=None, end=None):
+        """(ts, value, score, anomaly) arrays for [start, end), sorted by time.
+
+        A range inside one segment comes back as views with no copy.
+        """
+        parts = list(self.scan(machine_id, sensor_type, start, end))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=np.bool_))
+
+        columns = [np.concatenate(column) for column in zip(*parts)]
+        if np.any(columns[0][1:] < columns[0][:-1]):
+            order = np.argsort(columns[0], kind='stable')
+            columns = [column[order] for column in columns]
+        return tuple(columns)
+
+    def series(self, machine_id, sensor_type, start=None, end=None):
+        """The range as a SensorSeries, as used for downsampling and rollups"""
+        ts, value, score, anomaly = self.read(machine_id, sensor_type, start, end)
+        return SensorSeries(ts / 1e6, value, anomaly, score)
+
+    def unit(self, machine_id, sensor_type):
+        sensor = self._sensor(machine_id, sensor_type)
+        return sensor.unit if sensor else None
+
+    def recent(self, machine_id, sensor_type=None, since=None, until=None, limit=None, anomalies_only=False):
+        """Newest-first StoredReadings of one machine, filtered like a SensorReading query"""
+        sensor_types = [sensor_type] if sensor_type is not None else self.sensor_types(machine_id)
+        picked = []
+        for name in sensor_types:
+            ts, value, score, anomaly = self.read(machine_id, name, since, until)
+            if anomalies_only:
+                mask = np.asarray(anomaly)
+                ts, value, score, anomaly = ts[mask], value[mask], score[mask], anomaly[mask]
+            if limit is not None:
+                ts, value, score, anomaly = ts[-limit:], value[-limit:], score[-limit:], anomaly[-limit:]
+            unit = self.unit(machine_id, name)
+            picked.extend(
+                (t, StoredReading(int(machine_id), name, v, unit, a, s, None))
+                for t, v, s, a in zip(ts.tolist(), value.tolist(), score.tolist(), anomaly.tolist())
+            )
+
+        picked.sort(key=lambda item: item[0], reverse=True)
+        if limit is not None:
+            picked = picked[:limit]
+        return [reading._replace(timestamp=from_micros(t)) for t, reading in picked]
+
+    def first_timestamp(self):
+        """Oldest stored timestamp across all sensors, or None"""
+        firsts = []
+        for machine_id, sensor_type in self.sensors():
+            segments = self._sensor(machine_id, sensor_type).segments()
+            if segments:
+                firsts.append(min(segment.t_min for segment, _ in segments))
+        return from_micros(min(firsts)) if firsts else None
+
+    # -- retention ---------------------------------------------------------
+
+    def _forget_maps(self, sensor, numbers):
+        with self._lock:
+            for number in numbers:
+                self._maps.pop((sensor.path, number), None)
+
+    def drop_before(self, cutoff):
+        """Drop every sealed segment that ends before ``cutoff``; returns rows dropped.
+
+        Retention works in whole segments, so up to one segment per sensor
+        of older rows can outlive the cutoff.
+        """
+        cutoff_us = to_micros(cutoff)
+        total = 0
+        for machine_id, sensor_type in self.sensors():
+            sensor = self._sensor(machine_id, sensor_type)
+            numbers, rows = sensor.drop_before(cutoff_us)
+            if numbers:
+                self._forget_maps(sensor, numbers)
+                with self._lock:
+                    self.segments_dropped += len(numbers)
+                    self.rows_dropped += rows
+                total += rows
+        return total
+
+    def delete_machine(self, machine_id):
+        """Remove every stored reading of one machine"""
+        path = os.path.join(self.root, str(int(machine_id)))
+        with self._lock:
+            for key in [key for key in self._sensors if key[0] == int(machine_id)]:
+                sensor = self._sensors.pop(key)
+                for map_key in [k for k in self._maps if k[0] == sensor.path]:
+                    del self._maps[map_key]
+        shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'root': self.root,
+                'sensors_open': len(self._sensors),
+                'rows_appended': self.rows_appended,
+                'segments_sealed': self.segments_sealed,
+                'segments_dropped': self.segments_dropped,
+                'rows_dropped': self.rows_dropped,
+                'cached_maps': len(self._maps),
+                'map_hits': self.map_hits,
+                'map_misses': self.map_misses
+            }
+
+
+def import_sqlite(engine, readings_table, store, batch_rows=200000):
+    """Copy sensor_readings into ``store``, one (machine, sensor) at a time"""
+    table = readings_table
+    copied = 0
+    with engine.connect() as conn:
+        keys = conn.execute(
+            select(table.c.machine_id, table.c.sensor_type).distinct().order_by(table.c.machine_id, table.c.sensor_type)
+        ).fetchall()
+        for machine_id, sensor_type in keys:
+            result = conn.execute(
+                select(table.c.timestamp, table.c.value, table.c.anomaly_score, table.c.is_anomaly, table.c.unit)
+                .where(table.c.machine_id == machine_id, table.c.sensor_type == sensor_type)
+                .order_by(table.c.timestamp)
+            )
+            while True:
+                rows = result.fetchmany(batch_rows)
+                if not rows:
+                    break
+                timestamps, values, scores, anomalies, units = zip(*rows)
+                copied += store.append_columns(
+                    machine_id, sensor_type, units[0],
+                    [to_micros(timestamp) for timestamp in timestamps],
+                    values,
+                    [score or 0.0 for score in scores],
+                    [bool(anomaly) for anomaly in anomalies]
+                )
+    return copied
+
+
+def main(argv=None):
+    from models.database import SensorReading
+
+    argv = argv if argv is not None else sys.argv[1:]
+    path = argv[0] if argv else 'machines.db'
+    root = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(path)), 'readings')
+
+    print(f"📦 Copying sensor_readings from {path} into {root}...")
+    store = ColumnarStore(root)
+    copied = import_sqlite(create_engine(f'sqlite:///{path}'), SensorReading.__table__, store)
+    print(f"   ✅ {copied} readings in {len(store.sensors())} sensor series")
+    return copied
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""Normalized, compact SQLite schema for raw readings.
+
+sensor_readings repeats the machine id, the sensor_type and unit strings,
+and a 26-character timestamp in every row. It also carries a rowid and two
+secondary indexes. This backend keeps one dictionary row per sensor, and
+readings as
+
+    sensor_readings_compact(sensor_id, epoch_ms, value, score, flag)
+        PRIMARY KEY (sensor_id, epoch_ms) WITHOUT ROWID
+
+so each sensor's readings are clustered in time order in the primary key
+b-tree. A range query is then one contiguous b-tree walk, with no index
+lookup back into the table.
+
+    python -m models.compact_readings machines.db
+"""
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import (Boolean, Column, Float, ForeignKey, Integer, String, Table, UniqueConstraint,
+                        create_engine, func, select, text)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.downsampling import JULIAN_UNIX_EPOCH, SensorSeries
+from models.reading_stores import StoredReading
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+def compact_reading_tables(metadata):
+    """Declare the sensors dictionary and sensor_readings_compact; returns (sensors, readings)"""
+    sensors = Table(
+        'sensors', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('machine_id', Integer, ForeignKey('machines.id'), nullable=False),
+        Column('sensor_type', String(50), nullable=False),
+        Column('unit', String(20), nullable=False),
+        Column('min_value', Float),
+        Column('max_value', Float),
+        Column('normal_min', Float),
+        Column('normal_max', Float),
+        UniqueConstraint('machine_id', 'sensor_type', name='uq_sensors_machine_sensor')
+    )
+    readings = Table(
+        'sensor_readings_compact', metadata,
+        Column('sensor_id', Integer, ForeignKey('sensors.id'), primary_key=True, autoincrement=False),
+        Column('epoch_ms', Integer, primary_key=True, autoincrement=False),
+        Column('value', Float, nullable=False),
+        Column('score', Float, nullable=False),
+        Column('flag', Boolean, nullable=False),
+        sqlite_with_rowid=False
+    )
+    return sensors, readings
+
+
+def to_millis(timestamp):
+    """Naive UTC datetime -> int epoch milliseconds"""
+    return (timestamp - EPOCH) // MILLISECOND
+
+
+def from_millis(millis):
+    return EPOCH + timedelta(milliseconds=millis)
+
+
+class CompactReadingStore:
+    """Reading store over the sensors dictionary and sensor_readings_compact.
+
+    Timestamps are kept to the millisecond. A second reading for the same
+    sensor in the same millisecond replaces the first.
+    """
+
+    def __init__(self, engine, sensors_table, readings_table):
+        self.engine = engine
+        self.sensors_table = sensors_table
+        self.table = readings_table
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._units = {}
+        self.rows_appended = 0
+        self.rows_dropped = 0
+
+    # -- sensor dictionary -------------------------------------------------
+
+    def _load_dictionary(self, conn):
+        rows = conn.execute(select(
+            self.sensors_table.c.id, self.sensors_table.c.machine_id,
+            self.sensors_table.c.sensor_type, self.sensors_table.c.unit
+        )).fetchall()
+        with self._lock:
+            for sensor_id, machine_id, sensor_type, unit in rows:
+                self._ids[(machine_id, sensor_type)] = sensor_id
+                self._units[sensor_id] = unit
+
+    def register_sensors(self, machine_id, sensor_configs, conn=None):
+        """Add or refresh dictionary rows from a MACHINES_CONFIG 'sensors' mapping"""
+        rows = [{
+            'machine_id': machine_id,
+            'sensor_type': sensor_type,
+            'unit': config['unit'],
+            'min_value': config.get('min'),
+            'max_value': config.get('max'),
+            'normal_min': config.get('normal_range', (None, None))[0],
+            'normal_max': config.get('normal_range', (None, None))[1]
+        } for sensor_type, config in sensor_configs.items()]
+        if not rows:
+            return 0
+
+        statement = sqlite_insert(self.sensors_table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['machine_id', 'sensor_type'],
+            set_={name: statement.excluded[name] for name in ('unit', 'min_value', 'max_value', 'normal_min', 'normal_max')}
+        )
+        if conn is None:
+            with self.engine.begin() as conn:
+                conn.execute(statement, rows)
+                self._load_dictionary(conn)
+        else:
+            conn.execute(statement, rows)
+            self._load_dictionary(conn)
+        return len(rows)
+
+    def _sensor_ids(self, conn, keys_units):
+        """Dictionary ids for {(machine_id, sensor_type): unit}, creating missing entries"""
+        with self._lock:
+            missing = {key: unit for key, unit in keys_units.items() if key not in self._ids}
+        if missing:
+            conn.execute(sqlite_insert(self.sensors_table).on_conflict_do_nothing(), [
+                {'machine_id': machine_id, 'sensor_type': sensor_type, 'unit': unit}
+                for (machine_id, sensor_type), unit in missing.items()
+            ])
+            self._load_dictionary(conn)
+        with self._lock:
+            return {key: self._ids[key] for key in keys_units}
+
+    def _sensor_id(self, machine_id, sensor_type):
+        key = (int(machine_id), sensor_type)
+        with self._lock:
+            if key in self._ids:
+                return self._ids[key]
+        with self.engine.connect() as conn:
+            self._load_dictionary(conn)
+        with self._lock:
+            return self._ids.get(key)
+
+    def sensors(self):
+        """Every registered (machine_id, sensor_type)"""
+        with self.engine.connect() as conn:
+            self._load_dictionary(conn)
+        with self._lock:
+            return sorted(self._ids)
+
+    def sensor_types(self, machine_id):
+        return [sensor_type for mid, sensor_type in self.sensors() if mid == int(machine_id)]
+
+    # -- writes ------------------------------------------------------------
+
+    def append(self, rows, conn=None):
+        """Insert sensor_readings-style row dicts; returns the number stored"""
+        if not rows:
+            return 0
+        if conn is None:
+            with self.engine.begin() as conn:
+                return self.append(rows, conn)
+
+        ids = self._sensor_ids(conn, {(row['machine_id'], row['sensor_type']): row['unit'] for row in rows})
+        conn.execute(self.table.insert().prefix_with('OR REPLACE'), [{
+            'sensor_id': ids[(row['machine_id'], row['sensor_type'])],
+            'epoch_ms': to_millis(row['timestamp']),
+            'value': row['value'],
+            'score': row['anomaly_score'] or 0.0,
+            'flag': bool(row['is_anomaly'])
+        } for row in rows])
+        with self._lock:
+            self.rows_appended += len(rows)
+        return len(rows)
+
+    # -- reads -------------------------------------------------------------
+
+    def _range(self, statement, start, end):
+        if start is not None:
+            statement = statement.where(self.table.c.epoch_ms >= to_millis(start))
+        if end is not None:
+            statement = statement.where(self.table.c.epoch_ms < to_millis(end))
+        return statement
+
+    def read(self, machine_id, sensor_type, start=None, end=None):
+        """(ts_us, value, score, anomaly) arrays for [start, end), sorted by time"""
+        sensor_id = self._sensor_id(machine_id, sensor_type)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=np.bool_))
+        if sensor_id is None:
+            return empty
+        table = self.table
+        statement = self._range(
+            select(table.c.epoch_ms, table.c.value, table.c.score, table.c.flag).where(table.c.sensor_id == sensor_id),
+            start, end
+        ).order_by(table.c.epoch_ms)
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement).fetchall()
+        if not rows:
+            return empty
+        millis, value, score, flag = zip(*rows)
+        return (np.asarray(millis, dtype=np.int64) * 1000, np.asarray(value, dtype=np.float64),
+                np.asarray(score, dtype=np.float64), np.asarray(flag, dtype=np.bool_))
+
+    def series(self, machine_id, sensor_type, start=None, end=None):
+        ts, value, score, anomaly = self.read(machine_id, sensor_type, start, end)
+        return SensorSeries(ts / 1e6, value, anomaly, score)
+
+    def recent(self, machine_id, sensor_type=None, since=None, until=None, limit=None, anomalies_only=False):
+        """Newest-first StoredReadings of one machine, filtered like a SensorReading query"""
+        sensor_types = [sensor_type] if sensor_type is not None else self.sensor_types(machine_id)
+        table = self.table
+        picked = []
+        with self.engine.connect() as conn:
+            for name in sensor_types:
+                sensor_id = self._sensor_id(machine_id, name)
+                if sensor_id is None:
+                    continue
+                statement = self._range(
+                    select(table.c.epoch_ms, table.c.value, table.c.score, table.c.flag).where(table.c.sensor_id == sensor_id),
+                    since, until
+                )
+                if anomalies_only:
+                    statement = statement.where(table.c.flag == True)
+                statement = statement.order_by(table.c.epoch_ms.desc())
+                if limit is not None:
+                    statement = statement.limit(limit)
+                unit = self._units.get(sensor_id)
+                picked.extend(
+                    StoredReading(int(machine_id), name, value, unit, bool(flag), score, from_millis(millis))
+                    for millis, value, score, flag in conn.execute(statement)
+                )
+
+        picked.sort(key=lambda reading: reading.timestamp, reverse=True)
+        return picked[:limit] if limit is not None else picked
+
+    def first_timestamp(self):
+        self.sensors()
+        firsts = []
+        with self.engine.connect() as conn:
+            for sensor_id in list(self._units):
+                first = conn.execute(select(func.min(self.table.c.epoch_ms)).where(self.table.c.sensor_id == sensor_id)).scalar()
+                if first is not None:
+                    firsts.append(first)
+        return from_millis(min(firsts)) if firsts else None
+
+    # -- retention ---------------------------------------------------------
+
+    def drop_before(self, cutoff):
+        """Delete readings older than ``cutoff``, one sensor's key range at a time"""
+        self.sensors()
+        cutoff_ms = to_millis(cutoff)
+        total = 0
+        for sensor_id in list(self._units):
+            with self.engine.begin() as conn:
+                total += conn.execute(self.table.delete().where(
+                    self.table.c.sensor_id == sensor_id, self.table.c.epoch_ms < cutoff_ms
+                )).rowcount
+        with self._lock:
+            self.rows_dropped += total
+        return total
+
+    def delete_machine(self, machine_id):
+        ids = select(self.sensors_table.c.id).where(self.sensors_table.c.machine_id == int(machine_id))
+        with self.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.sensor_id.in_(ids)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sensors': len(self._ids),
+                'rows_appended': self.rows_appended,
+                'rows_dropped': self.rows_dropped
+            }
+
+
+def migrate_readings(engine, readings_table, sensors_table, compact_table, machine_types=None, batch_rows=500000):
+    """Copy sensor_readings into the compact schema; returns the number of rows copied.
+
+    ``machine_types`` maps machine_id -> MACHINES_CONFIG entry to fill in the
+    sensor ranges. Rows are copied in rowid batches with INSERT ... SELECT,
+    so the data never passes through Python.
+    """
+    store = CompactReadingStore(engine, sensors_table, compact_table)
+    raw = readings_table
+    with engine.begin() as conn:
+        for machine_id, config in (machine_types or {}).items():
+            store.register_sensors(machine_id, config.get('sensors', {}), conn)
+        keys = conn.execute(select(raw.c.machine_id, raw.c.sensor_type, func.max(raw.c.unit))
+                            .group_by(raw.c.machine_id, raw.c.sensor_type)).fetchall()
+        store._sensor_ids(conn, {(machine_id, sensor_type): unit for machine_id, sensor_type, unit in keys})
+
+        low, high = conn.execute(select(func.min(raw.c.id), func.max(raw.c.id))).one()
+    if low is None:
+        return 0
+
+    copy = text(
+        'INSERT OR REPLACE INTO sensor_readings_compact (sensor_id, epoch_ms, value, score, flag) '
+        'SELECT s.id, CAST(ROUND((julianday(r.timestamp) - :epoch) * 86400000) AS INTEGER), '
+        '       r.value, COALESCE(r.anomaly_score, 0.0), COALESCE(r.is_anomaly, 0) '
+        'FROM sensor_readings r JOIN sensors s ON s.machine_id = r.machine_id AND s.sensor_type = r.sensor_type '
+        'WHERE r.id >= :low AND r.id < :high'
+    )
+    copied = 0
+    for batch_low in range(low, high + 1, batch_rows):
+        with engine.begin() as conn:
+            copied += conn.execute(copy, {'epoch': JULIAN_UNIX_EPOCH, 'low': batch_low, 'high': batch_low + batch_rows}).rowcount
+    return copied
+
+
+def table_bytes(engine, table_name):
+    """Bytes used by a table and its indexes, or None when SQLite lacks dbstat"""
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text('SELECT SUM(pgsize) FROM dbstat WHERE tbl_name = :name'), {'name': table_name}).scalar()
+        except Exception:
+            return None
+
+
+def main(argv=None):
+    from models.data_generator import MACHINES_CONFIG
+    from models.database import COMPACT_READING_TABLES, Machine, SensorReading, db
+
+    argv = argv if argv is not None else sys.argv[1:]
+    path = argv[0] if argv else 'machines.db'
+    engine = create_engine(f'sqlite:///{path}')
+    sensors_table, compact_table = COMPACT_READING_TABLES
+    db.metadata.create_all(engine, tables=[sensors_table, compact_table])
+
+    with engine.connect() as conn:
+        machines = conn.execute(select(Machine.__table__.c.id, Machine.__table__.c.machine_type)).fetchall()
+    machine_types = {machine_id: MACHINES_CONFIG[machine_type]
+                     for machine_id, machine_type in machines if machine_type in MACHINES_CONFIG}
+
+    print(f"🔧 Copying sensor_readings in {path} into sensor_readings_compact...")
+    copied = migrate_readings(engine, SensorReading.__table__, sensors_table, compact_table, machine_types)
+    print(f"   ✅ {copied} readings copied")
+
+    raw_bytes = table_bytes(engine, SensorReading.__tablename__)
+    compact_bytes = table_bytes(engine, compact_table.name)
+    if copied and raw_bytes and compact_bytes:
+        print(f"   📦 {raw_bytes / copied:.1f} -> {compact_bytes / copied:.1f} bytes per reading")
+    print("   ℹ️ Set StorageConfig.READING_BACKEND = 'compact' to read and write the new tables")
+    return copied
+
+
+if __name__ == '__main__':
+    main()
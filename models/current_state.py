@@ -0,0 +1,66 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+CURRENT_STATE_COLUMNS = ('value', 'unit', 'is_anomaly', 'anomaly_score', 'timestamp')
+
+
+def latest_rows_by_sensor(rows):
+    """Keep only the newest row per (machine_id, sensor_type)"""
+    latest = {}
+    for row in rows:
+        key = (row['machine_id'], row['sensor_type'])
+        current = latest.get(key)
+        if current is None or row['timestamp'] >= current['timestamp']:
+            latest[key] = row
+    return list(latest.values())
+
+
+def upsert_current_state(conn, table, rows):
+    """Upsert the newest value per sensor into the current-state table.
+
+    Older rows never overwrite newer ones, so out-of-order batches from the
+    write-behind buffer are harmless.
+    """
+    latest = latest_rows_by_sensor(rows)
+    if not latest:
+        return 0
+
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=['machine_id', 'sensor_type'],
+        set_={column: statement.excluded[column] for column in CURRENT_STATE_COLUMNS},
+        where=statement.excluded.timestamp >= table.c.timestamp
+    )
+    conn.execute(statement, [
+        {key: row[key] for key in ('machine_id', 'sensor_type') + CURRENT_STATE_COLUMNS}
+        for row in latest
+    ])
+    return len(latest)
+
+
+def current_state_hook(table):
+    """BulkReadingWriter after_insert hook maintaining ``table``"""
+    def hook(conn, rows):
+        upsert_current_state(conn, table, rows)
+    return hook
+
+
+def rebuild_current_state(engine, readings_table, current_table):
+    """Seed the current-state table from history with one INSERT ... SELECT"""
+    ranked = select(
+        *[readings_table.c[name] for name in ('machine_id', 'sensor_type') + CURRENT_STATE_COLUMNS],
+        func.row_number().over(
+            partition_by=(readings_table.c.machine_id, readings_table.c.sensor_type),
+            order_by=readings_table.c.timestamp.desc()
+        ).label('row_number')
+    ).subquery()
+    newest = select(*[ranked.c[name] for name in ('machine_id', 'sensor_type') + CURRENT_STATE_COLUMNS]).where(
+        ranked.c.row_number == 1
+    )
+
+    with engine.begin() as conn:
+        conn.execute(current_table.delete())
+        result = conn.execute(insert(current_table).from_select(
+            ['machine_id', 'sensor_type'] + list(CURRENT_STATE_COLUMNS), newest
+        ))
+    return result.rowcount
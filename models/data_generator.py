@@ -33,6 +33,14 @@ MACHINES_CONFIG = {
             "pressure": {"min": 0.1, "max": 5.0, "unit": "bar", "normal_range": [0.5, 2.0]},
             "reflux_ratio": {"min": 1, "max": 10, "unit": "ratio", "normal_range": [2, 6]}
         }
+    },
+    "Heat Exchanger": {
+        "sensors": {
+            "inlet_temp": {"min": 25, "max": 150, "unit": "°C", "normal_range": [40, 90]},
+            "outlet_temp": {"min": 30, "max": 180, "unit": "°C", "normal_range": [50, 120]},
+            "pressure_drop": {"min": 0.1, "max": 3.0, "unit": "bar", "normal_range": [0.2, 1.5]},
+            "flow_rate": {"min": 10, "max": 200, "unit": "L/min", "normal_range": [40, 160]}
+        }
     }
 }
 
@@ -2,6 +2,10 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import json
 
+from models.archive import archive_table
+from models.compact_readings import compact_reading_tables
+from models.rollups import rollup_tables
+
 db = SQLAlchemy()
 
 class Machine(db.Model):
@@ -36,6 +40,10 @@ class SensorReading(db.Model):
     """Individual sensor readings from machines"""
 
     __tablename__ = 'sensor_readings'
+    __table_args__ = (
+        # Hot read paths filter by machine + sensor and order by newest first
+        db.Index('ix_sensor_readings_machine_sensor_ts', 'machine_id', 'sensor_type', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), nullable=False)
@@ -58,6 +66,39 @@ class SensorReading(db.Model):
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+class SensorCurrent(db.Model):
+    """Latest reading per (machine, sensor), upserted with every tick's inserts"""
+
+    __tablename__ = 'sensor_current'
+
+    machine_id = db.Column(db.Integer, db.ForeignKey('machines.id'), primary_key=True)
+    sensor_type = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    is_anomaly = db.Column(db.Boolean, default=False)
+    anomaly_score = db.Column(db.Float, default=0.0)
+    timestamp = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'machine_id': self.machine_id,
+            'sensor_type': self.sensor_type,
+            'value': self.value,
+            'unit': self.unit,
+            'is_anomaly': self.is_anomaly,
+            'anomaly_score': self.anomaly_score,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        }
+
+# 1-minute, 1-hour and 1-day aggregates of sensor_readings (see models/rollups.py)
+ROLLUP_TABLES = rollup_tables(db.metadata)
+
+# Gorilla-compressed blocks of archived sensor_readings (see models/archive.py)
+READING_ARCHIVE = archive_table(db.metadata)
+
+# Sensor dictionary + WITHOUT ROWID readings (see models/compact_readings.py)
+COMPACT_READING_TABLES = compact_reading_tables(db.metadata)
+
 class Alert(db.Model):
     """System alerts and notifications"""
 
@@ -0,0 +1,104 @@
+"""Deadband storage: keep a reading only when it says something new.
+
+DeadbandFilter sits in front of the reading writer. Per (machine, sensor)
+it remembers the last stored reading. A new reading is stored if it is an
+anomaly, follows a stored anomaly, or moved more than the sensor's
+tolerance. It is also stored once ``heartbeat`` seconds passed since the
+last stored reading. Everything else is dropped before it reaches the
+database.
+
+expand_steps() turns such a sparse series back into a regular one for
+readers. Each stored value is held, at the machine's sample period,
+until the next stored reading. The last one is held until the end of the
+range or the heartbeat, whichever comes first.
+"""
+import threading
+
+import numpy as np
+
+from models.downsampling import SensorSeries
+
+
+class DeadbandFilter:
+    """Drop readings that stay within a per-sensor tolerance of the last stored value.
+
+    ``tolerance_for(machine_id, sensor_type)`` returns the absolute
+    tolerance, or None to store every reading of that sensor (e.g. while
+    the machine is not in a deadband mode).
+    """
+
+    def __init__(self, tolerance_for, heartbeat=60.0):
+        self.tolerance_for = tolerance_for
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._last = {}
+        self.rows_seen = 0
+        self.rows_stored = 0
+
+    def __call__(self, rows):
+        """Rows of one tick that must be stored, in their original order"""
+        stored = []
+        with self._lock:
+            for row in rows:
+                key = (row['machine_id'], row['sensor_type'])
+                last = self._last.get(key)
+                tolerance = self.tolerance_for(*key)
+                if (tolerance is None or last is None or row['is_anomaly'] or last[2]
+                        or abs(row['value'] - last[0]) > tolerance
+                        or (row['timestamp'] - last[1]).total_seconds() >= self.heartbeat):
+                    self._last[key] = (row['value'], row['timestamp'], bool(row['is_anomaly']))
+                    stored.append(row)
+            self.rows_seen += len(rows)
+            self.rows_stored += len(stored)
+        return stored
+
+    def forget(self, machine_id):
+        """Start over for a machine whose readings were deleted or replaced"""
+        with self._lock:
+            for key in [key for key in self._last if key[0] == machine_id]:
+                del self._last[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sensors': len(self._last),
+                'rows_seen': self.rows_seen,
+                'rows_stored': self.rows_stored,
+                'stored_ratio': round(self.rows_stored / self.rows_seen, 4) if self.rows_seen else None
+            }
+
+
+def expand_steps(series, period, start=None, end=None, heartbeat=None):
+    """Hold each stored value at ``period`` seconds until the next one
+
+    ``end`` and ``heartbeat`` (seconds) bound how far the last value is held.
+    Points before ``start`` are dropped after expanding, so a value stored
+    before the range still fills its beginning. Gaps are rounded to whole
+    periods, so sampling jitter never adds a point right before a stored
+    one. The writer stores the first tick at least ``heartbeat`` after the
+    last stored one, i.e. within ``heartbeat + period`` even when the tick
+    near the heartbeat came a hair early. Longer gaps are outages: values
+    are held for at most that long and the rest stays a gap. Held points
+    copy the value and score but are never anomalies.
+    """
+    if len(series) < 1 or not period or period <= 0:
+        return series
+
+    t = series.t
+    horizon = t[-1] + (heartbeat if heartbeat is not None else period)
+    if end is not None:
+        horizon = min(horizon, end)
+    gaps = np.append(np.diff(t), max(horizon - t[-1], 0.0))
+    if heartbeat is not None:
+        gaps[:-1] = np.minimum(gaps[:-1], heartbeat + period)
+    counts = np.maximum(np.round(gaps / period).astype(np.int64), 1)
+    # The last value covers [t_last, horizon]: one point per whole period inside it,
+    # give or take the ~10us julianday() timestamps carry
+    counts[-1] = int(np.floor(gaps[-1] / period + 1e-4)) + 1
+
+    index = np.repeat(np.arange(len(t)), counts)
+    steps = np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    expanded = t[index] + steps * period
+    keep = expanded >= start if start is not None else slice(None)
+    return SensorSeries(expanded[keep], series.value[index][keep],
+                        (series.is_anomaly[index] & (steps == 0))[keep], series.anomaly_score[index][keep])
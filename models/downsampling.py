@@ -0,0 +1,272 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+DOWNSAMPLING_METHODS = ('lttb', 'minmax')
+
+# SQLite julianday() of the Unix epoch
+JULIAN_UNIX_EPOCH = 2440587.5
+
+
+class SensorSeries:
+    """One sensor's readings as parallel NumPy arrays, ordered by time.
+
+    ``t`` holds Unix seconds (UTC, matching the naive utcnow() timestamps
+    stored in sensor_readings).
+    """
+
+    def __init__(self, t, value, is_anomaly, anomaly_score):
+        self.t = t
+        self.value = value
+        self.is_anomaly = is_anomaly
+        self.anomaly_score = anomaly_score
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (julianday, value, is_anomaly, anomaly_score) tuples"""
+        if not rows:
+            return cls(np.empty(0), np.empty(0), np.empty(0, dtype=bool), np.empty(0))
+        # Transpose first: NumPy probes result Row objects per element otherwise
+        julian, value, is_anomaly, score = (np.asarray(column, dtype=np.float64) for column in zip(*rows))
+        return cls((julian - JULIAN_UNIX_EPOCH) * 86400.0, value, is_anomaly > 0, score)
+
+    @classmethod
+    def concat(cls, parts):
+        """Join series, re-sorting only if their time ranges interleave"""
+        columns = [np.concatenate([getattr(p, name) for p in parts])
+                   for name in ('t', 'value', 'is_anomaly', 'anomaly_score')]
+        if np.any(columns[0][1:] < columns[0][:-1]):
+            order = np.argsort(columns[0], kind='stable')
+            columns = [column[order] for column in columns]
+        return cls(*columns)
+
+    def __len__(self):
+        return len(self.t)
+
+
+def to_unix(timestamp):
+    """Naive UTC datetime -> Unix seconds"""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+def iso_timestamps(t):
+    # julianday() round-trips with ~10us of float error; milliseconds are plenty for charts
+    return [datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat(timespec='milliseconds')
+            for ts in np.round(t, 3).tolist()]
+
+
+def lttb_indices(x, y, n_out):
+    """Indices picked by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the mean of the next bucket. Bucket means come from
+    one reduceat pass and each bucket's areas are computed as a vector, so
+    the Python loop runs once per output point, not per input point.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 1)]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The point after bucket i is the mean of bucket i + 1; the last bucket looks at the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def lttb_points(series, max_points, unit):
+    """Downsample to real readings chosen by LTTB"""
+    picked = lttb_indices(series.t, series.value, max_points)
+    return [
+        {
+            'timestamp': timestamp,
+            'value': value,
+            'unit': unit,
+            'is_anomaly': is_anomaly,
+            'anomaly_score': score
+        }
+        for timestamp, value, is_anomaly, score in zip(
+            iso_timestamps(series.t[picked]),
+            series.value[picked].tolist(),
+            series.is_anomaly[picked].tolist(),
+            series.anomaly_score[picked].tolist()
+        )
+    ]
+
+
+def minmax_buckets(series, n_buckets, start, end):
+    """Aggregate into equal-width time buckets over [start, end] (Unix seconds).
+
+    Returns a dict of arrays (start, min, max, mean, count, anomaly_count,
+    max_score) for the non-empty buckets only.
+    """
+    width = max(end - start, 1e-9) / n_buckets
+    bucket = np.clip(((series.t - start) / width).astype(np.int64), 0, n_buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, len(series)])
+    return {
+        'start': start + bucket[starts] * width,
+        'min': np.minimum.reduceat(series.value, starts),
+        'max': np.maximum.reduceat(series.value, starts),
+        'mean': np.add.reduceat(series.value, starts) / counts,
+        'count': counts,
+        'anomaly_count': np.add.reduceat(series.is_anomaly.astype(np.int64), starts),
+        'max_score': np.maximum.reduceat(series.anomaly_score, starts)
+    }
+
+
+def minmax_points(series, max_points, unit, start, end):
+    """Downsample to one min/max/mean point per time bucket"""
+    buckets = minmax_buckets(series, max_points, start, end)
+    return [
+        {
+            'timestamp': timestamp,
+            'value': round(mean, 3),
+            'min': low,
+            'max': high,
+            'count': count,
+            'unit': unit,
+            'is_anomaly': anomalies > 0,
+            'anomaly_count': anomalies,
+            'anomaly_score': score
+        }
+        for timestamp, mean, low, high, count, anomalies, score in zip(
+            iso_timestamps(buckets['start']),
+            buckets['mean'].tolist(),
+            buckets['min'].tolist(),
+            buckets['max'].tolist(),
+            buckets['count'].tolist(),
+            buckets['anomaly_count'].tolist(),
+            buckets['max_score'].tolist()
+        )
+    ]
+
+
+def downsample(series, max_points, unit, start, end, method='lttb'):
+    """Chart points for ``series``; raw readings are returned as-is when they already fit"""
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}")
+    if len(series) == 0:
+        return []
+    if len(series) <= max_points:
+        return lttb_points(series, len(series), unit)
+    if method == 'minmax':
+        return minmax_points(series, max_points, unit, start, end)
+    return lttb_points(series, max_points, unit)
+
+
+class AggregateSeries:
+    """Pre-aggregated buckets (e.g. rollup rows) as parallel NumPy arrays, ordered by time"""
+
+    def __init__(self, t, count, min_value, max_value, sum_value, anomaly_count, max_score):
+        self.t = t
+        self.count = count
+        self.min = min_value
+        self.max = max_value
+        self.sum = sum_value
+        self.anomaly_count = anomaly_count
+        self.max_score = max_score
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (julianday, count, min, max, sum, anomaly_count, max_score) tuples"""
+        if not rows:
+            return cls(*(np.empty(0) for _ in range(7)))
+        columns = [np.asarray(column, dtype=np.float64) for column in zip(*rows)]
+        columns[0] = (columns[0] - JULIAN_UNIX_EPOCH) * 86400.0
+        return cls(*columns)
+
+    @classmethod
+    def from_series(cls, series):
+        """Treat every raw reading as a bucket of one"""
+        ones = np.ones(len(series))
+        return cls(series.t, ones, series.value, series.value, series.value,
+                   series.is_anomaly.astype(np.float64), series.anomaly_score)
+
+    @classmethod
+    def concat(cls, parts):
+        return cls(*(np.concatenate([getattr(p, name) for p in parts])
+                     for name in ('t', 'count', 'min', 'max', 'sum', 'anomaly_count', 'max_score')))
+
+    @property
+    def mean(self):
+        return self.sum / np.maximum(self.count, 1)
+
+    def __len__(self):
+        return len(self.t)
+
+
+def merge_buckets(series, n_buckets, start, end):
+    """Re-bucket aggregates into equal-width time buckets, keeping min/max/mean exact"""
+    width = max(end - start, 1e-9) / n_buckets
+    bucket = np.clip(((series.t - start) / width).astype(np.int64), 0, n_buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    return AggregateSeries(
+        start + bucket[starts] * width,
+        np.add.reduceat(series.count, starts),
+        np.minimum.reduceat(series.min, starts),
+        np.maximum.reduceat(series.max, starts),
+        np.add.reduceat(series.sum, starts),
+        np.add.reduceat(series.anomaly_count, starts),
+        np.maximum.reduceat(series.max_score, starts)
+    )
+
+
+def aggregate_points(series, max_points, unit, start, end, method='lttb'):
+    """Chart points (mean plus min/max/count) for pre-aggregated buckets.
+
+    ``minmax`` merges buckets exactly; ``lttb`` picks the buckets whose
+    means best preserve the shape of the curve.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}")
+    if len(series) == 0:
+        return []
+    if len(series) > max_points:
+        if method == 'minmax':
+            series = merge_buckets(series, max_points, start, end)
+        else:
+            picked = lttb_indices(series.t, series.mean, max_points)
+            series = AggregateSeries(*(getattr(series, name)[picked]
+                                       for name in ('t', 'count', 'min', 'max', 'sum', 'anomaly_count', 'max_score')))
+
+    return [
+        {
+            'timestamp': timestamp,
+            'value': round(mean, 3),
+            'min': low,
+            'max': high,
+            'count': int(count),
+            'unit': unit,
+            'is_anomaly': anomalies > 0,
+            'anomaly_count': int(anomalies),
+            'anomaly_score': score
+        }
+        for timestamp, mean, low, high, count, anomalies, score in zip(
+            iso_timestamps(series.t),
+            series.mean.tolist(),
+            series.min.tolist(),
+            series.max.tolist(),
+            series.count.tolist(),
+            series.anomaly_count.tolist(),
+            series.max_score.tolist()
+        )
+    ]
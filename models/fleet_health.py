@@ -0,0 +1,217 @@
+"""Fleet-wide sensor health in NumPy.
+
+FleetHealthEngine keeps every sensor's health reference point in parallel
+arrays: base health, base time, degradation rate and a shutdown flag.
+evaluate() then computes health, status bucket and remaining useful life
+for the whole fleet, or any subset of rows, in one vectorized pass.
+Health loses ``rate`` percent per hour from its base and stops at 0;
+shutdown sensors keep their base health.
+
+HealthHistory samples those snapshots into sensor_health_history at a
+fixed interval. It reads them back as SensorSeries, so trend charts reuse
+the reading downsamplers.
+"""
+import sqlite3
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from models.downsampling import SensorSeries
+
+STATUS_NAMES = ('shutdown', 'critical', 'degrading', 'warning', 'healthy')
+# Lower health bound of critical/degrading/warning/healthy, shutdown being <= 0
+STATUS_BOUNDS = np.array([20.0, 50.0, 80.0])
+CRITICAL = STATUS_NAMES.index('critical')
+
+HEALTH_HISTORY_DDL = '''
+    CREATE TABLE IF NOT EXISTS sensor_health_history (
+        machine_id INTEGER NOT NULL,
+        sensor_type TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        health REAL NOT NULL,
+        status INTEGER NOT NULL,
+        PRIMARY KEY (machine_id, sensor_type, timestamp)
+    ) WITHOUT ROWID
+'''
+
+
+def status_codes(health):
+    """Index into STATUS_NAMES for each health value"""
+    codes = np.searchsorted(STATUS_BOUNDS, health, side='right') + 1
+    codes[health <= 0] = 0
+    return codes
+
+
+def status_name(health):
+    return STATUS_NAMES[int(status_codes(np.array([health]))[0])]
+
+
+class HealthSnapshot(namedtuple('HealthSnapshot', ['keys', 'health', 'status', 'rul_hours'])):
+    """Evaluated health of some sensors at one instant, as parallel arrays.
+
+    ``keys`` lists (machine_id, sensor_type); ``status`` holds STATUS_NAMES
+    indexes; ``rul_hours`` is the time until health reaches 0 at the
+    current rate (inf for sensors that do not degrade, 0 once shut down).
+    """
+
+    __slots__ = ()
+
+    def items(self):
+        """(key, health, status name, rul_hours) per sensor"""
+        for key, health, status, rul in zip(self.keys, self.health.tolist(), self.status.tolist(),
+                                            self.rul_hours.tolist()):
+            yield key, health, STATUS_NAMES[status], rul
+
+
+class FleetHealthEngine:
+    """Health reference points for every sensor, evaluated for the whole fleet at once.
+
+    Not thread-safe on its own; SensorHealthTracker serializes access.
+    """
+
+    def __init__(self, rates, default_rate=0.5, capacity=64):
+        self.rates = rates
+        self.default_rate = default_rate
+        self.index = {}
+        self.keys = []
+        self.by_machine = {}
+        self._base_health = np.zeros(capacity)
+        self._base_time = np.zeros(capacity)
+        self._rate = np.zeros(capacity)
+        self._shutdown = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def _grow(self):
+        for name in ('_base_health', '_base_time', '_rate', '_shutdown'):
+            column = getattr(self, name)
+            grown = np.zeros(max(2 * len(column), 64), dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def set(self, machine_id, sensor_type, health, when, shutdown=False):
+        """New reference point: ``health`` at ``when`` (Unix seconds)"""
+        key = (machine_id, sensor_type)
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self._base_health):
+                self._grow()
+            self.index[key] = row
+            self.keys.append(key)
+            self.by_machine.setdefault(machine_id, []).append(row)
+        self._base_health[row] = health
+        self._base_time[row] = when
+        self._rate[row] = self.rates.get(sensor_type, self.default_rate)
+        self._shutdown[row] = shutdown
+
+    def state(self, key):
+        """(base_health, base_time, rate, shutdown) of one sensor"""
+        row = self.index[key]
+        return (float(self._base_health[row]), float(self._base_time[row]),
+                float(self._rate[row]), bool(self._shutdown[row]))
+
+    def clear(self):
+        self.index = {}
+        self.keys = []
+        self.by_machine = {}
+
+    def rows(self, machine_id=None):
+        """Row numbers of one machine's sensors, or of every sensor"""
+        if machine_id is None:
+            return np.arange(len(self.keys))
+        return np.array(self.by_machine.get(machine_id, []), dtype=np.int64)
+
+    def evaluate(self, now, rows=None):
+        """HealthSnapshot of ``rows`` (default: every sensor) at ``now`` (Unix seconds)"""
+        if rows is None:
+            rows = self.rows()
+        base = self._base_health[rows]
+        rate = self._rate[rows]
+        shutdown = self._shutdown[rows]
+        hours = (now - self._base_time[rows]) / 3600.0
+
+        health = np.where(shutdown, base, np.maximum(base - rate * hours, 0.0))
+        status = status_codes(health)
+        status[shutdown] = 0
+        with np.errstate(divide='ignore'):
+            rul = np.where(rate > 0, health / rate, np.inf)
+        rul[status == 0] = 0.0
+        return HealthSnapshot([self.keys[row] for row in rows.tolist()], health, status, rul)
+
+
+class HealthHistory:
+    """Fixed-interval health samples per sensor in sensor_health_history"""
+
+    def __init__(self, database, retention_days=30):
+        self.database = database
+        self.retention = retention_days * 86400.0 if retention_days else None
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self.samples = 0
+        self.rows_written = 0
+
+    def ensure_table(self, conn):
+        if not self._table_ready:
+            conn.execute(HEALTH_HISTORY_DDL)
+            self._table_ready = True
+
+    def record(self, snapshot, now):
+        """Store one sample per sensor of ``snapshot`` taken at ``now`` (Unix seconds)"""
+        rows = [(machine_id, sensor_type, now, health, status)
+                for (machine_id, sensor_type), health, status in zip(
+                    snapshot.keys, np.round(snapshot.health, 3).tolist(), snapshot.status.tolist())]
+        with self.database.writer() as conn:
+            self.ensure_table(conn)
+            if rows:
+                conn.executemany('INSERT OR REPLACE INTO sensor_health_history VALUES (?, ?, ?, ?, ?)', rows)
+            if self.retention is not None:
+                conn.execute('DELETE FROM sensor_health_history WHERE timestamp < ?', (now - self.retention,))
+        with self._lock:
+            self.samples += 1
+            self.rows_written += len(rows)
+        return len(rows)
+
+    def series(self, machine_id, sensor_type, start, end):
+        """Samples in [start, end] (Unix seconds) as a SensorSeries.
+
+        ``value`` is the health percentage; critical and shutdown samples
+        are flagged as anomalies so charts can highlight them.
+        """
+        with self.database.reader() as conn:
+            try:
+                rows = conn.execute(
+                    'SELECT timestamp, health, status FROM sensor_health_history '
+                    'WHERE machine_id = ? AND sensor_type = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp',
+                    (machine_id, sensor_type, start, end)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # No sample recorded yet: the table does not exist
+                rows = []
+        if not rows:
+            return SensorSeries(np.empty(0), np.empty(0), np.empty(0, dtype=bool), np.empty(0))
+        t, health, status = (np.asarray(column, dtype=np.float64) for column in zip(*rows))
+        return SensorSeries(t, health, status <= CRITICAL, np.zeros(len(t)))
+
+    def earliest(self, machine_id, since):
+        """{sensor_type: (timestamp, health)} of each sensor's first sample at or after ``since``"""
+        with self.database.reader() as conn:
+            try:
+                rows = conn.execute(
+                    'SELECT sensor_type, MIN(timestamp), health FROM sensor_health_history '
+                    'WHERE machine_id = ? AND timestamp >= ? GROUP BY sensor_type',
+                    (machine_id, since)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+        # SQLite takes the bare health column from the MIN(timestamp) row
+        return {sensor_type: (timestamp, health) for sensor_type, timestamp, health in rows}
+
+    def stats(self):
+        with self._lock:
+            return {'samples': self.samples, 'rows_written': self.rows_written}
@@ -0,0 +1,174 @@
+"""Fleet-scale simulation for capacity planning.
+
+Instantiates N machines from the MACHINES_CONFIG templates and generates
+readings for them across a multiprocessing pool, one shard per core. Each
+shard runs its own FleetTickEngine and writes every tick through the bulk
+path, so the numbers reflect the storage layer rather than Python loops.
+
+    python -m models.fleet_simulator --machines 20000 --ticks 20
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.bulk_writer import BulkReadingWriter
+from models.data_generator import MACHINES_CONFIG
+from models.database import Machine, SensorReading, db
+from models.tick_engine import FleetTickEngine
+
+DEFAULT_DATABASE_URI = 'sqlite:///fleet_sim.db'
+
+
+def build_fleet(n_machines, machines_config=MACHINES_CONFIG):
+    """Machine rows for N machines, cycling through the configured templates"""
+    machine_types = list(machines_config.keys())
+    fleet = []
+    for i in range(n_machines):
+        machine_type = machine_types[i % len(machine_types)]
+        fleet.append({
+            'name': f'{machine_type} SIM-{i + 1:05d}',
+            'machine_type': machine_type,
+            'description': f'Simulated {machine_type.lower()} for fleet capacity planning',
+            'location': f'Simulated Plant - Zone {i // 100 + 1}',
+            'status': 'normal',
+            'is_active': True
+        })
+    return fleet
+
+
+def assign_statuses(n_machines, status_mix, seed=None):
+    """Draw a status per machine from {'normal': 0.9, 'sabotage': 0.1, ...}"""
+    statuses = list(status_mix.keys())
+    weights = np.array([status_mix[s] for s in statuses], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    return rng.choice(statuses, size=n_machines, p=weights / weights.sum()).tolist()
+
+
+def parse_status_mix(text):
+    """Parse 'normal=0.9,maintenance=0.08,sabotage=0.02'"""
+    mix = {}
+    for part in text.split(','):
+        status, _, weight = part.partition('=')
+        mix[status.strip()] = float(weight)
+    return mix
+
+
+def create_fleet(engine, fleet, statuses):
+    """(Re)create the simulation tables and insert the fleet; returns machine ids"""
+    tables = [Machine.__table__, SensorReading.__table__]
+    db.metadata.drop_all(engine, tables=tables)
+    db.metadata.create_all(engine, tables=tables)
+
+    rows = [dict(machine, id=i + 1, status=status) for i, (machine, status) in enumerate(zip(fleet, statuses))]
+    with engine.begin() as conn:
+        conn.execute(Machine.__table__.insert(), rows)
+    return [row['id'] for row in rows]
+
+
+def _run_shard(args):
+    """Worker: generate and bulk-write every tick for one shard of the fleet"""
+    shard_index, machines, database_uri, ticks, period, start_time, seed = args
+
+    engine = create_engine(database_uri, connect_args={'timeout': 60})
+    writer = BulkReadingWriter(engine, SensorReading.__table__)
+    tick_engine = FleetTickEngine(MACHINES_CONFIG, seed=None if seed is None else seed + shard_index)
+
+    generate_seconds = 0.0
+    for tick_index in range(ticks):
+        started = time.perf_counter()
+        tick = tick_engine.tick(machines)
+        rows = tick.rows(start_time + timedelta(seconds=tick_index * period))
+        generate_seconds += time.perf_counter() - started
+        writer.write(rows)
+
+    engine.dispose()
+    stats = writer.stats()
+    stats.update({
+        'shard': shard_index,
+        'machines': len(machines),
+        'generate_seconds': round(generate_seconds, 4)
+    })
+    return stats
+
+
+def run_simulation(n_machines, ticks=10, database_uri=DEFAULT_DATABASE_URI, processes=None,
+                   period=3.0, status_mix=None, seed=None):
+    """Simulate ``ticks`` generation cycles for ``n_machines`` sharded across processes"""
+    processes = processes or os.cpu_count() or 1
+    status_mix = status_mix or {'normal': 1.0}
+
+    fleet = build_fleet(n_machines)
+    statuses = assign_statuses(n_machines, status_mix, seed)
+
+    engine = create_engine(database_uri)
+    machine_ids = create_fleet(engine, fleet, statuses)
+    engine.dispose()
+
+    machines = [(machine_id, machine['machine_type'], status)
+                for machine_id, machine, status in zip(machine_ids, fleet, statuses)]
+    shards = [machines[i::processes] for i in range(processes)]
+    start_time = datetime.utcnow()
+    shard_args = [(i, shard, database_uri, ticks, period, start_time, seed)
+                  for i, shard in enumerate(shards) if shard]
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(len(shard_args)) as pool:
+        shard_stats = pool.map(_run_shard, shard_args)
+    elapsed = time.perf_counter() - started
+
+    rows_written = sum(s['rows_written'] for s in shard_stats)
+    sensors = sum(len(MACHINES_CONFIG[m[1]]['sensors']) for m in machines)
+    return {
+        'machines': n_machines,
+        'sensors': sensors,
+        'ticks': ticks,
+        'shards': len(shard_stats),
+        'rows_written': rows_written,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_written / elapsed, 1) if elapsed else 0.0,
+        # Rows per second the plant produces in real time at this period
+        'required_rows_per_second': round(sensors / period, 1),
+        'shard_stats': shard_stats
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PRISM fleet-scale generation simulator')
+    parser.add_argument('--machines', type=int, default=10000, help='Number of simulated machines')
+    parser.add_argument('--ticks', type=int, default=10, help='Generation cycles per machine')
+    parser.add_argument('--processes', type=int, default=None, help='Shards (default: one per core)')
+    parser.add_argument('--period', type=float, default=3.0, help='Simulated seconds between ticks')
+    parser.add_argument('--database', default=DEFAULT_DATABASE_URI, help='SQLAlchemy URI to write to')
+    parser.add_argument('--status-mix', default='normal=1.0',
+                        help="Status weights, e.g. 'normal=0.9,maintenance=0.08,sabotage=0.02'")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print(f"🏭 Simulating {args.machines} machines x {args.ticks} ticks -> {args.database}")
+    result = run_simulation(
+        args.machines, ticks=args.ticks, database_uri=args.database, processes=args.processes,
+        period=args.period, status_mix=parse_status_mix(args.status_mix), seed=args.seed
+    )
+
+    for shard in result['shard_stats']:
+        print(f"   🧩 Shard {shard['shard']}: {shard['machines']} machines, {shard['rows_written']} rows, "
+              f"{shard['rows_per_second']:.0f} rows/s write, {shard['generate_seconds']:.2f}s generating")
+
+    headroom = result['rows_per_second'] / result['required_rows_per_second'] if result['required_rows_per_second'] else 0
+    print(f"📊 {result['rows_written']} rows in {result['elapsed_seconds']}s across {result['shards']} shards "
+          f"= {result['rows_per_second']:.0f} rows/s")
+    print(f"📈 Real-time requirement at {args.period:g}s period: {result['required_rows_per_second']:.0f} rows/s "
+          f"({headroom:.1f}x headroom)")
+    return result
+
+
+if __name__ == '__main__':
+    main()
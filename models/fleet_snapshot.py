@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import datetime
+
+
+def build_fleet_snapshot(machines, current_rows, sensor_health=None, open_alerts=None, timestamp=None):
+    """Assemble the whole-fleet dashboard payload from pre-loaded data.
+
+    ``machines`` are Machine rows or MachineSnapshots, ``current_rows`` the
+    sensor_current rows for the fleet, ``sensor_health`` maps
+    machine_id -> {sensor_type: (health, status)} and ``open_alerts`` maps
+    machine_id -> unacknowledged alert count. Per-machine entries use the
+    same keys as /latest and /sensor-health so the dashboard can render
+    them with its existing functions; per-sensor timestamps are folded into
+    one ``updated_at`` per machine to keep the payload small.
+    """
+    sensor_health = sensor_health or {}
+    open_alerts = open_alerts or {}
+
+    readings_by_machine = {}
+    updated_by_machine = {}
+    for row in current_rows:
+        readings_by_machine.setdefault(row.machine_id, {})[row.sensor_type] = {
+            'value': row.value,
+            'unit': row.unit,
+            'is_anomaly': row.is_anomaly,
+            'anomaly_score': row.anomaly_score
+        }
+        if row.timestamp and (row.machine_id not in updated_by_machine
+                              or row.timestamp > updated_by_machine[row.machine_id]):
+            updated_by_machine[row.machine_id] = row.timestamp
+
+    entries = {}
+    summary = {'machines': 0, 'sensors': 0, 'anomalies': 0, 'open_alerts': 0, 'average_health': None}
+    health_total = 0.0
+    health_count = 0
+
+    for machine in machines:
+        readings = readings_by_machine.get(machine.id, {})
+        health = sensor_health.get(machine.id)
+        entry = {
+            'name': machine.name,
+            'status': machine.status,
+            'readings': readings,
+            'open_alerts': open_alerts.get(machine.id, 0),
+            'updated_at': updated_by_machine[machine.id].isoformat() if machine.id in updated_by_machine else None
+        }
+
+        if health:
+            entry['sensor_health'] = {
+                sensor_type: {'health_percentage': round(value, 1), 'status': status}
+                for sensor_type, (value, status) in health.items()
+            }
+            entry['overall_health'] = round(sum(value for value, _ in health.values()) / len(health), 1)
+            health_total += entry['overall_health']
+            health_count += 1
+
+        entries[str(machine.id)] = entry
+        summary['machines'] += 1
+        summary['sensors'] += len(readings)
+        summary['anomalies'] += sum(1 for reading in readings.values() if reading['is_anomaly'])
+        summary['open_alerts'] += entry['open_alerts']
+
+    if health_count:
+        summary['average_health'] = round(health_total / health_count, 1)
+
+    return {
+        'machines': entries,
+        'summary': summary,
+        'timestamp': (timestamp or datetime.now()).isoformat()
+    }
+
+
+class SnapshotCache:
+    """Share one snapshot build between all clients polling within ``ttl`` seconds.
+
+    Dashboard traffic then costs one build per ttl no matter how many
+    browsers are open. ``builder`` is called with no arguments.
+    """
+
+    def __init__(self, builder, ttl=1.0, clock=time.monotonic):
+        self.builder = builder
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._payload = None
+        self._built_at = None
+        self.builds = 0
+        self.hits = 0
+
+    def get(self):
+        with self._lock:
+            now = self.clock()
+            if self._payload is None or now - self._built_at >= self.ttl:
+                self._payload = self.builder()
+                self._built_at = now
+                self.builds += 1
+            else:
+                self.hits += 1
+            return self._payload
+
+    def invalidate(self):
+        with self._lock:
+            self._payload = None
+
+    def stats(self):
+        with self._lock:
+            return {'builds': self.builds, 'hits': self.hits, 'ttl': self.ttl}
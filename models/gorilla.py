@@ -0,0 +1,206 @@
+"""Gorilla-style compression of one sensor's readings.
+
+A block holds points in time order. Timestamps (int epoch microseconds)
+are stored as delta-of-delta, and values and anomaly scores as the XOR
+with the previous float. Both follow Facebook's Gorilla TSDB paper.
+Anomaly flags take one bit per point. A fixed 3-second cadence makes most
+delta-of-deltas tiny. Slowly drifting values share most of their sign,
+exponent and high mantissa bits with the previous value.
+
+Layout: a 4-byte little-endian point count, then one bit stream. The
+first point is stored verbatim (64-bit timestamp, value and score, plus
+its flag bit). Each later point is encoded as:
+
+    delta-of-delta   '0'              dod == 0
+                     '10'   + 7 bits  -64 <= dod < 64
+                     '110'  + 12 bits
+                     '1110' + 20 bits
+                     '1111' + 64 bits
+    value, score     '0'              same as previous
+                     '10'   + bits    XOR fits the previous leading/trailing-zero window
+                     '11'   + 5 bits leading zeros + 6 bits length + bits
+    anomaly          1 bit
+
+The bucket widths are Gorilla's, scaled up for microsecond timestamps,
+where scheduling jitter is thousands of units rather than zero.
+"""
+import struct
+
+import numpy as np
+
+COUNT = struct.Struct('<I')
+FLOAT = struct.Struct('<d')
+UINT64 = struct.Struct('<Q')
+
+# (prefix bits, prefix length, payload bits) for non-zero delta-of-deltas, narrowest first
+DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 12), (0b1110, 4, 20), (0b1111, 4, 64))
+
+
+class BitWriter:
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.bits = 0
+
+    def write(self, value, nbits):
+        self.acc = (self.acc << nbits) | (value & ((1 << nbits) - 1))
+        self.bits += nbits
+        while self.bits >= 8:
+            self.bits -= 8
+            self.out.append((self.acc >> self.bits) & 0xFF)
+        self.acc &= (1 << self.bits) - 1
+
+    def getvalue(self):
+        if self.bits:
+            return bytes(self.out) + bytes([(self.acc << (8 - self.bits)) & 0xFF])
+        return bytes(self.out)
+
+
+class BitReader:
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.pos = offset
+        self.acc = 0
+        self.bits = 0
+
+    def read(self, nbits):
+        while self.bits < nbits:
+            self.acc = (self.acc << 8) | self.data[self.pos]
+            self.pos += 1
+            self.bits += 8
+        self.bits -= nbits
+        value = self.acc >> self.bits
+        self.acc &= (1 << self.bits) - 1
+        return value
+
+
+def _signed(value, nbits):
+    return value - (1 << nbits) if value >= 1 << (nbits - 1) else value
+
+
+class _XorEncoder:
+    def __init__(self, first_bits):
+        self.previous = first_bits
+        self.leading = -1
+        self.trailing = 0
+
+    def write(self, writer, bits):
+        xor = self.previous ^ bits
+        self.previous = bits
+        if xor == 0:
+            writer.write(0, 1)
+            return
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        if self.leading >= 0 and leading >= self.leading and trailing >= self.trailing:
+            writer.write(0b10, 2)
+            writer.write(xor >> self.trailing, 64 - self.leading - self.trailing)
+        else:
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful & 63, 6)  # 64 wraps to 0
+            writer.write(xor >> trailing, meaningful)
+            self.leading, self.trailing = leading, trailing
+
+
+class _XorDecoder:
+    def __init__(self, first_bits):
+        self.previous = first_bits
+        self.leading = 0
+        self.trailing = 0
+
+    def read(self, reader):
+        if reader.read(1):
+            if reader.read(1):
+                self.leading = reader.read(5)
+                meaningful = reader.read(6) or 64
+                self.trailing = 64 - self.leading - meaningful
+            else:
+                meaningful = 64 - self.leading - self.trailing
+            self.previous ^= reader.read(meaningful) << self.trailing
+        return self.previous
+
+
+def encode_block(timestamps, values, scores, anomalies):
+    """Compress parallel sequences (timestamps in int epoch microseconds, ascending)"""
+    count = len(timestamps)
+    if not count:
+        return COUNT.pack(0)
+    timestamps = [int(t) for t in timestamps]
+    value_bits = np.asarray(values, dtype='<f8').view('<u8').tolist()
+    score_bits = np.asarray(scores, dtype='<f8').view('<u8').tolist()
+    anomalies = [bool(a) for a in anomalies]
+
+    writer = BitWriter()
+    writer.write(timestamps[0], 64)
+    writer.write(value_bits[0], 64)
+    writer.write(score_bits[0], 64)
+    writer.write(anomalies[0], 1)
+
+    value_encoder = _XorEncoder(value_bits[0])
+    score_encoder = _XorEncoder(score_bits[0])
+    previous_delta = 0
+    for i in range(1, count):
+        delta = timestamps[i] - timestamps[i - 1]
+        dod = delta - previous_delta
+        previous_delta = delta
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_bits, payload_bits in DOD_BUCKETS:
+                if -(1 << (payload_bits - 1)) <= dod < 1 << (payload_bits - 1):
+                    writer.write(prefix, prefix_bits)
+                    writer.write(dod, payload_bits)
+                    break
+        value_encoder.write(writer, value_bits[i])
+        score_encoder.write(writer, score_bits[i])
+        writer.write(anomalies[i], 1)
+
+    return COUNT.pack(count) + writer.getvalue()
+
+
+def block_count(data):
+    return COUNT.unpack_from(data)[0]
+
+
+def iter_block(data):
+    """Decode a block one point at a time: yields (timestamp_us, value, score, is_anomaly)"""
+    count = block_count(data)
+    if not count:
+        return
+    reader = BitReader(data, COUNT.size)
+    timestamp = _signed(reader.read(64), 64)
+    value_decoder = _XorDecoder(reader.read(64))
+    score_decoder = _XorDecoder(reader.read(64))
+    anomaly = reader.read(1)
+    to_float = FLOAT.unpack
+    to_bytes = UINT64.pack
+    yield (timestamp, to_float(to_bytes(value_decoder.previous))[0],
+           to_float(to_bytes(score_decoder.previous))[0], bool(anomaly))
+
+    delta = 0
+    for _ in range(count - 1):
+        if reader.read(1):
+            if not reader.read(1):
+                nbits = 7
+            elif not reader.read(1):
+                nbits = 12
+            elif not reader.read(1):
+                nbits = 20
+            else:
+                nbits = 64
+            delta += _signed(reader.read(nbits), nbits)
+        timestamp += delta
+        value = value_decoder.read(reader)
+        score = score_decoder.read(reader)
+        yield (timestamp, to_float(to_bytes(value))[0], to_float(to_bytes(score))[0], bool(reader.read(1)))
+
+
+def decode_block(data):
+    """Decode a whole block into (timestamps, values, scores, anomalies) arrays"""
+    points = list(iter_block(data))
+    if not points:
+        return (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=bool))
+    timestamps, values, scores, anomalies = zip(*points)
+    return (np.array(timestamps, dtype=np.int64), np.array(values), np.array(scores), np.array(anomalies, dtype=bool))
@@ -0,0 +1,145 @@
+import itertools
+import json
+import threading
+from collections import deque, namedtuple
+
+# One pushed message. ``data`` is the payload serialized once at publish
+# time so fan-out to N clients never re-encodes it.
+LiveEvent = namedtuple('LiveEvent', ['id', 'event', 'machine_id', 'payload', 'data'])
+
+
+class Subscription:
+    """One client's bounded event queue.
+
+    A slow client never blocks the producer: when the queue is full the
+    oldest event is discarded and counted in ``dropped``.
+    """
+
+    def __init__(self, machine_ids=None, max_queue=256):
+        self.machine_ids = frozenset(machine_ids) if machine_ids is not None else None
+        self._events = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def wants(self, machine_id):
+        return self.machine_ids is None or machine_id in self.machine_ids
+
+    def put(self, event):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Next event, or None on timeout or once closed"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._events or self.closed, timeout)
+            if self._events:
+                self.delivered += 1
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class LiveHub:
+    """In-process fan-out from the generator to every connected live client.
+
+    The producer calls publish() once per machine per tick; each subscriber
+    receives the events for the machines it asked for (or the whole fleet)
+    without touching SQLite. The latest reading event per machine is kept
+    so a new subscriber starts with current values instead of waiting for
+    the next tick.
+    """
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._latest = {}
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self._closed_delivered = 0
+        self._closed_dropped = 0
+
+    def subscribe(self, machine_ids=None):
+        subscription = Subscription(machine_ids, self.max_queue)
+        with self._lock:
+            for machine_id, event in sorted(self._latest.items()):
+                if subscription.wants(machine_id):
+                    subscription.put(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                self._closed_delivered += subscription.delivered
+                self._closed_dropped += subscription.dropped
+
+    def publish(self, machine_id, payload, event='reading'):
+        """Serialize ``payload`` once and queue it for every interested subscriber"""
+        data = json.dumps(payload, default=str, separators=(',', ':'))
+        with self._lock:
+            live_event = LiveEvent(next(self._sequence), event, machine_id, payload, data)
+            if event == 'reading':
+                self._latest[machine_id] = live_event
+            subscribers = [s for s in self._subscribers if s.wants(machine_id)]
+            self.published += 1
+
+        for subscription in subscribers:
+            subscription.put(live_event)
+        return live_event
+
+    def latest(self, machine_id):
+        with self._lock:
+            return self._latest.get(machine_id)
+
+    def stats(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            return {
+                'subscribers': len(subscribers),
+                'published': self.published,
+                'delivered': self._closed_delivered + sum(s.delivered for s in subscribers),
+                'dropped': self._closed_dropped + sum(s.dropped for s in subscribers)
+            }
+
+
+def format_sse(data, event=None, event_id=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_stream(hub, machine_ids=None, heartbeat=15.0, retry_ms=3000):
+    """Generator of SSE text for a Flask streaming response.
+
+    Subscribes on first iteration, sends a comment line every ``heartbeat``
+    seconds of silence so proxies keep the connection open, and
+    unsubscribes when the client goes away.
+    """
+    subscription = hub.subscribe(machine_ids)
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        while not subscription.closed:
+            event = subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event.data, event.event, event.id)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,200 @@
+import threading
+
+# Topics a WebSocket client may subscribe to:
+#   fleet                       every field of every machine
+#   status                      machine-level fields (status, overall_health, ...) of every machine
+#   machine:<id>                every field of one machine
+#   sensor:<id>:<sensor_type>   the fields of one sensor
+
+
+class TopicFilter:
+    """Which (machine, sensor) fields a set of topic strings selects"""
+
+    def __init__(self, topics=()):
+        self.topics = set()
+        self.fleet = False
+        self.status = False
+        self.machines = set()
+        self.sensors = {}
+        for topic in topics:
+            self.add(topic)
+
+    def add(self, topic):
+        parts = str(topic).split(':')
+        if parts == ['fleet']:
+            self.fleet = True
+        elif parts == ['status']:
+            self.status = True
+        elif len(parts) == 2 and parts[0] == 'machine':
+            self.machines.add(int(parts[1]))
+        elif len(parts) == 3 and parts[0] == 'sensor':
+            self.sensors.setdefault(int(parts[1]), set()).add(parts[2])
+        else:
+            raise ValueError(f'unknown topic: {topic}')
+        self.topics.add(str(topic))
+
+    def wants(self, machine_id, sensor_type=None):
+        """``sensor_type`` None means a machine-level field"""
+        if self.fleet or machine_id in self.machines:
+            return True
+        if sensor_type is None:
+            return self.status
+        return sensor_type in self.sensors.get(machine_id, ())
+
+    def candidate_machines(self, all_machines):
+        if self.fleet or self.status:
+            return all_machines
+        return [m for m in all_machines if m in self.machines or m in self.sensors]
+
+    def __bool__(self):
+        return bool(self.topics)
+
+
+class LiveState:
+    """Latest value of every live field, each stamped with the version that last changed it.
+
+    Writers call apply() with {machine_id: {'fields': {...}, 'sensors':
+    {sensor_type: {...}}}}; one call is one version, and values equal to
+    the stored ones do not bump anything. delta() returns only the fields
+    changed after a given version, so a client that acknowledges version N
+    is sent just what changed since N, never more than the current state.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._fields = {}
+        self._machine_versions = {}
+
+    def apply(self, updates):
+        with self._lock:
+            version = self.version + 1
+            changed = False
+            for machine_id, update in updates.items():
+                fields = self._fields.setdefault(machine_id, {})
+                items = [((None, name), value) for name, value in update.get('fields', {}).items()]
+                for sensor_type, sensor_fields in update.get('sensors', {}).items():
+                    items.extend(((sensor_type, name), value) for name, value in sensor_fields.items())
+
+                for key, value in items:
+                    current = fields.get(key)
+                    if current is None or current[0] != value:
+                        fields[key] = (value, version)
+                        self._machine_versions[machine_id] = version
+                        changed = True
+
+            if changed:
+                self.version = version
+            return self.version
+
+    def delta(self, since, topic_filter):
+        """(version, {machine_id: {field: value, 'sensors': {sensor_type: {field: value}}}})"""
+        with self._lock:
+            machines = {}
+            for machine_id in topic_filter.candidate_machines(list(self._fields)):
+                if self._machine_versions.get(machine_id, 0) <= since:
+                    continue
+                entry = {}
+                for (sensor_type, name), (value, version) in self._fields[machine_id].items():
+                    if version <= since or not topic_filter.wants(machine_id, sensor_type):
+                        continue
+                    if sensor_type is None:
+                        entry[name] = value
+                    else:
+                        entry.setdefault('sensors', {}).setdefault(sensor_type, {})[name] = value
+                if entry:
+                    machines[str(machine_id)] = entry
+            return self.version, machines
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self.version,
+                'machines': len(self._fields),
+                'fields': sum(len(fields) for fields in self._fields.values())
+            }
+
+
+class DeltaSession:
+    """Protocol state of one WebSocket client.
+
+    Client messages (JSON objects):
+        {"type": "subscribe", "topics": [...]}     add topics; their full state is resent
+        {"type": "unsubscribe", "topics": [...]}
+        {"type": "ack", "version": N}              client has applied everything up to N
+        {"type": "control", "action": ..., "request_id": ..., ...}
+        {"type": "ping"}
+
+    Server frames are {"type": "delta", "version": V, "base": N, "machines":
+    {...}} holding the fields changed since the last acknowledged version
+    N, plus "control_result", "subscribed", "pong" and "error" replies.
+    ``controls`` maps an action name to a callable taking the message and
+    returning a result dict.
+    """
+
+    def __init__(self, state, controls=None):
+        self.state = state
+        self.controls = controls or {}
+        self.topics = TopicFilter()
+        self.acked_version = 0
+        self.sent_version = -1
+        self.frames_sent = 0
+
+    def handle(self, message):
+        """Process one client message; returns the list of reply frames"""
+        if not isinstance(message, dict):
+            return [{'type': 'error', 'error': 'messages must be JSON objects'}]
+
+        kind = message.get('type')
+        if kind in ('subscribe', 'unsubscribe'):
+            topics = message.get('topics') or []
+            try:
+                remaining = set(self.topics.topics)
+                if kind == 'subscribe':
+                    remaining.update(topics)
+                else:
+                    remaining.difference_update(topics)
+                self.topics = TopicFilter(remaining)
+            except ValueError as e:
+                return [{'type': 'error', 'error': str(e)}]
+            if kind == 'subscribe':
+                # Newly selected fields have never been sent: start over from a full state
+                self.acked_version = 0
+                self.sent_version = -1
+            return [{'type': 'subscribed', 'topics': sorted(self.topics.topics)}]
+
+        if kind == 'ack':
+            try:
+                version = int(message.get('version', 0))
+            except (TypeError, ValueError):
+                return [{'type': 'error', 'error': 'ack version must be an integer'}]
+            self.acked_version = max(self.acked_version, min(version, self.state.version))
+            return []
+
+        if kind == 'control':
+            action = message.get('action')
+            handler = self.controls.get(action)
+            if handler is None:
+                result = {'success': False, 'error': f'unknown action: {action}'}
+            else:
+                try:
+                    result = handler(message)
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+            return [dict(result, type='control_result', action=action, request_id=message.get('request_id'))]
+
+        if kind == 'ping':
+            return [{'type': 'pong', 'version': self.state.version}]
+
+        return [{'type': 'error', 'error': f'unknown message type: {kind}'}]
+
+    def next_frame(self):
+        """Delta frame if anything changed since the last frame, else None"""
+        if not self.topics or self.state.version <= self.sent_version:
+            return None
+        version, machines = self.state.delta(self.acked_version, self.topics)
+        self.sent_version = version
+        if not machines:
+            return None
+        self.frames_sent += 1
+        return {'type': 'delta', 'version': version, 'base': self.acked_version, 'machines': machines}
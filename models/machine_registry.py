@@ -0,0 +1,105 @@
+import threading
+
+
+class MachineSnapshot:
+    """Plain in-memory copy of a Machine row plus its compiled sensor config.
+
+    Exposes the same attributes the generator and alerting code read from
+    the ORM object, so it can be passed anywhere a Machine is expected for
+    read-only use.
+    """
+
+    __slots__ = ('id', 'name', 'machine_type', 'description', 'location', 'status',
+                 'is_active', 'created_at', 'updated_at', 'sensor_configs', 'compiled')
+
+    def __init__(self, machine, sensor_configs, compiled):
+        self.id = machine.id
+        self.name = machine.name
+        self.machine_type = machine.machine_type
+        self.description = machine.description
+        self.location = machine.location
+        self.status = machine.status
+        self.is_active = machine.is_active
+        self.created_at = machine.created_at
+        self.updated_at = machine.updated_at
+        self.sensor_configs = sensor_configs
+        self.compiled = compiled
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'machine_type': self.machine_type,
+            'description': self.description,
+            'location': self.location,
+            'status': self.status,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class MachineRegistry:
+    """In-process cache of active machines for the generation loop.
+
+    ``loader`` returns the active Machine rows (it is only called on a cold
+    or invalidated cache, inside the caller's app context). Status changes
+    are applied in place with update_status(); invalidate() forces a reload
+    the next time the fleet is read, e.g. after machines are added.
+    """
+
+    def __init__(self, loader, machines_config, compiled_types=None):
+        self.loader = loader
+        self.machines_config = machines_config
+        self.compiled_types = compiled_types or {}
+        self._lock = threading.Lock()
+        self._machines = None
+        self.loads = 0
+        self.hits = 0
+
+    def active_machines(self):
+        """Snapshots of every active machine, loading from the database if stale"""
+        with self._lock:
+            if self._machines is None:
+                self._machines = {}
+                for machine in self.loader():
+                    self._machines[machine.id] = MachineSnapshot(
+                        machine,
+                        self.machines_config.get(machine.machine_type, {}).get('sensors', {}),
+                        self.compiled_types.get(machine.machine_type)
+                    )
+                self.loads += 1
+            else:
+                self.hits += 1
+            return list(self._machines.values())
+
+    def get(self, machine_id):
+        with self._lock:
+            if self._machines is None:
+                return None
+            return self._machines.get(machine_id)
+
+    def update_status(self, machine_id, status):
+        """Apply a committed status change without reloading the fleet"""
+        with self._lock:
+            if self._machines is None:
+                return
+            snapshot = self._machines.get(machine_id)
+            if snapshot is None:
+                # Unknown machine - it was added behind our back
+                self._machines = None
+            else:
+                snapshot.status = status
+
+    def invalidate(self):
+        """Drop the cache so the next read reloads every active machine"""
+        with self._lock:
+            self._machines = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cached_machines': len(self._machines) if self._machines is not None else None,
+                'loads': self.loads,
+                'hits': self.hits
+            }
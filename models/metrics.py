@@ -0,0 +1,93 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+class RunningStats:
+    """Thread-safe count/mean/max/last accumulator for durations or lags"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, value):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.last = value
+            if value > self.max:
+                self.max = value
+
+    def to_dict(self, scale=1.0, digits=3):
+        """Summary dict; ``scale`` converts units (e.g. 1000 for seconds -> ms)"""
+        with self._lock:
+            mean = self.total / self.count if self.count else 0.0
+            return {
+                'count': self.count,
+                'mean': round(mean * scale, digits),
+                'max': round(self.max * scale, digits),
+                'last': round(self.last * scale, digits)
+            }
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram over fixed millisecond buckets.
+
+    Quantiles are read off the buckets, so they are upper bounds at bucket
+    resolution: good enough to compare before/after, and cheap to record.
+    """
+
+    BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, bounds_ms=BOUNDS_MS):
+        self.bounds = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.stats = RunningStats()
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        index = bisect.bisect_left(self.bounds, ms)
+        with self._lock:
+            self.buckets[index] += 1
+        self.stats.record(seconds)
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - started)
+
+    def quantile(self, q):
+        """Upper bucket bound (ms) below which a fraction ``q`` of the samples fall"""
+        with self._lock:
+            buckets = list(self.buckets)
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        seen = 0
+        for bound, count in zip(self.bounds, buckets):
+            seen += count
+            if seen >= q * total:
+                return bound
+        # Past the last bound: the largest sample is the only honest bound
+        return round(self.stats.max * 1000, 3)
+
+    def to_dict(self):
+        summary = self.stats.to_dict(scale=1000)
+        with self._lock:
+            buckets = list(self.buckets)
+        labels = [f'<={bound:g}ms' for bound in self.bounds] + [f'>{self.bounds[-1]:g}ms']
+        summary.update({
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': {label: count for label, count in zip(labels, buckets) if count}
+        })
+        return summary
@@ -0,0 +1,84 @@
+"""Schema migrations for existing machines.db files.
+
+db.create_all() only creates missing tables, so indexes and tables added
+after a database was first created are applied here. Every migration is
+idempotent and safe to run at each startup.
+
+    python -m models.migrations machines.db
+"""
+import os
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def ensure_indexes(engine, table):
+    """Create any index declared on ``table`` that the database is missing.
+
+    Returns the names of the indexes that were created.
+    """
+    if not inspect(engine).has_table(table.name):
+        return []
+
+    existing = {ix['name'] for ix in inspect(engine).get_indexes(table.name)}
+    created = []
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(engine)
+            created.append(index.name)
+
+    if created:
+        # Refresh planner statistics so the new index is actually chosen
+        with engine.begin() as conn:
+            conn.execute(text(f'ANALYZE {table.name}'))
+    return created
+
+
+def migrate(engine, tables):
+    """Apply all migrations for the given tables; returns a summary dict"""
+    summary = {}
+    for table in tables:
+        created = ensure_indexes(engine, table)
+        if created:
+            summary[table.name] = created
+    return summary
+
+
+def ensure_current_state(engine, readings_table, current_table):
+    """Create and seed the current-state table if the database lacks it.
+
+    Returns the number of sensors seeded (0 when the table already existed).
+    """
+    from models.current_state import rebuild_current_state
+
+    if inspect(engine).has_table(current_table.name):
+        return 0
+    current_table.create(engine)
+    if not inspect(engine).has_table(readings_table.name):
+        return 0
+    return rebuild_current_state(engine, readings_table, current_table)
+
+
+def main(argv=None):
+    from models.database import SensorCurrent, SensorReading
+
+    argv = argv if argv is not None else sys.argv[1:]
+    path = argv[0] if argv else 'machines.db'
+    engine = create_engine(f'sqlite:///{path}')
+
+    print(f"🔧 Migrating {path}...")
+    summary = migrate(engine, [SensorReading.__table__])
+    for table_name, indexes in summary.items():
+        print(f"   ✅ {table_name}: created {', '.join(indexes)}")
+    seeded = ensure_current_state(engine, SensorReading.__table__, SensorCurrent.__table__)
+    if seeded:
+        print(f"   ✅ sensor_current: seeded {seeded} sensors")
+    if not summary and not seeded:
+        print("   ✅ Already up to date")
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Multivariate anomaly scoring per machine type.
+
+Sensors on one machine are coupled: reactor temperature and pressure
+rise together, and heat exchanger outlet temperature follows inlet
+temperature and flow. A reading can be inside every sensor's normal
+range and still break that relationship. Per-sensor detectors cannot see
+this.
+
+MultivariateDetector keeps one online model per machine type: a running
+mean vector and covariance over the type's sensors. It is pooled over
+every machine of the type and updated with Chan's batch form of
+Welford's algorithm. For each tick, the readings of all machines of a
+type are stacked into a (machines x sensors) matrix. Every machine gets
+a squared Mahalanobis distance
+
+    d2 = (x - mean)^T cov^-1 (x - mean)
+
+in one matrix product. A machine is flagged when d2 exceeds the
+chi-square quantile for the type's sensor count. The sensors that
+contribute at least an equal share of d2 are the ones flagged. Like
+StreamingDetector, scores are capped below the 0.8 critical threshold,
+and flagged machines are left out of the model.
+"""
+import os
+import threading
+import weakref
+
+import numpy as np
+
+from models.streaming_detector import save_npz
+
+STATE_ARRAYS = ('count', 'mean', 'comoment')
+
+
+def chi2_threshold(dof, tail_z):
+    """Chi-square quantile with ``dof`` degrees of freedom whose tail matches a normal ``tail_z``.
+
+    Wilson-Hilferty approximation, accurate to a few percent from dof = 2.
+    """
+    h = 2.0 / (9.0 * dof)
+    return dof * (1.0 - h + tail_z * np.sqrt(h)) ** 3
+
+
+class TypeModel:
+    """Running mean and covariance of one machine type's sensor vector"""
+
+    def __init__(self, sensor_types):
+        self.sensor_types = list(sensor_types)
+        size = len(self.sensor_types)
+        self.count = 0.0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))
+
+    def covariance(self):
+        return self.comoment / max(self.count - 1.0, 1.0)
+
+    def precision(self, shrinkage):
+        """Inverse of the covariance, with the diagonal inflated by ``shrinkage`` so it stays invertible"""
+        cov = self.covariance()
+        diagonal = np.diag(cov)
+        floor = max(float(diagonal.max()), 1.0) * 1e-9
+        return np.linalg.pinv(cov + np.diag(shrinkage * diagonal + floor))
+
+    def merge(self, batch):
+        """Fold the rows of ``batch`` (n x sensors) into the running moments"""
+        n = len(batch)
+        if not n:
+            return
+        batch_mean = batch.mean(axis=0)
+        centered = batch - batch_mean
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * (self.count * n / total)
+        self.mean += delta * (n / total)
+        self.count = total
+
+
+class MultivariateDetector:
+    """Per-machine-type Mahalanobis scoring of fleet ticks"""
+
+    def __init__(self, tail_z=3.7, warmup=50, shrinkage=0.05, score_cap=0.79):
+        self.tail_z = tail_z
+        self.warmup = warmup
+        self.shrinkage = shrinkage
+        self.score_cap = score_cap
+        self._lock = threading.Lock()
+        self.models = {}
+        self._groups = weakref.WeakKeyDictionary()
+        self.ticks = 0
+        self.machines_scored = 0
+        self.machines_flagged = 0
+        self.last_distance = {}
+
+    def _groups_for_layout(self, layout):
+        """{machine_type: (machine_ids, slot matrix)} with one row of sensor slots per machine"""
+        groups = self._groups.get(layout)
+        if groups is None:
+            by_type = {}
+            for machine_id, machine_type in zip(layout.machine_ids, layout.machine_types):
+                start, end = layout.offsets[machine_id]
+                by_type.setdefault(machine_type, ([], []))
+                by_type[machine_type][0].append(machine_id)
+                by_type[machine_type][1].append(np.arange(start, end))
+            groups = self._groups[layout] = {
+                machine_type: (ids, np.vstack(slots)) for machine_type, (ids, slots) in by_type.items()
+            }
+        return groups
+
+    def score(self, model, values, excluded):
+        """(d2, sensor flags, scores) for ``values`` (machines x sensors) and fold in the clean rows.
+
+        ``excluded`` marks machines already flagged elsewhere; they are
+        scored but do not update the model. Call with the lock held.
+        """
+        machines, size = values.shape
+        d2 = np.zeros(machines)
+        flags = np.zeros(values.shape, dtype=bool)
+        scores = np.zeros(values.shape)
+        if model.count >= self.warmup:
+            threshold = chi2_threshold(size, self.tail_z)
+            centered = values - model.mean
+            contributions = centered * (centered @ model.precision(self.shrinkage))
+            d2 = contributions.sum(axis=1)
+            flagged = d2 > threshold
+            # Blame the sensors carrying at least an equal share of the distance
+            flags = flagged[:, None] & (contributions >= d2[:, None] / size)
+            machine_scores = self.score_cap * np.minimum(1.0, (d2 - threshold) / threshold)
+            scores = np.where(flags, machine_scores[:, None], 0.0)
+            excluded = excluded | flagged
+        model.merge(values[~excluded])
+        return d2, flags, scores
+
+    def score_tick(self, tick):
+        """(is_anomaly, anomaly_scores) of a FleetTick with multivariate flags OR'd in"""
+        is_anomaly = tick.is_anomaly.copy()
+        anomaly_scores = tick.anomaly_scores.copy()
+        with self._lock:
+            for machine_type, (machine_ids, slots) in self._groups_for_layout(tick.layout).items():
+                sensor_types = [tick.layout.slot_sensor[i] for i in slots[0].tolist()]
+                model = self.models.get(machine_type)
+                if model is None or model.sensor_types != sensor_types:
+                    # New type, or its sensors changed since the snapshot
+                    model = self.models[machine_type] = TypeModel(sensor_types)
+                d2, flags, scores = self.score(model, tick.values[slots], tick.is_anomaly[slots].any(axis=1))
+                is_anomaly[slots] |= flags
+                anomaly_scores[slots] = np.maximum(anomaly_scores[slots], scores)
+                self.last_distance.update(zip(machine_ids, np.round(d2, 3).tolist()))
+                self.machines_scored += len(machine_ids)
+                self.machines_flagged += int(flags.any(axis=1).sum())
+            self.ticks += 1
+        return is_anomaly, anomaly_scores
+
+    def machine_distance(self, machine_id):
+        """Squared Mahalanobis distance of the machine's last scored tick, or None"""
+        with self._lock:
+            return self.last_distance.get(machine_id)
+
+    def save(self, path):
+        """Snapshot every type model to ``path`` (.npz), atomically"""
+        arrays = {}
+        with self._lock:
+            for machine_type, model in self.models.items():
+                arrays[f'{machine_type}__sensor_types'] = np.array(model.sensor_types, dtype=np.str_)
+                for name in STATE_ARRAYS:
+                    arrays[f'{machine_type}__{name}'] = np.array(getattr(model, name))
+        save_npz(path, arrays)
+        return len(self.models)
+
+    def load(self, path):
+        """Restore type models written by save(); returns the number restored"""
+        if not os.path.exists(path):
+            return 0
+        models = {}
+        with np.load(path) as snapshot:
+            for key in snapshot.files:
+                machine_type, _, name = key.rpartition('__')
+                if name != 'sensor_types':
+                    continue
+                model = TypeModel(snapshot[key].tolist())
+                model.count = float(snapshot[f'{machine_type}__count'])
+                model.mean = snapshot[f'{machine_type}__mean'].astype(np.float64)
+                model.comoment = snapshot[f'{machine_type}__comoment'].astype(np.float64)
+                models[machine_type] = model
+        with self._lock:
+            self.models.update(models)
+        return len(models)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'types': {
+                    machine_type: {
+                        'sensors': model.sensor_types,
+                        'count': int(model.count),
+                        'threshold': round(float(chi2_threshold(len(model.sensor_types), self.tail_z)), 3),
+                        'warm': model.count >= self.warmup
+                    }
+                    for machine_type, model in self.models.items()
+                },
+                'ticks': self.ticks,
+                'machines_scored': self.machines_scored,
+                'machines_flagged': self.machines_flagged
+            }
@@ -0,0 +1,21 @@
+from sqlalchemy import func, select
+
+
+def sensor_series_statement(table, machine_id, sensor_type, start=None, end=None):
+    """(julianday, value, is_anomaly, anomaly_score) rows for one sensor in time order.
+
+    julianday() hands back the timestamp as a float so large ranges load
+    into NumPy without building a datetime per row; the range filter is a
+    single seek on the (machine_id, sensor_type, timestamp) index.
+    """
+    statement = select(
+        func.julianday(table.c.timestamp),
+        table.c.value,
+        func.coalesce(table.c.is_anomaly, False),
+        func.coalesce(table.c.anomaly_score, 0.0)
+    ).where(table.c.machine_id == machine_id, table.c.sensor_type == sensor_type)
+    if start is not None:
+        statement = statement.where(table.c.timestamp >= start)
+    if end is not None:
+        statement = statement.where(table.c.timestamp <= end)
+    return statement.order_by(table.c.timestamp)
@@ -0,0 +1,69 @@
+"""Pieces shared by the alternative raw-reading backends.
+
+Besides the default sensor_readings table, raw readings can be kept in a
+ColumnarStore (models/columnar_store.py) or a CompactReadingStore
+(models/compact_readings.py). Both offer the same methods: append, read,
+series, recent, sensor_types, sensors, first_timestamp, drop_before,
+delete_machine and stats. The apps, the rollup pipeline and
+StoreReadingWriter rely only on those.
+"""
+import time
+from collections import namedtuple
+
+from models.bulk_writer import BulkReadingWriter
+
+READING_BACKENDS = ('sqlite', 'columnar', 'compact')
+
+
+class StoredReading(namedtuple('StoredReading', ['machine_id', 'sensor_type', 'value', 'unit',
+                                                 'is_anomaly', 'anomaly_score', 'timestamp'])):
+    """A reading loaded from a reading store, with the attributes of a SensorReading row"""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        return {
+            'id': None,
+            'machine_id': self.machine_id,
+            'sensor_type': self.sensor_type,
+            'value': self.value,
+            'unit': self.unit,
+            'is_anomaly': self.is_anomaly,
+            'anomaly_score': self.anomaly_score,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        }
+
+
+class StoreReadingWriter(BulkReadingWriter):
+    """BulkReadingWriter counterpart that appends a tick to a reading store.
+
+    ``after_insert`` hooks still run in one SQLite transaction on ``engine``,
+    so derived tables such as sensor_current stay in SQLite.
+    """
+
+    def __init__(self, store, engine=None, after_insert=None, row_filter=None):
+        super().__init__(engine, None, after_insert, row_filter)
+        self.store = store
+
+    def write(self, rows):
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        stored = self.row_filter(rows) if self.row_filter else rows
+        if getattr(self.store, 'engine', None) is self.engine:
+            # Same database: readings and derived tables commit together
+            with self.engine.begin() as conn:
+                if stored:
+                    self.store.append(stored, conn)
+                for hook in self.after_insert:
+                    hook(conn, rows)
+        else:
+            if stored:
+                self.store.append(stored)
+            if self.after_insert:
+                with self.engine.begin() as conn:
+                    for hook in self.after_insert:
+                        hook(conn, rows)
+        self._record(len(stored), time.perf_counter() - started, len(rows) - len(stored))
+        return len(stored)
@@ -0,0 +1,444 @@
+"""Rollup tiers and retention for sensor_readings.
+
+Raw readings are aggregated into 1-minute, 1-hour and 1-day buckets per
+(machine, sensor), each tier built from the one below it. Raw rows and
+finer tiers are then trimmed according to a retention policy, never past
+what the next tier has already absorbed. Range queries pick the coarsest
+tier that still gives the requested resolution.
+
+    python -m models.rollups machines.db
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import (Column, DateTime, Float, ForeignKey, Integer, String, Table, case,
+                        create_engine, func, select)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.downsampling import AggregateSeries, SensorSeries
+from models.queries import sensor_series_statement
+
+# (tier, bucket width in seconds), finest first
+ROLLUP_TIERS = (('1m', 60), ('1h', 3600), ('1d', 86400))
+TIER_WIDTHS = dict(ROLLUP_TIERS)
+
+# SQLite strftime() patterns that floor a timestamp to its bucket, in the
+# same text format SQLAlchemy stores DateTime values in
+BUCKET_FORMATS = {
+    '1m': '%Y-%m-%d %H:%M:00.000000',
+    '1h': '%Y-%m-%d %H:00:00.000000',
+    '1d': '%Y-%m-%d 00:00:00.000000'
+}
+
+# How much source time one INSERT ... SELECT aggregates while backfilling
+BACKFILL_WINDOWS = {'1m': timedelta(days=1), '1h': timedelta(days=30), '1d': timedelta(days=365)}
+
+# Days kept per tier; None keeps forever
+DEFAULT_RETENTION = {'raw': 7, '1m': 30, '1h': 365, '1d': None}
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def rollup_tables(metadata):
+    """Declare the sensor_rollup_<tier> tables on ``metadata``; returns {tier: Table}"""
+    tables = {}
+    for tier, _ in ROLLUP_TIERS:
+        tables[tier] = Table(
+            f'sensor_rollup_{tier}', metadata,
+            Column('machine_id', Integer, ForeignKey('machines.id'), primary_key=True),
+            Column('sensor_type', String(50), primary_key=True),
+            Column('bucket_start', DateTime, primary_key=True),
+            Column('count', Integer, nullable=False),
+            Column('min_value', Float, nullable=False),
+            Column('max_value', Float, nullable=False),
+            Column('sum_value', Float, nullable=False),
+            Column('anomaly_count', Integer, nullable=False),
+            Column('max_score', Float, nullable=False)
+        )
+    return tables
+
+
+def floor_time(timestamp, width):
+    step = timedelta(seconds=width)
+    return EPOCH + ((timestamp - EPOCH) // step) * step
+
+
+def choose_tier(start, end, max_points, now=None, retention=None):
+    """Coarsest tier whose buckets are no wider than (end - start) / max_points.
+
+    'raw' when even 1-minute buckets are too coarse. If the chosen level
+    has already been trimmed past ``start``, the next coarser level that
+    still covers it is used instead.
+    """
+    now = now or datetime.utcnow()
+    retention = DEFAULT_RETENTION if retention is None else retention
+    resolution = (end - start).total_seconds() / max_points
+
+    levels = [('raw', 0)] + list(ROLLUP_TIERS)
+    chosen = 0
+    for index, (_, width) in enumerate(levels):
+        if width <= resolution:
+            chosen = index
+
+    for tier, _ in levels[chosen:]:
+        days = retention.get(tier)
+        if days is None or start >= now - timedelta(days=days):
+            return tier
+    return levels[-1][0]
+
+
+def rollup_series_statement(table, machine_id, sensor_type, start=None, end=None):
+    """(julianday, count, min, max, sum, anomaly_count, max_score) rows for one sensor"""
+    statement = select(
+        func.julianday(table.c.bucket_start),
+        table.c.count,
+        table.c.min_value,
+        table.c.max_value,
+        table.c.sum_value,
+        table.c.anomaly_count,
+        table.c.max_score
+    ).where(table.c.machine_id == machine_id, table.c.sensor_type == sensor_type)
+    if start is not None:
+        statement = statement.where(table.c.bucket_start >= start)
+    if end is not None:
+        statement = statement.where(table.c.bucket_start < end)
+    return statement.order_by(table.c.bucket_start)
+
+
+def load_aggregate_series(conn, tables, readings_table, tier, machine_id, sensor_type, start, end, store=None,
+                          expand=None, lookback=0.0):
+    """Buckets of ``tier`` over [start, end], with the not-yet-rolled tail read from raw rows.
+
+    With a reading ``store`` (compact or columnar backend), the tail is read
+    from the store instead of sensor_readings. ``expand`` and ``lookback``
+    rebuild a deadband-stored tail like RollupPipeline does.
+    """
+    table = tables[tier]
+    width = timedelta(seconds=TIER_WIDTHS[tier])
+    rolled_until = conn.execute(
+        select(func.max(table.c.bucket_start)).where(
+            table.c.machine_id == machine_id, table.c.sensor_type == sensor_type
+        )
+    ).scalar()
+    rolled_until = rolled_until + width if rolled_until else floor_time(start, TIER_WIDTHS[tier])
+
+    parts = [AggregateSeries.from_rows(conn.execute(
+        rollup_series_statement(table, machine_id, sensor_type, floor_time(start, TIER_WIDTHS[tier]), min(end, rolled_until))
+    ).fetchall())]
+    if rolled_until <= end:
+        tail_start = max(start, rolled_until)
+        read_from = tail_start - timedelta(seconds=lookback) if expand is not None else tail_start
+        if store is not None:
+            tail = store.series(machine_id, sensor_type, read_from, end)
+        else:
+            tail = SensorSeries.from_rows(conn.execute(
+                sensor_series_statement(readings_table, machine_id, sensor_type, read_from, end)
+            ).fetchall())
+        if expand is not None:
+            tail = expand(machine_id, sensor_type, tail, tail_start, end)
+        parts.append(AggregateSeries.from_series(tail))
+    return AggregateSeries.concat(parts)
+
+
+def bucket_rows(machine_id, sensor_type, ts, value, score, anomaly, width):
+    """Rollup rows for one sensor's sorted raw columns (``ts`` in epoch microseconds)"""
+    if not len(ts):
+        return []
+    bucket = np.asarray(ts) // (width * 1000000)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, len(bucket)])
+    return [
+        {
+            'machine_id': machine_id,
+            'sensor_type': sensor_type,
+            'bucket_start': EPOCH + timedelta(seconds=int(b) * width),
+            'count': count,
+            'min_value': low,
+            'max_value': high,
+            'sum_value': total,
+            'anomaly_count': anomalies,
+            'max_score': peak
+        }
+        for b, count, low, high, total, anomalies, peak in zip(
+            bucket[starts].tolist(),
+            counts.tolist(),
+            np.minimum.reduceat(value, starts).tolist(),
+            np.maximum.reduceat(value, starts).tolist(),
+            np.add.reduceat(value, starts).tolist(),
+            np.add.reduceat(np.asarray(anomaly, dtype=np.int64), starts).tolist(),
+            np.maximum.reduceat(score, starts).tolist()
+        )
+    ]
+
+
+class RollupPipeline:
+    """Incrementally maintain the rollup tiers and apply retention.
+
+    Each run re-aggregates from the newest bucket already present in a tier
+    (so rows that arrived late are picked up) up to the last bucket that
+    completed more than ``grace`` seconds ago, replacing those buckets in
+    one transaction per backfill window. Retention never deletes rows the
+    next tier has not absorbed yet.
+
+    With a ColumnarStore as ``store``, the 1m tier is aggregated from its
+    segments in NumPy, and raw retention drops whole segments.
+
+    Under deadband storage, ``expand(machine_id, sensor_type, series, start,
+    end)`` rebuilds the regular series from the stored readings (see
+    models/deadband.py). The 1m tier is then aggregated in NumPy from the
+    expanded series, so counts and means weigh each stored value by how long
+    it was held. Each window is read from ``lookback`` seconds earlier, so
+    the value held into it is included.
+    """
+
+    def __init__(self, engine, readings_table, tables, retention=None, grace=10.0, delete_batch=50000, store=None,
+                 expand=None, lookback=0.0):
+        self.engine = engine
+        self.readings = readings_table
+        self.store = store
+        self.expand = expand
+        self.lookback = timedelta(seconds=lookback)
+        self.tables = tables
+        self.retention = dict(DEFAULT_RETENTION if retention is None else retention)
+        self.grace = grace
+        self.delete_batch = delete_batch
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.buckets_written = {tier: 0 for tier, _ in ROLLUP_TIERS}
+        self.rows_deleted = {level: 0 for level in self.retention}
+        self.last_run_seconds = 0.0
+
+    def _source(self, tier):
+        """(timestamp column, aggregate columns) of the level a tier is built from"""
+        index = [name for name, _ in ROLLUP_TIERS].index(tier)
+        if index == 0:
+            raw = self.readings
+            return raw, raw.c.timestamp, [
+                func.count(),
+                func.min(raw.c.value),
+                func.max(raw.c.value),
+                func.sum(raw.c.value),
+                func.sum(case((raw.c.is_anomaly, 1), else_=0)),
+                func.coalesce(func.max(raw.c.anomaly_score), 0.0)
+            ]
+        finer = self.tables[ROLLUP_TIERS[index - 1][0]]
+        return finer, finer.c.bucket_start, [
+            func.sum(finer.c.count),
+            func.min(finer.c.min_value),
+            func.max(finer.c.max_value),
+            func.sum(finer.c.sum_value),
+            func.sum(finer.c.anomaly_count),
+            func.max(finer.c.max_score)
+        ]
+
+    def roll_tier(self, tier, now):
+        """Aggregate completed buckets for one tier; returns the number of buckets written"""
+        target = self.tables[tier]
+        width = TIER_WIDTHS[tier]
+        until = floor_time(now - timedelta(seconds=self.grace), width)
+        if (self.store is not None or self.expand is not None) and tier == ROLLUP_TIERS[0][0]:
+            return self._roll_series(tier, until)
+        source, timestamp, aggregates = self._source(tier)
+
+        with self.engine.connect() as conn:
+            since = conn.execute(select(func.max(target.c.bucket_start))).scalar()
+            if since is None:
+                first = conn.execute(select(func.min(timestamp))).scalar()
+                if first is None:
+                    return 0
+                since = floor_time(first, width)
+
+        bucket = func.strftime(BUCKET_FORMATS[tier], timestamp)
+        written = 0
+        while since < until:
+            window_end = min(since + BACKFILL_WINDOWS[tier], until)
+            aggregated = (
+                select(source.c.machine_id, source.c.sensor_type, bucket, *aggregates)
+                .where(timestamp >= since, timestamp < window_end)
+                .group_by(source.c.machine_id, source.c.sensor_type, bucket)
+            )
+            with self.engine.begin() as conn:
+                conn.execute(target.delete().where(target.c.bucket_start >= since, target.c.bucket_start < window_end))
+                result = conn.execute(target.insert().from_select(
+                    ['machine_id', 'sensor_type', 'bucket_start', 'count', 'min_value',
+                     'max_value', 'sum_value', 'anomaly_count', 'max_score'],
+                    aggregated
+                ))
+                written += max(result.rowcount, 0)
+            since = window_end
+        return written
+
+    def _first_timestamp(self):
+        if self.store is not None:
+            return self.store.first_timestamp()
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.min(self.readings.c.timestamp))).scalar()
+
+    def _sensors(self, since):
+        """(machine_id, sensor_type) pairs to roll, from the store or sensor_readings rows since ``since``"""
+        if self.store is not None:
+            return self.store.sensors()
+        raw = self.readings
+        with self.engine.connect() as conn:
+            return conn.execute(select(raw.c.machine_id, raw.c.sensor_type).where(raw.c.timestamp >= since).distinct()).fetchall()
+
+    def _read(self, machine_id, sensor_type, start, end):
+        """(ts_us, value, score, anomaly) arrays of one sensor in [start, end), from the store or sensor_readings"""
+        if self.store is not None:
+            return self.store.read(machine_id, sensor_type, start, end)
+        raw = self.readings
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(raw.c.timestamp, raw.c.value, func.coalesce(raw.c.anomaly_score, 0.0),
+                       func.coalesce(raw.c.is_anomaly, False))
+                .where(raw.c.machine_id == machine_id, raw.c.sensor_type == sensor_type,
+                       raw.c.timestamp >= start, raw.c.timestamp < end)
+                .order_by(raw.c.timestamp)
+            ).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=np.bool_)
+        timestamps, value, score, anomaly = zip(*rows)
+        return (np.array([(t - EPOCH) // MICROSECOND for t in timestamps], dtype=np.int64),
+                np.array(value, dtype=np.float64), np.array(score, dtype=np.float64), np.array(anomaly, dtype=np.bool_))
+
+    def _read_held(self, machine_id, sensor_type, start, end):
+        """_read() of the series expand() rebuilds over [start, end)"""
+        ts, value, score, anomaly = self._read(machine_id, sensor_type, start - self.lookback, end)
+        held = self.expand(machine_id, sensor_type, SensorSeries(ts / 1e6, value, anomaly, score), start, end)
+        ts = np.round(held.t * 1e6).astype(np.int64)
+        inside = ts < (end - EPOCH) // MICROSECOND
+        return ts[inside], held.value[inside], held.anomaly_score[inside], held.is_anomaly[inside]
+
+    def _roll_series(self, tier, until):
+        """roll_tier() for the finest tier in NumPy: from the reading store, or from expanded deadband readings"""
+        target = self.tables[tier]
+        width = TIER_WIDTHS[tier]
+        with self.engine.connect() as conn:
+            since = conn.execute(select(func.max(target.c.bucket_start))).scalar()
+        if since is None:
+            first = self._first_timestamp()
+            if first is None:
+                return 0
+            since = floor_time(first, width)
+
+        sensors = self._sensors(since - self.lookback)
+        read = self._read if self.expand is None else self._read_held
+        written = 0
+        while since < until:
+            window_end = min(since + BACKFILL_WINDOWS[tier], until)
+            rows = []
+            for machine_id, sensor_type in sensors:
+                ts, value, score, anomaly = read(machine_id, sensor_type, since, window_end)
+                rows.extend(bucket_rows(machine_id, sensor_type, ts, value, score, anomaly, width))
+            with self.engine.begin() as conn:
+                conn.execute(target.delete().where(target.c.bucket_start >= since, target.c.bucket_start < window_end))
+                if rows:
+                    conn.execute(target.insert(), rows)
+            written += len(rows)
+            since = window_end
+        return written
+
+    def rolled_until(self):
+        """Time up to which every tier has been rolled, or None while a tier is still empty"""
+        ends = []
+        with self.engine.connect() as conn:
+            for tier, width in ROLLUP_TIERS:
+                last = conn.execute(select(func.max(self.tables[tier].c.bucket_start))).scalar()
+                if last is None:
+                    return None
+                ends.append(last + timedelta(seconds=width))
+        return min(ends)
+
+    def apply_retention(self, now):
+        """Trim raw rows and finer tiers; returns {level: rows deleted}"""
+        levels = ['raw'] + [tier for tier, _ in ROLLUP_TIERS]
+        deleted = {}
+        for level, coarser in zip(levels, levels[1:] + [None]):
+            days = self.retention.get(level)
+            if days is None:
+                continue
+            cutoff = now - timedelta(days=days)
+
+            # Only drop what the next tier already covers
+            if coarser is not None:
+                with self.engine.connect() as conn:
+                    absorbed = conn.execute(select(func.max(self.tables[coarser].c.bucket_start))).scalar()
+                if absorbed is None:
+                    continue
+                cutoff = min(cutoff, absorbed)
+
+            deleted[level] = self._delete_before(level, cutoff)
+        return deleted
+
+    def _delete_before(self, level, cutoff):
+        total = 0
+        if level == 'raw' and self.store is not None:
+            total = self.store.drop_before(cutoff)
+        elif level == 'raw':
+            table = self.readings
+            # Batches keep each write lock short while the generator is inserting
+            while True:
+                with self.engine.begin() as conn:
+                    ids = select(table.c.id).where(table.c.timestamp < cutoff).limit(self.delete_batch)
+                    count = conn.execute(table.delete().where(table.c.id.in_(ids))).rowcount
+                total += count
+                if count < self.delete_batch:
+                    break
+        else:
+            table = self.tables[level]
+            with self.engine.begin() as conn:
+                total = conn.execute(table.delete().where(table.c.bucket_start < cutoff)).rowcount
+        return total
+
+    def run_once(self, now=None):
+        """Roll every tier and apply retention; returns a summary dict"""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        with self._lock:
+            written = {tier: self.roll_tier(tier, now) for tier, _ in ROLLUP_TIERS}
+            deleted = self.apply_retention(now)
+
+            self.runs += 1
+            for tier, count in written.items():
+                self.buckets_written[tier] += count
+            for level, count in deleted.items():
+                self.rows_deleted[level] += count
+            self.last_run_seconds = time.perf_counter() - started
+        return {'written': written, 'deleted': deleted}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'buckets_written': dict(self.buckets_written),
+                'rows_deleted': dict(self.rows_deleted),
+                'last_run_seconds': round(self.last_run_seconds, 4),
+                'retention_days': dict(self.retention)
+            }
+
+
+def main(argv=None):
+    from models.database import ROLLUP_TABLES, SensorReading, db
+
+    argv = argv if argv is not None else sys.argv[1:]
+    path = argv[0] if argv else 'machines.db'
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=list(ROLLUP_TABLES.values()))
+
+    print(f"📦 Rolling up {path}...")
+    summary = RollupPipeline(engine, SensorReading.__table__, ROLLUP_TABLES).run_once()
+    for tier, count in summary['written'].items():
+        print(f"   ✅ {tier}: {count} buckets written")
+    for level, count in summary['deleted'].items():
+        print(f"   🗑️ {level}: {count} rows past retention deleted")
+    return summary
+
+
+if __name__ == '__main__':
+    main()
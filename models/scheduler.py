@@ -0,0 +1,129 @@
+import heapq
+import itertools
+import threading
+import time
+
+from models.metrics import RunningStats
+
+
+class ScheduledJob:
+    """One periodic job and its timing statistics"""
+
+    def __init__(self, name, period, func, next_deadline):
+        self.name = name
+        self.period = period
+        self.func = func
+        self.next_deadline = next_deadline
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.errors = 0
+        self.lag = RunningStats()
+        self.duration = RunningStats()
+
+    def stats(self):
+        return {
+            'period_seconds': self.period,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'missed_ticks': self.missed_ticks,
+            'errors': self.errors,
+            'lag_ms': self.lag.to_dict(scale=1000, digits=2),
+            'duration_ms': self.duration.to_dict(scale=1000, digits=2)
+        }
+
+
+class FixedRateScheduler:
+    """Run jobs on absolute deadlines instead of sleeping after the work.
+
+    Deadlines advance by exactly one period from the previous deadline, so
+    processing time does not accumulate into drift. If a job falls more than
+    a whole period behind, the skipped deadlines are counted as missed ticks
+    rather than fired back-to-back.
+
+    - lag: how late a tick started relative to its deadline
+    - overrun: a tick whose run time exceeded its period
+    - missed tick: a deadline skipped because the job could not keep up
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+
+    def add_job(self, name, period, func, start_delay=0.0):
+        """Register ``func`` to run every ``period`` seconds"""
+        if period <= 0:
+            raise ValueError("period must be positive")
+
+        with self._lock:
+            job = ScheduledJob(name, period, func, self.clock() + start_delay)
+            self._jobs[name] = job
+            heapq.heappush(self._heap, (job.next_deadline, next(self._seq), job))
+        self._wakeup.set()
+        return job
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def run_forever(self):
+        """Fire due jobs until stop() is called"""
+        self._stopping = False
+        while not self._stopping:
+            with self._lock:
+                if not self._heap:
+                    job = None
+                else:
+                    deadline, _, job = self._heap[0]
+
+            if job is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            delay = deadline - self.clock()
+            if delay > 0:
+                # Woken early when a job is added or stop() is called
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                heapq.heappop(self._heap)
+            self._run_job(job, deadline)
+            with self._lock:
+                heapq.heappush(self._heap, (job.next_deadline, next(self._seq), job))
+
+    def _run_job(self, job, deadline):
+        started = self.clock()
+        job.lag.record(started - deadline)
+
+        try:
+            job.func()
+        except Exception as e:
+            job.errors += 1
+            print(f"❌ Error in scheduled job {job.name}: {e}")
+
+        finished = self.clock()
+        job.ticks += 1
+        job.duration.record(finished - started)
+        if finished - started > job.period:
+            job.overruns += 1
+
+        # A late tick still fires (with lag); whole periods behind are skipped
+        next_deadline = deadline + job.period
+        behind = finished - next_deadline
+        if behind >= job.period:
+            missed = int(behind // job.period)
+            job.missed_ticks += missed
+            next_deadline += missed * job.period
+        job.next_deadline = next_deadline
+
+    def stats(self):
+        with self._lock:
+            return {name: job.stats() for name, job in self._jobs.items()}
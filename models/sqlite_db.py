@@ -0,0 +1,205 @@
+"""Tuned SQLite access shared by the SQLAlchemy engine and raw sqlite3 callers.
+
+SQLite allows one write transaction per database file at a time. A second
+writer spins on the busy timeout and can then fail with "database is
+locked". SQLiteDatabase makes that explicit. Every connection gets the
+same pragma profile (WAL, so readers never block the writer). Write
+transactions take a process-wide WriteGate first:
+
+* raw sqlite3 callers use ``writer()``, a single long-lived connection
+  behind the gate, and ``reader()``, a small pool of query-only
+  connections;
+* the Flask-SQLAlchemy engine is hooked with ``install(engine)``, so a
+  connection takes the gate at its first write statement and hands it
+  back when its transaction ends.
+
+Waiting for the gate and for a pooled reader is timed, so lock contention
+shows up in the stats instead of as sporadic slow requests.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from models.metrics import RunningStats
+
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),      # WAL is still crash-safe; commits no longer fsync
+    ('cache_size', -65536),         # Negative = KiB, i.e. a 64 MiB page cache per connection
+    ('mmap_size', 268435456),       # Map up to 256 MiB of the file instead of read() calls
+    ('temp_store', 'MEMORY')
+)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER', 'ANALYZE')
+HOLDS_WRITE = 'sqlite_db_holds_write'
+
+
+def is_write(statement):
+    return statement.lstrip().upper().startswith(WRITE_STATEMENTS)
+
+
+class WriteGate:
+    """Process-wide single-writer slot, re-entrant for the thread holding it"""
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._owner = None
+        self._depth = 0
+        self._acquired_at = 0.0
+        self.wait = RunningStats()
+        self.hold = RunningStats()
+        self.contended = 0
+        self.timeouts = 0
+
+    def acquire(self):
+        me = threading.get_ident()
+        started = time.perf_counter()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+            if self._owner is not None:
+                self.contended += 1
+            if not self._cond.wait_for(lambda: self._owner is None, self.timeout):
+                self.timeouts += 1
+                raise sqlite3.OperationalError('database is locked (write gate timeout)')
+            self._owner = me
+            self._depth = 1
+            self._acquired_at = time.perf_counter()
+        self.wait.record(self._acquired_at - started)
+
+    def release(self):
+        with self._cond:
+            if self._owner is None:
+                return
+            self._depth -= 1
+            if self._depth:
+                return
+            self.hold.record(time.perf_counter() - self._acquired_at)
+            self._owner = None
+            self._cond.notify()
+
+    def stats(self):
+        return {
+            'wait_ms': self.wait.to_dict(scale=1000),
+            'hold_ms': self.hold.to_dict(scale=1000),
+            'contended': self.contended,
+            'timeouts': self.timeouts
+        }
+
+
+class SQLiteDatabase:
+    """One database file: pragma profile, write gate, writer connection and reader pool"""
+
+    def __init__(self, path, pragmas=DEFAULT_PRAGMAS, read_pool_size=4, busy_timeout=5.0):
+        self.path = path
+        self.pragmas = tuple(pragmas)
+        self.read_pool_size = read_pool_size
+        self.busy_timeout = busy_timeout
+        self.gate = WriteGate(busy_timeout)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self.read_wait = RunningStats()
+        self.engines = []
+
+    def apply_pragmas(self, connection):
+        cursor = connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}')
+        for name, value in self.pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        self.apply_pragmas(connection)
+        return connection
+
+    @contextmanager
+    def writer(self):
+        """The writer connection, inside the gate; commits on success, rolls back on error"""
+        self.gate.acquire()
+        try:
+            if self._writer is None:
+                self._writer = self.connect()
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+        finally:
+            self.gate.release()
+
+    @contextmanager
+    def reader(self):
+        """A pooled query-only connection, opened lazily up to read_pool_size"""
+        started = time.perf_counter()
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            connection = None
+            with self._lock:
+                if self._reader_count < self.read_pool_size:
+                    self._reader_count += 1
+                    connection = True
+            if connection is True:
+                connection = self.connect()
+                connection.execute('PRAGMA query_only = ON')
+            else:
+                try:
+                    connection = self._readers.get(timeout=self.busy_timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError('no reader connection available') from None
+        self.read_wait.record(time.perf_counter() - started)
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            self._readers.put(connection)
+
+    def install(self, engine):
+        """Apply the pragma profile to ``engine`` and route its write transactions through the gate"""
+        gate = self.gate
+
+        @event.listens_for(engine, 'connect')
+        def _connect(dbapi_connection, connection_record):
+            self.apply_pragmas(dbapi_connection)
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if not conn.info.get(HOLDS_WRITE) and is_write(statement):
+                gate.acquire()
+                conn.info[HOLDS_WRITE] = True
+
+        def _release(info):
+            if info.pop(HOLDS_WRITE, False):
+                gate.release()
+
+        # ConnectionEvents.commit fires just before the DBAPI commit. With
+        # synchronous=NORMAL that commit is short, and the busy timeout covers it.
+        event.listen(engine, 'commit', lambda conn: _release(conn.info))
+        event.listen(engine, 'rollback', lambda conn: _release(conn.info))
+        # Connections returned or discarded mid-transaction
+        event.listen(engine.pool, 'reset', lambda dbapi_connection, record, reset_state: _release(record.info))
+        event.listen(engine.pool, 'invalidate', lambda dbapi_connection, record, exception: _release(record.info))
+        self.engines.append(engine)
+
+    def stats(self):
+        with self._lock:
+            readers = self._reader_count
+        return {
+            'path': self.path,
+            'pragmas': dict(self.pragmas),
+            'write_gate': self.gate.stats(),
+            'read_wait_ms': self.read_wait.to_dict(scale=1000),
+            'read_connections': readers,
+            'read_connections_idle': self._readers.qsize(),
+            'engine_pools': [engine.pool.status() for engine in self.engines]
+        }
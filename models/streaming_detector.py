@@ -0,0 +1,204 @@
+"""Streaming statistical anomaly detection with per-sensor online state.
+
+The rule-based detector (detect_simple_anomaly and FleetTickEngine.detect)
+only compares a value with the sensor's static normal range.
+StreamingDetector also keeps online statistics for every (machine,
+sensor) pair, in flat NumPy arrays:
+
+* Welford running mean and variance: the long-run baseline;
+* EWMA mean and variance: the recent level. Its z-score is a rolling
+  z-score over roughly 1 / alpha readings without storing a window.
+
+A tick is scored in one vectorized pass: O(1) work per sensor and no
+history query. A reading is flagged once its rolling z-score exceeds
+``z_threshold`` after ``warmup`` readings. The EWMA always takes the new
+value, so a lasting level shift is absorbed and stops alerting. The
+Welford baseline only takes readings that were not flagged, which
+keeps the gap between the two (reported as drift) meaningful.
+
+Statistical scores are capped at ``score_cap`` (below the 0.8 critical
+threshold): they add early-warning flags but never raise critical alerts
+on their own. save()/load() snapshot the state to an .npz file so
+baselines survive restarts.
+"""
+import os
+import threading
+import weakref
+
+import numpy as np
+
+
+def save_npz(path, arrays):
+    """Write ``arrays`` to ``path`` (.npz) through a temporary file, so readers never see a partial snapshot"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+class SensorStateArrays:
+    """Online per-(machine, sensor) state in parallel NumPy columns.
+
+    Subclasses name their float columns in COLUMNS (``count`` is an int64
+    column if listed). Rows are allocated on first sight, and FleetLayout
+    slots map to rows once per layout. save()/load() snapshot every
+    column to an .npz file.
+    """
+
+    COLUMNS = ()
+
+    def __init__(self, capacity=64):
+        self._lock = threading.Lock()
+        self.index = {}
+        self.keys = []
+        for name in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64 if name == 'count' else np.float64))
+        self._layout_rows = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _grow(self, needed):
+        size = len(getattr(self, self.COLUMNS[0]))
+        while size < needed:
+            size *= 2
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def rows(self, machine_ids, sensor_types):
+        """State rows for parallel machine/sensor sequences, allocating new sensors (call with the lock held)"""
+        rows = np.empty(len(sensor_types), dtype=np.int64)
+        for i, key in enumerate(zip(machine_ids, sensor_types)):
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.keys)
+                self.keys.append(key)
+            rows[i] = row
+        if len(self.keys) > len(getattr(self, self.COLUMNS[0])):
+            self._grow(len(self.keys))
+        return rows
+
+    def _rows_for_layout(self, layout):
+        rows = self._layout_rows.get(layout)
+        if rows is None:
+            rows = self._layout_rows[layout] = self.rows(layout.slot_machine.tolist(), layout.slot_sensor)
+        return rows
+
+    def save(self, path):
+        """Snapshot every sensor's state to ``path`` (.npz), atomically"""
+        with self._lock:
+            n = len(self.keys)
+            machine_ids = np.array([machine_id for machine_id, _ in self.keys], dtype=np.int64)
+            sensor_types = np.array([sensor_type for _, sensor_type in self.keys], dtype=np.str_)
+            columns = {name: getattr(self, name)[:n].copy() for name in self.COLUMNS}
+        save_npz(path, {'machine_id': machine_ids, 'sensor_type': sensor_types, **columns})
+        return n
+
+    def load(self, path):
+        """Restore a snapshot written by save(); returns the number of sensors restored"""
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as snapshot:
+            machine_ids = snapshot['machine_id'].tolist()
+            sensor_types = snapshot['sensor_type'].tolist()
+            columns = {name: snapshot[name] for name in self.COLUMNS}
+        with self._lock:
+            rows = self.rows(machine_ids, sensor_types)
+            for name, column in columns.items():
+                getattr(self, name)[rows] = column
+        return len(rows)
+
+
+class StreamingDetector(SensorStateArrays):
+    """Per-sensor Welford/EWMA state and vectorized scoring for fleet ticks"""
+
+    COLUMNS = ('count', 'mean', 'm2', 'ewma', 'ewmvar')
+
+    def __init__(self, alpha=0.1, z_threshold=4.0, warmup=30, score_cap=0.79, capacity=64):
+        super().__init__(capacity)
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.score_cap = score_cap
+        self.ticks = 0
+        self.readings = 0
+        self.flagged = 0
+
+    def update(self, rows, values, rule_flags=None):
+        """Score ``values`` for state ``rows``, then fold them in; returns (flags, scores, drift).
+
+        ``rule_flags`` marks readings already flagged by the rule-based
+        detector; like statistical anomalies they stay out of the Welford
+        baseline. Call with the lock held.
+        """
+        count = self.count[rows]
+        mean = self.mean[rows]
+        ewma = self.ewma[rows]
+        ewmvar = self.ewmvar[rows]
+        warm = count >= self.warmup
+        first = count == 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.abs(values - ewma) / np.sqrt(ewmvar)
+            baseline_std = np.sqrt(self.m2[rows] / np.maximum(count - 1, 1))
+            drift = np.where(warm & (baseline_std > 0), np.abs(ewma - mean) / baseline_std, 0.0)
+        z = np.where(warm & np.isfinite(z), z, 0.0)
+        flags = z > self.z_threshold
+        # 0 at the threshold, approaching score_cap as z doubles past it
+        scores = np.where(flags, self.score_cap * np.minimum(1.0, (z - self.z_threshold) / self.z_threshold), 0.0)
+
+        # EWMA level and variance take every reading so level shifts are absorbed
+        diff = values - ewma
+        self.ewma[rows] = np.where(first, values, ewma + self.alpha * diff)
+        self.ewmvar[rows] = np.where(first, 0.0, (1 - self.alpha) * (ewmvar + self.alpha * diff * diff))
+
+        # Welford baseline only learns from readings nobody flagged
+        learn = ~flags if rule_flags is None else ~(flags | rule_flags)
+        new_count = count + learn
+        delta = values - mean
+        new_mean = np.where(learn, mean + delta / np.maximum(new_count, 1), mean)
+        self.m2[rows] = np.where(learn, self.m2[rows] + delta * (values - new_mean), self.m2[rows])
+        self.mean[rows] = new_mean
+        self.count[rows] = new_count
+
+        self.ticks += 1
+        self.readings += len(rows)
+        self.flagged += int(flags.sum())
+        return flags, scores, drift
+
+    def score_tick(self, tick):
+        """(is_anomaly, anomaly_scores) of a FleetTick with statistical flags OR'd into the rule-based ones"""
+        with self._lock:
+            flags, scores, _ = self.update(self._rows_for_layout(tick.layout), tick.values, tick.is_anomaly)
+        return tick.is_anomaly | flags, np.maximum(tick.anomaly_scores, scores)
+
+    def sensor_state(self, machine_id, sensor_type):
+        """Baseline and recent statistics of one sensor, or None if it was never scored"""
+        with self._lock:
+            row = self.index.get((machine_id, sensor_type))
+            if row is None:
+                return None
+            count = int(self.count[row])
+            return {
+                'count': count,
+                'mean': float(self.mean[row]),
+                'std': float(np.sqrt(self.m2[row] / max(count - 1, 1))),
+                'ewma': float(self.ewma[row]),
+                'ewm_std': float(np.sqrt(self.ewmvar[row]))
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sensors': len(self.keys),
+                'warm_sensors': int((self.count[:len(self.keys)] >= self.warmup).sum()),
+                'ticks': self.ticks,
+                'readings': self.readings,
+                'flagged': self.flagged
+            }
@@ -0,0 +1,227 @@
+import numpy as np
+
+# Status classes understood by the generator. Anything else falls back to a
+# plain uniform draw inside the normal range, same as generate_sensor_value.
+STATUS_CLASSES = ('normal', 'maintenance', 'sabotage', 'shutdown')
+
+
+class CompiledMachineType:
+    """Sensor bounds for one machine type, compiled into NumPy arrays"""
+
+    def __init__(self, machine_type, sensors):
+        self.machine_type = machine_type
+        self.sensor_types = list(sensors.keys())
+        self.units = [sensors[s]['unit'] for s in self.sensor_types]
+        self.normal_ranges = [
+            f"{sensors[s]['normal_range'][0]} - {sensors[s]['normal_range'][1]} {sensors[s]['unit']}"
+            for s in self.sensor_types
+        ]
+        self.min = np.array([sensors[s]['min'] for s in self.sensor_types], dtype=np.float64)
+        self.max = np.array([sensors[s]['max'] for s in self.sensor_types], dtype=np.float64)
+        self.normal_min = np.array([sensors[s]['normal_range'][0] for s in self.sensor_types], dtype=np.float64)
+        self.normal_max = np.array([sensors[s]['normal_range'][1] for s in self.sensor_types], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.sensor_types)
+
+
+class FleetLayout:
+    """Flattened sensor slots for an ordered list of machines.
+
+    Every (machine, sensor) pair gets one slot; the bound arrays are gathered
+    once so a tick only has to draw random numbers and apply masks.
+    """
+
+    def __init__(self, machines, compiled_types):
+        machine_ids = []
+        machine_types = []
+        slot_machine = []
+        slot_sensor = []
+        slot_unit = []
+        slot_range = []
+        bounds = {'min': [], 'max': [], 'normal_min': [], 'normal_max': []}
+        offsets = {}
+
+        for machine_id, machine_type in machines:
+            compiled = compiled_types.get(machine_type)
+            if compiled is None:
+                continue
+            start = len(slot_machine)
+            offsets[machine_id] = (start, start + len(compiled))
+            machine_ids.append(machine_id)
+            machine_types.append(machine_type)
+            slot_machine.extend([machine_id] * len(compiled))
+            slot_sensor.extend(compiled.sensor_types)
+            slot_unit.extend(compiled.units)
+            slot_range.extend(compiled.normal_ranges)
+            for key in bounds:
+                bounds[key].append(getattr(compiled, key))
+
+        self.machine_ids = machine_ids
+        self.machine_types = machine_types
+        self.offsets = offsets
+        self.slot_machine = np.array(slot_machine, dtype=np.int64)
+        self.slot_sensor = slot_sensor
+        self.slot_unit = slot_unit
+        self.slot_range = slot_range
+        empty = np.empty(0, dtype=np.float64)
+        self.min = np.concatenate(bounds['min']) if bounds['min'] else empty
+        self.max = np.concatenate(bounds['max']) if bounds['max'] else empty
+        self.normal_min = np.concatenate(bounds['normal_min']) if bounds['normal_min'] else empty
+        self.normal_max = np.concatenate(bounds['normal_max']) if bounds['normal_max'] else empty
+        self.normal_span = self.normal_max - self.normal_min
+
+        # Slot -> index of its machine in machine_ids, used to broadcast statuses
+        self.slot_owner = np.repeat(
+            np.arange(len(machine_ids)),
+            [offsets[m][1] - offsets[m][0] for m in machine_ids]
+        )
+
+    def __len__(self):
+        return len(self.slot_sensor)
+
+
+class FleetTick:
+    """Values, anomaly flags and scores for every slot of one tick"""
+
+    def __init__(self, layout, statuses, values, is_anomaly, anomaly_scores):
+        self.layout = layout
+        self.statuses = statuses
+        self.values = values
+        self.is_anomaly = is_anomaly
+        self.anomaly_scores = anomaly_scores
+
+    def machine_readings(self, machine_id):
+        """Return {sensor_type: (value, is_anomaly, anomaly_score)} for one machine"""
+        bounds = self.layout.offsets.get(machine_id)
+        if bounds is None:
+            return {}
+        start, end = bounds
+        return {
+            self.layout.slot_sensor[i]: (
+                float(self.values[i]),
+                bool(self.is_anomaly[i]),
+                float(self.anomaly_scores[i])
+            )
+            for i in range(start, end)
+        }
+
+    def rows(self, timestamp):
+        """sensor_readings row dicts for every slot, rounded like generate_machine_data"""
+        layout = self.layout
+        return [
+            {
+                'machine_id': machine_id,
+                'sensor_type': sensor_type,
+                'value': value,
+                'unit': unit,
+                'is_anomaly': is_anomaly,
+                'anomaly_score': score,
+                'timestamp': timestamp
+            }
+            for machine_id, sensor_type, unit, value, is_anomaly, score in zip(
+                layout.slot_machine.tolist(),
+                layout.slot_sensor,
+                layout.slot_unit,
+                np.round(self.values, 2).tolist(),
+                self.is_anomaly.tolist(),
+                np.round(self.anomaly_scores, 3).tolist()
+            )
+        ]
+
+
+class FleetTickEngine:
+    """Vectorized replacement for the per-sensor generate/detect loop.
+
+    MACHINES_CONFIG is compiled once into per-type bound arrays. Each tick
+    draws every random number for a status class in a single NumPy call and
+    mirrors the distributions of generate_sensor_value and
+    detect_simple_anomaly.
+    """
+
+    def __init__(self, machines_config, seed=None):
+        self.compiled_types = {
+            machine_type: CompiledMachineType(machine_type, config['sensors'])
+            for machine_type, config in machines_config.items()
+        }
+        self.rng = np.random.default_rng(seed)
+        self._layouts = {}
+
+    def layout(self, machines):
+        """Return a cached FleetLayout for [(machine_id, machine_type), ...]
+
+        Several layouts are kept so machine groups ticking at different
+        sample rates do not evict each other.
+        """
+        key = tuple(machines)
+        layout = self._layouts.get(key)
+        if layout is None:
+            if len(self._layouts) >= 16:
+                self._layouts.clear()
+            layout = self._layouts[key] = FleetLayout(key, self.compiled_types)
+        return layout
+
+    def tick(self, machines):
+        """Generate one tick for [(machine_id, machine_type, status), ...]"""
+        layout = self.layout([(m_id, m_type) for m_id, m_type, _ in machines])
+        status_by_id = {m_id: status for m_id, _, status in machines}
+        statuses = np.array([status_by_id[m_id] for m_id in layout.machine_ids], dtype=object)
+        slot_status = statuses[layout.slot_owner] if len(layout) else np.empty(0, dtype=object)
+
+        values = np.empty(len(layout), dtype=np.float64)
+        handled = np.zeros(len(layout), dtype=bool)
+        for status in STATUS_CLASSES:
+            idx = np.flatnonzero(slot_status == status)
+            if idx.size:
+                values[idx] = getattr(self, f'_generate_{status}')(layout, idx)
+                handled[idx] = True
+
+        idx = np.flatnonzero(~handled)
+        if idx.size:
+            values[idx] = self.rng.uniform(layout.normal_min[idx], layout.normal_max[idx])
+
+        is_anomaly, scores = self.detect(layout, values, slot_status == 'sabotage')
+        return FleetTick(layout, statuses, values, is_anomaly, scores)
+
+    def _generate_normal(self, layout, idx):
+        base = self.rng.uniform(layout.normal_min[idx], layout.normal_max[idx])
+        noise = self.rng.uniform(-0.02, 0.02, idx.size) * base
+        return np.clip(base + noise, layout.min[idx], layout.max[idx])
+
+    def _generate_maintenance(self, layout, idx):
+        base = self.rng.uniform(layout.normal_min[idx], layout.normal_max[idx])
+        irregular = self.rng.random(idx.size) < 0.4
+        deviation = self.rng.uniform(0.15, 0.35, idx.size) * layout.normal_span[idx]
+        sign = np.where(self.rng.random(idx.size) < 0.5, -1.0, 1.0)
+        base = base + np.where(irregular, sign * deviation, 0.0)
+        return np.clip(base, layout.min[idx], layout.max[idx])
+
+    def _generate_sabotage(self, layout, idx):
+        min_val = layout.min[idx]
+        max_val = layout.max[idx]
+        extreme = self.rng.random(idx.size) < 0.8
+        high = self.rng.random(idx.size) < 0.5
+        high_val = self.rng.uniform(max_val * 0.85, max_val)
+        low_val = self.rng.uniform(min_val, min_val + (max_val - min_val) * 0.15)
+        normal_val = self.rng.uniform(layout.normal_min[idx], layout.normal_max[idx])
+        return np.where(extreme, np.where(high, high_val, low_val), normal_val)
+
+    def _generate_shutdown(self, layout, idx):
+        # generate_sensor_value has no shutdown branch: it falls through to a plain normal-range draw
+        return self.rng.uniform(layout.normal_min[idx], layout.normal_max[idx])
+
+    @staticmethod
+    def detect(layout, values, sabotage_mask):
+        """Vectorized detect_simple_anomaly over every slot"""
+        below = (layout.normal_min - values) / layout.normal_span
+        above = (values - layout.normal_max) / layout.normal_span
+        deviation = np.where(values < layout.normal_min, below,
+                             np.where(values > layout.normal_max, above, 0.0))
+
+        is_anomaly = deviation > 0.1
+        scores = np.minimum(1.0, deviation)
+
+        extreme = sabotage_mask & ((values >= layout.max * 0.9) | (values <= layout.min * 1.1))
+        is_anomaly = is_anomaly | extreme
+        scores = np.where(extreme, 0.95, scores)
+        return is_anomaly, scores
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+
+OVERFLOW_POLICIES = ('block', 'shed', 'drop_oldest')
+
+
+class WriteBehindBuffer:
+    """Bounded in-memory queue between data generation and the database.
+
+    The generator submits rows and returns immediately; a dedicated writer
+    thread drains the queue and group-commits through ``writer.write(rows)``
+    once ``flush_rows`` rows are waiting or the oldest row has waited
+    ``flush_interval`` seconds.
+
+    When the queue is full the ``overflow`` policy applies:
+      - 'block': wait up to ``block_timeout`` seconds for room, then shed
+      - 'shed': reject the incoming rows immediately
+      - 'drop_oldest': evict the oldest queued rows to make room
+    Shed rows were never queued; dropped rows were queued but never written
+    (evicted, or lost to a failed write).
+    """
+
+    def __init__(self, writer, max_rows=50000, flush_rows=2000, flush_interval=1.0,
+                 max_batch_rows=20000, overflow='block', block_timeout=0.5):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.writer = writer
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_batch_rows = max_batch_rows
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._rows = deque()
+        self._oldest_at = None
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.shed = 0
+        self.dropped = 0
+        self.blocked_submits = 0
+        self.blocked_seconds = 0.0
+        self.flushes = 0
+        self.write_errors = 0
+        self.max_depth = 0
+
+    def start(self):
+        """Start the writer thread (idempotent)"""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='reading-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush what is queued and stop the writer thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, rows):
+        """Queue rows for writing; returns how many were accepted"""
+        if not rows:
+            return 0
+
+        with self._cond:
+            self.submitted += len(rows)
+            free = self.max_rows - len(self._rows)
+
+            if free < len(rows):
+                if self.overflow == 'block':
+                    self.blocked_submits += 1
+                    started = time.monotonic()
+                    deadline = started + self.block_timeout
+                    while free < len(rows) and not self._stopping:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                        free = self.max_rows - len(self._rows)
+                    self.blocked_seconds += time.monotonic() - started
+                elif self.overflow == 'drop_oldest':
+                    evict = min(len(rows) - free, len(self._rows))
+                    for _ in range(evict):
+                        self._rows.popleft()
+                    self.dropped += evict
+                    free += evict
+
+            accepted = rows if free >= len(rows) else rows[:max(free, 0)]
+            self.shed += len(rows) - len(accepted)
+
+            if accepted:
+                was_empty = not self._rows
+                if was_empty:
+                    self._oldest_at = time.monotonic()
+                self._rows.extend(accepted)
+                self.max_depth = max(self.max_depth, len(self._rows))
+                # Wake the writer to arm its age timer, or to flush on size
+                if was_empty or len(self._rows) >= self.flush_rows:
+                    self._cond.notify_all()
+
+            return len(accepted)
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been handed to the writer"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._oldest_at = time.monotonic() - self.flush_interval if self._rows else None
+            self._cond.notify_all()
+            while self._rows or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _take_batch(self):
+        """Wait for a size or time threshold and pop one group-commit batch"""
+        with self._cond:
+            while True:
+                if self._rows:
+                    due = self._oldest_at + self.flush_interval - time.monotonic()
+                    if len(self._rows) >= self.flush_rows or due <= 0 or self._stopping:
+                        break
+                    self._cond.wait(due)
+                elif self._stopping:
+                    return None
+                else:
+                    self._cond.wait()
+
+            size = min(len(self._rows), self.max_batch_rows)
+            batch = [self._rows.popleft() for _ in range(size)]
+            self._oldest_at = time.monotonic() if self._rows else None
+            self._in_flight = len(batch)
+            # Room was freed for blocked submitters
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+
+            try:
+                self.writer.write(batch)
+                written, dropped, errors = len(batch), 0, 0
+            except Exception as e:
+                print(f"❌ Error writing buffered readings: {e}")
+                written, dropped, errors = 0, len(batch), 1
+
+            with self._cond:
+                self.written += written
+                self.dropped += dropped
+                self.write_errors += errors
+                self.flushes += 1
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def stats(self):
+        """Queue depth, backpressure and drop/shed counters"""
+        with self._cond:
+            return {
+                'depth': len(self._rows),
+                'max_depth': self.max_depth,
+                'capacity': self.max_rows,
+                'overflow_policy': self.overflow,
+                'submitted': self.submitted,
+                'written': self.written,
+                'shed': self.shed,
+                'dropped': self.dropped,
+                'blocked_submits': self.blocked_submits,
+                'blocked_seconds': round(self.blocked_seconds, 4),
+                'flushes': self.flushes,
+                'write_errors': self.write_errors,
+                'writer_alive': bool(self._thread and self._thread.is_alive())
+            }
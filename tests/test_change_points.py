@@ -0,0 +1,73 @@
+import numpy as np
+
+from models.change_points import ChangePointDetector, SeriesScan, merge_moments
+
+
+def stream(detector, t, values):
+    with detector._lock:
+        rows = detector.rows([1], ['temperature'])
+        return [event for i in range(len(values)) for event in detector.update(rows, values[i:i + 1], float(t[i]))]
+
+
+def scan(detector, t, values, chunk):
+    series = SeriesScan(detector, 1, 'temperature')
+    return [event for i in range(0, len(values), chunk) for event in series.feed(t[i:i + chunk], values[i:i + chunk])]
+
+
+def summary(events):
+    return [(e.direction, e.change_time, float(e.detected_at), round(e.shift, 6)) for e in events]
+
+
+def shifting_series(seed=0):
+    rng = np.random.default_rng(seed)
+    normal = rng.uniform(60, 100, 3000)
+    offsets = np.where(rng.random(3000) < 0.4, rng.choice([-10.0, 10.0], 3000), 0.0)
+    maintenance = rng.uniform(60, 100, 3000) + offsets
+    drifted = rng.uniform(60, 100, 4000) + 15.0
+    values = np.concatenate([normal, maintenance, drifted])
+    return np.arange(len(values), dtype=np.float64), values
+
+
+def test_merge_moments_matches_direct_moments():
+    values = np.random.default_rng(1).normal(5.0, 2.0, 500)
+    state = (0, 0.0, 0.0, 0.0, 0.0)
+    for value in values:
+        state = merge_moments(*state, 1, value, 0.0, 0.0, 0.0)
+    centered = values - values.mean()
+    assert state[0] == len(values)
+    np.testing.assert_allclose(state[1:], [values.mean()] + [(centered ** p).sum() for p in (2, 3, 4)])
+
+
+def test_series_scan_matches_streaming_updates():
+    t, values = shifting_series()
+    streamed = summary(stream(ChangePointDetector(warmup=500), t, values))
+    assert [direction for direction, *_ in streamed] == ['variance', 'up']
+    for chunk in (1, 777, len(values)):
+        assert summary(scan(ChangePointDetector(warmup=500), t, values, chunk)) == streamed
+
+
+def test_change_time_is_close_to_the_shift():
+    t, values = shifting_series()
+    events = scan(ChangePointDetector(warmup=500), t, values, 1000)
+    variance, up = events
+    assert abs(variance.change_time - 3000) < 100 and variance.change_time <= variance.detected_at < 3600
+    assert abs(up.change_time - 6000) < 50 and up.change_time <= up.detected_at < 6100
+    assert up.shift > 1.0 and variance.shift > 1.0
+
+
+def test_stationary_readings_raise_no_events():
+    rng = np.random.default_rng(2)
+    values = rng.uniform(60, 100, 200000)
+    assert scan(ChangePointDetector(), np.arange(len(values), dtype=np.float64), values, 50000) == []
+
+
+def test_snapshot_roundtrip(tmp_path):
+    t, values = shifting_series()
+    detector = ChangePointDetector(warmup=500)
+    stream(detector, t[:2000], values[:2000])
+    path = str(tmp_path / 'state.npz')
+    assert detector.save(path) == 1
+
+    restored = ChangePointDetector(warmup=500)
+    assert restored.load(path) == 1
+    assert summary(stream(restored, t[2000:], values[2000:])) == summary(stream(detector, t[2000:], values[2000:]))
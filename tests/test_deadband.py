@@ -0,0 +1,48 @@
+import numpy as np
+
+from models.deadband import expand_steps
+from models.downsampling import SensorSeries
+
+
+def series(t, anomalies=None):
+    t = np.asarray(t, dtype=np.float64)
+    return SensorSeries(t, np.arange(len(t), dtype=np.float64),
+                        np.asarray(anomalies if anomalies is not None else [False] * len(t)), np.zeros(len(t)))
+
+
+def test_values_are_held_at_the_sample_period():
+    expanded = expand_steps(series([0.0, 3.0, 5.0]), 1.0)
+    assert expanded.t.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert expanded.value.tolist() == [0.0, 0.0, 0.0, 1.0, 1.0, 2.0, 2.0]
+
+
+def test_jitter_does_not_add_points_before_a_stored_one():
+    expanded = expand_steps(series([0.0, 1.02, 1.98]), 1.0)
+    assert expanded.t.tolist() == [0.0, 1.02, 1.98, 2.98]
+
+
+def test_outages_longer_than_the_heartbeat_stay_gaps():
+    expanded = expand_steps(series([0.0, 10.0, 200.0]), 1.0, heartbeat=30.0)
+    held = expanded.t[expanded.value == 1.0]
+    # Held until the heartbeat tick would have been stored, then nothing until the next stored reading
+    assert held[0] == 10.0 and held[-1] == 40.0
+    assert not np.any((expanded.t > 40.0) & (expanded.t < 200.0))
+    assert expanded.t[-1] == 230.0
+
+
+def test_heartbeat_gap_of_an_early_tick_is_not_an_outage():
+    # The tick near 60 s read as 59.999 s, so the heartbeat stored the next one
+    expanded = expand_steps(series([0.0, 62.998, 125.996]), 3.0, heartbeat=60.0)
+    first = expanded.t[expanded.value == 0.0]
+    assert first.tolist() == [3.0 * i for i in range(21)]
+    assert np.all(np.diff(expanded.t) <= 3.0)
+
+
+def test_only_stored_points_keep_their_anomaly_flag():
+    expanded = expand_steps(series([0.0, 4.0], anomalies=[True, False]), 1.0)
+    assert expanded.is_anomaly.tolist() == [True, False, False, False, False, False]
+
+
+def test_range_bounds():
+    expanded = expand_steps(series([0.0, 10.0]), 1.0, start=5.0, end=12.0, heartbeat=30.0)
+    assert expanded.t.tolist() == [5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from models.downsampling import SensorSeries, lttb_indices, minmax_buckets
+
+
+def series(t, value):
+    return SensorSeries(np.asarray(t, dtype=np.float64), np.asarray(value, dtype=np.float64),
+                        np.zeros(len(t), dtype=bool), np.zeros(len(t)))
+
+
+def test_lttb_keeps_everything_when_short():
+    x = np.arange(10.0)
+    assert lttb_indices(x, x, 10).tolist() == list(range(10))
+    assert lttb_indices(x, x, 50).tolist() == list(range(10))
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50.0)
+    y[437] = 25.0
+    picked = lttb_indices(x, y, 40)
+    assert len(picked) == 40
+    assert picked[0] == 0 and picked[-1] == 999
+    assert np.all(np.diff(picked) > 0)
+    assert 437 in picked
+
+
+def test_lttb_tiny_outputs():
+    x = np.arange(100.0)
+    assert lttb_indices(x, x, 2).tolist() == [0, 99]
+    assert lttb_indices(x, x, 1).tolist() == [0]
+
+
+def test_minmax_buckets_aggregates_each_bucket():
+    t = np.arange(100.0)
+    buckets = minmax_buckets(series(t, t * 2), 10, 0.0, 100.0)
+    assert buckets['start'].tolist() == [float(s) for s in range(0, 100, 10)]
+    assert buckets['count'].tolist() == [10] * 10
+    assert buckets['min'].tolist() == [float(s * 2) for s in range(0, 100, 10)]
+    assert buckets['max'].tolist() == [float(s * 2 + 18) for s in range(0, 100, 10)]
+    np.testing.assert_allclose(buckets['mean'], [s * 2 + 9 for s in range(0, 100, 10)])
+
+
+def test_minmax_buckets_skips_empty_buckets_and_counts_anomalies():
+    data = series([1.0, 2.0, 85.0, 86.0, 99.0], [5.0, -3.0, 7.0, 9.0, 1.0])
+    data.is_anomaly = np.array([False, True, False, True, True])
+    data.anomaly_score = np.array([0.0, 0.9, 0.1, 0.4, 0.8])
+    buckets = minmax_buckets(data, 10, 0.0, 100.0)
+    assert buckets['start'].tolist() == [0.0, 80.0, 90.0]
+    assert buckets['min'].tolist() == [-3.0, 7.0, 1.0]
+    assert buckets['max'].tolist() == [5.0, 9.0, 1.0]
+    assert buckets['anomaly_count'].tolist() == [1, 1, 1]
+    assert buckets['max_score'].tolist() == [0.9, 0.4, 0.8]
@@ -0,0 +1,34 @@
+import numpy as np
+
+from models.gorilla import block_count, decode_block, encode_block
+
+
+def roundtrip(timestamps, values, scores, anomalies):
+    decoded = decode_block(encode_block(timestamps, values, scores, anomalies))
+    assert decoded[0].tolist() == [int(t) for t in timestamps]
+    # Bitwise, so NaN payloads and the sign of zero count
+    assert decoded[1].view(np.int64).tolist() == np.asarray(values, dtype=np.float64).view(np.int64).tolist()
+    assert decoded[2].view(np.int64).tolist() == np.asarray(scores, dtype=np.float64).view(np.int64).tolist()
+    assert decoded[3].tolist() == [bool(a) for a in anomalies]
+
+
+def test_roundtrip_regular_cadence_with_jitter():
+    rng = np.random.default_rng(0)
+    timestamps = 1_700_000_000_000_000 + np.cumsum(3_000_000 + rng.integers(-5000, 5000, 1000))
+    values = np.round(70 + np.cumsum(rng.normal(0, 0.1, 1000)), 2)
+    scores = np.where(rng.random(1000) < 0.05, rng.random(1000), 0.0)
+    roundtrip(timestamps, values, scores, scores > 0.5)
+
+
+def test_roundtrip_special_floats():
+    values = [0.0, -0.0, np.nan, np.inf, -np.inf, 1e-308, 5e-324, -1.5, np.nan, 0.0]
+    scores = [np.nan, 0.0, -0.0, 1.0, np.inf, 0.5, 0.5, -np.inf, 0.0, -0.0]
+    timestamps = [0, 1, 2, 10, 10 ** 6, 10 ** 12, 10 ** 12 + 1, 2 ** 62, 2 ** 62 + 5, 2 ** 62 + 6]
+    roundtrip(timestamps, values, scores, [i % 3 == 0 for i in range(10)])
+
+
+def test_roundtrip_single_point_and_empty():
+    roundtrip([42], [-0.0], [np.nan], [True])
+    data = encode_block([], [], [], [])
+    assert block_count(data) == 0
+    assert all(len(column) == 0 for column in decode_block(data))
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, delete
+
+from models.compact_readings import CompactReadingStore
+from models.database import COMPACT_READING_TABLES, ROLLUP_TABLES, SensorReading, db
+from models.deadband import expand_steps
+from models.downsampling import to_unix
+from models.rollups import RollupPipeline, choose_tier, load_aggregate_series
+
+START = datetime(2024, 1, 1)
+READINGS = 3 * 360   # three hours at one reading per 10 s
+
+
+def reading_rows():
+    return [{
+        'machine_id': 1,
+        'sensor_type': 'temperature',
+        'value': float(i),
+        'unit': '°C',
+        'is_anomaly': i == 100,
+        'anomaly_score': 0.9 if i == 100 else 0.0,
+        'timestamp': START + timedelta(seconds=10 * i)
+    } for i in range(READINGS)]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    db.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def held(machine_id, sensor_type, series, start, end):
+    return expand_steps(series, 3.0, to_unix(start), to_unix(end), 60.0)
+
+
+def rolled(engine, store=None, expand=None):
+    # Two hours rolled into the 1m tier; the last hour is only in the raw rows or the store
+    RollupPipeline(engine, SensorReading.__table__, ROLLUP_TABLES, store=store, expand=expand,
+                   lookback=60.0).run_once(now=START + timedelta(hours=2, seconds=10))
+
+
+def serve(engine, store=None, expand=None):
+    end = START + timedelta(hours=3)
+    assert choose_tier(START, end, 50, now=end) == '1m'
+    with engine.connect() as conn:
+        return load_aggregate_series(conn, ROLLUP_TABLES, SensorReading.__table__, '1m', 1, 'temperature',
+                                     START, end, store=store, expand=expand, lookback=60.0)
+
+
+def check(series):
+    assert int(series.count.sum()) == READINGS
+    assert int(series.anomaly_count.sum()) == 1
+    np.testing.assert_allclose(series.sum.sum(), sum(range(READINGS)))
+    # 120 rolled 1-minute buckets, then the last hour's 360 readings as buckets of one
+    assert len(series) == 120 + 360
+    assert series.count[:120].tolist() == [6.0] * 120
+
+
+def test_tier_range_without_a_store(engine):
+    with engine.begin() as conn:
+        conn.execute(SensorReading.__table__.insert(), reading_rows())
+    rolled(engine)
+    check(serve(engine))
+
+
+def test_tier_range_with_a_store(engine):
+    store = CompactReadingStore(engine, *COMPACT_READING_TABLES)
+    store.append(reading_rows())
+    rolled(engine, store)
+    # sensor_readings stays empty: the tail has to come from the store
+    with engine.begin() as conn:
+        conn.execute(delete(SensorReading.__table__))
+    check(serve(engine, store))
+
+
+def deadband_rows():
+    """A heartbeat row per minute holding the minute's index, plus a move to 100 at 75 s"""
+    rows = [dict(row, value=float(row['value'] // 6), is_anomaly=False, anomaly_score=0.0)
+            for row in reading_rows()[::6]]
+    rows.insert(2, dict(rows[1], value=100.0, timestamp=START + timedelta(seconds=75)))
+    return rows
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_deadband_buckets_weigh_values_by_held_time(engine, compact):
+    store = CompactReadingStore(engine, *COMPACT_READING_TABLES) if compact else None
+    if store is not None:
+        store.append(deadband_rows())
+    else:
+        with engine.begin() as conn:
+            conn.execute(SensorReading.__table__.insert(), deadband_rows())
+    rolled(engine, store, held)
+    series = serve(engine, store, held)
+
+    # One point per 3 s tick over [start, end], as if every reading had been stored
+    assert int(series.count.sum()) == 3 * 1200 + 1
+    assert series.count[:120].tolist() == [20.0] * 120
+    # Minute 1: 1.0 held for 5 ticks (60..72 s), then 100.0 for 15
+    assert series.mean[1] == pytest.approx((5 * 1.0 + 15 * 100.0) / 20)
+    assert series.mean[:120][2:].tolist() == [float(i) for i in range(2, 120)]
@@ -0,0 +1,60 @@
+from models.scheduler import FixedRateScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_slow_job_counts_missed_ticks_instead_of_bursting():
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(clock)
+    lags = []
+
+    def slow_job():
+        lags.append(clock.now)
+        clock.now += 3.5
+        if len(lags) == 2:
+            scheduler.stop()
+
+    scheduler.add_job('slow', 1.0, slow_job)
+    scheduler.run_forever()
+
+    stats = scheduler.stats()['slow']
+    # Tick 1 runs 0 -> 3.5: deadlines 1 and 2 are missed, the next is 3 (late by 0.5).
+    # Tick 2 runs 3.5 -> 7: deadlines 4, 5 and 6 are missed, the next is 7.
+    assert lags == [0.0, 3.5]
+    assert stats['ticks'] == 2
+    assert stats['missed_ticks'] == 5
+    assert stats['overruns'] == 2
+    assert scheduler._jobs['slow'].next_deadline == 7.0
+
+
+def test_on_time_job_keeps_its_cadence():
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(clock)
+    started = []
+
+    def job():
+        started.append(clock.now)
+        clock.now += 0.4
+        if len(started) == 3:
+            scheduler.stop()
+
+    job_entry = scheduler.add_job('fast', 1.0, job)
+    original_wait = scheduler._wakeup.wait
+
+    def advance(timeout=None):
+        # Sleeping on the fake clock: jump straight to the deadline
+        if timeout is not None:
+            clock.now += timeout
+        return original_wait(0)
+
+    scheduler._wakeup.wait = advance
+    scheduler.run_forever()
+
+    assert started == [0.0, 1.0, 2.0]
+    assert job_entry.missed_ticks == 0 and job_entry.overruns == 0
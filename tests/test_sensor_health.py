@@ -0,0 +1,49 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+import ad
+from models.fleet_health import FleetHealthEngine
+
+
+@pytest.fixture
+def tracker():
+    tracker = ad.SensorHealthTracker()
+    tracker._engine = FleetHealthEngine(tracker.health_degradation_rates)
+    now = datetime(2024, 1, 1, 12, 0)
+    with tracker._lock:
+        tracker._set(1, 'temperature', 80.0, 'healthy', now)
+        tracker._set(1, 'pressure', 0.0, 'shutdown', now)
+    return tracker
+
+
+def test_failed_flush_marks_rows_dirty_again(tracker, monkeypatch):
+    @contextmanager
+    def failing_writer():
+        raise sqlite3.OperationalError('database is locked')
+        yield
+
+    monkeypatch.setattr(ad.sqlite_db, 'writer', failing_writer)
+    with pytest.raises(sqlite3.OperationalError):
+        tracker.flush()
+    assert tracker._dirty == {(1, 'temperature'), (1, 'pressure')}
+    assert tracker.flushes == 0
+
+
+def test_successful_flush_writes_and_clears_dirty_rows(tracker, monkeypatch):
+    conn = sqlite3.connect(':memory:')
+
+    @contextmanager
+    def memory_writer():
+        yield conn
+        conn.commit()
+
+    monkeypatch.setattr(ad.sqlite_db, 'writer', memory_writer)
+    assert tracker.flush() == 2
+    assert tracker._dirty == set()
+    rows = conn.execute('SELECT machine_id, sensor_type, health_percentage, status FROM sensor_health '
+                        'ORDER BY sensor_type').fetchall()
+    assert rows == [(1, 'pressure', 0.0, 'shutdown'), (1, 'temperature', 80.0, 'healthy')]
+    assert tracker.flush() == 0
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from models.sqlite_db import SQLiteDatabase
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'test.db')
+    database = SQLiteDatabase(path)
+    engine = create_engine(f'sqlite:///{path}')
+    database.install(engine)
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE t (x INTEGER)'))
+    yield database, engine
+    engine.dispose()
+
+
+def test_gate_is_taken_by_a_write_and_released_on_commit(database):
+    database, engine = database
+    with engine.begin() as conn:
+        conn.execute(text('SELECT count(*) FROM t'))
+        assert database.gate._owner is None
+        conn.execute(text('INSERT INTO t VALUES (1)'))
+        assert database.gate._owner == threading.get_ident()
+    assert database.gate._owner is None
+
+
+def test_gate_is_released_on_rollback(database):
+    database, engine = database
+    with engine.connect() as conn:
+        conn.execute(text('INSERT INTO t VALUES (1)'))
+        assert database.gate._owner is not None
+        conn.rollback()
+        assert database.gate._owner is None
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn:
+            conn.execute(text('INSERT INTO t VALUES (2)'))
+            raise RuntimeError('abort')
+    assert database.gate._owner is None
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM t')).scalar() == 0
+
+
+def test_gate_is_released_when_a_connection_is_returned_mid_transaction(database):
+    database, engine = database
+    conn = engine.connect()
+    conn.execute(text('INSERT INTO t VALUES (1)'))
+    conn.close()
+    assert database.gate._owner is None
+
+
+def test_raw_writer_waits_for_an_engine_write(database):
+    database, engine = database
+    database.gate.timeout = 0.05
+    with engine.begin() as conn:
+        conn.execute(text('INSERT INTO t VALUES (1)'))
+        outcome = []
+
+        def write():
+            try:
+                with database.writer() as raw:
+                    raw.execute('INSERT INTO t VALUES (2)')
+                outcome.append('written')
+            except Exception as e:
+                outcome.append(type(e).__name__)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+    assert outcome == ['OperationalError']
+    assert database.gate.stats()['timeouts'] == 1
+
+    with database.writer() as raw:
+        raw.execute('INSERT INTO t VALUES (3)')
+    assert database.gate._owner is None
+    with database.reader() as conn:
+        assert conn.execute('SELECT x FROM t ORDER BY x').fetchall() == [(1,), (3,)]
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from models.write_buffer import WriteBehindBuffer
+
+
+class RecordingWriter:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.written = threading.Event()
+
+    def write(self, rows):
+        if self.fail:
+            raise RuntimeError('disk full')
+        self.batches.append(list(rows))
+        self.written.set()
+
+
+def test_partial_batch_is_flushed_after_the_interval():
+    writer = RecordingWriter()
+    buffer = WriteBehindBuffer(writer, flush_rows=100, flush_interval=0.1)
+    buffer.start()
+    try:
+        started = time.monotonic()
+        assert buffer.submit([1, 2, 3]) == 3
+        assert writer.written.wait(2.0)
+        assert time.monotonic() - started >= 0.09
+        assert writer.batches == [[1, 2, 3]]
+    finally:
+        buffer.stop()
+
+
+def test_full_batch_is_flushed_without_waiting():
+    writer = RecordingWriter()
+    buffer = WriteBehindBuffer(writer, flush_rows=3, flush_interval=60.0)
+    buffer.start()
+    try:
+        buffer.submit([1, 2])
+        buffer.submit([3])
+        assert writer.written.wait(2.0)
+        assert writer.batches == [[1, 2, 3]]
+    finally:
+        buffer.stop()
+
+
+def test_shed_rejects_rows_that_do_not_fit():
+    buffer = WriteBehindBuffer(RecordingWriter(), max_rows=5, overflow='shed')
+    assert buffer.submit([1, 2, 3, 4]) == 4
+    assert buffer.submit([5, 6, 7]) == 1
+    stats = buffer.stats()
+    assert stats['depth'] == 5 and stats['shed'] == 2 and stats['dropped'] == 0
+
+
+def test_drop_oldest_evicts_queued_rows():
+    writer = RecordingWriter()
+    buffer = WriteBehindBuffer(writer, max_rows=5, flush_rows=100, overflow='drop_oldest')
+    assert buffer.submit([1, 2, 3, 4]) == 4
+    assert buffer.submit([5, 6, 7]) == 3
+    assert buffer.stats()['dropped'] == 2
+    buffer.start()
+    try:
+        assert buffer.flush()
+        assert writer.batches == [[3, 4, 5, 6, 7]]
+    finally:
+        buffer.stop()
+
+
+def test_block_times_out_then_sheds():
+    buffer = WriteBehindBuffer(RecordingWriter(), max_rows=2, overflow='block', block_timeout=0.05)
+    buffer.submit([1, 2])
+    started = time.monotonic()
+    assert buffer.submit([3]) == 0
+    assert time.monotonic() - started >= 0.04
+    stats = buffer.stats()
+    assert stats['blocked_submits'] == 1 and stats['shed'] == 1
+
+
+def test_block_waits_for_the_writer_to_make_room():
+    writer = RecordingWriter()
+    buffer = WriteBehindBuffer(writer, max_rows=2, flush_rows=2, overflow='block', block_timeout=2.0)
+    buffer.submit([1, 2])
+    buffer.start()
+    try:
+        assert buffer.submit([3]) == 1
+        assert buffer.flush()
+        assert [row for batch in writer.batches for row in batch] == [1, 2, 3]
+        assert buffer.stats()['shed'] == 0
+    finally:
+        buffer.stop()
+
+
+def test_failed_writes_count_as_dropped():
+    buffer = WriteBehindBuffer(RecordingWriter(fail=True), flush_rows=2)
+    buffer.start()
+    try:
+        buffer.submit([1, 2])
+        assert buffer.flush()
+        stats = buffer.stats()
+        assert stats['dropped'] == 2 and stats['write_errors'] == 1 and stats['written'] == 0
+    finally:
+        buffer.stop()
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindBuffer(RecordingWriter(), overflow='spill')